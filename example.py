@@ -102,8 +102,8 @@ def main():
                 print(f"      值: {'None' if sst_value is None else sst_value[:50] + '...'}")
                 print(f"      键范围: {sst.metadata.min_key} -> {sst.metadata.max_key}")
                 print(f"      键比较结果:")
-                print(f"        key < min_key: {sst._compare_keys(key, sst.metadata.min_key) < 0}")
-                print(f"        key > max_key: {sst._compare_keys(key, sst.metadata.max_key) > 0}")
+                print(f"        key < min_key: {(len(key), key) < (len(sst.metadata.min_key), sst.metadata.min_key)}")
+                print(f"        key > max_key: {(len(key), key) > (len(sst.metadata.max_key), sst.metadata.max_key)}")
             errors += 1
             if errors >= 5:  # 只显示前5个错误
                 print(f"\n... 还有更多错误未显示 ...")
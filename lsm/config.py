@@ -13,7 +13,7 @@ class Config:
         
         # SSTable文件格式配置
         self.SST_MAGIC_NUMBER = b'LSMT'  # SSTable文件魔数
-        self.SST_VERSION = 1  # SSTable文件版本号
+        self.SST_VERSION = 6  # SSTable文件版本号
         self.SST_HEADER_SIZE = 4096  # SSTable头部大小(4KB)，包含元数据
         self.SST_BLOCK_SIZE = 4096  # 数据块大小(4KB)
         self.SST_INDEX_BLOCK_SIZE = 4096  # 索引块大小(4KB)
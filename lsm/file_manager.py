@@ -5,6 +5,8 @@ from typing import Dict, Any, BinaryIO, Optional, Iterator, List
 from threading import Lock
 from contextlib import contextmanager
 
+_U32 = struct.Struct('>I')  # 记录的 4 字节长度前缀
+
 class FileManager:
     """文件管理器，处理所有文件操作的基类"""
     
@@ -94,7 +96,7 @@ class FileManager:
             with open(abs_path, 'ab') as f:
                 offset = f.tell()
                 # 写入4字节的记录长度和记录内容
-                data = struct.pack('>I', len(record)) + record
+                data = _U32.pack(len(record)) + record
                 f.write(data)
                 f.flush()
                 os.fsync(f.fileno())
@@ -119,7 +121,7 @@ class FileManager:
                 length_data = f.read(4)
                 if not length_data:
                     return None
-                length = struct.unpack('>I', length_data)[0]
+                length = _U32.unpack(length_data)[0]
                 # 读取记录内容
                 return f.read(length)
     
@@ -141,7 +143,7 @@ class FileManager:
                     length_data = f.read(4)
                     if not length_data:
                         break
-                    length = struct.unpack('>I', length_data)[0]
+                    length = _U32.unpack(length_data)[0]
                     # 读取记录内容
                     record = f.read(length)
                     if not record:
@@ -169,8 +171,10 @@ class FileManager:
         """删除文件"""
         abs_path = os.path.join(self.base_dir, file_path)
         with self._file_locked(abs_path):
-            if os.path.exists(abs_path):
+            try:
                 os.remove(abs_path)
+            except FileNotFoundError:
+                pass
     
     def rename_file(self, old_path: str, new_path: str) -> None:
         """重命名文件"""
@@ -1,96 +1,150 @@
 import math
 import mmh3  # MurmurHash3，一个快速的非加密哈希函数
-from typing import List
+from typing import Iterable, Tuple
 
 class BloomFilter:
-    """布隆过滤器"""
-    
+    """分块布隆过滤器（Split Block Bloom Filter）
+
+    位数组按 256 位（32 字节，8 个 32 位 lane）划分为块。
+    每个项先用一次哈希选中一个块，再用双重哈希在该块的每个 lane 中各置一位，
+    因此一次查询只会访问一个块（一条缓存行）。
+    """
+
+    BLOCK_BITS = 256  # 每个块的位数
+    BLOCK_BYTES = BLOCK_BITS // 8  # 每个块的字节数
+    LANE_BITS = 32  # 每个 lane 的位数
+    MAX_LANES = BLOCK_BITS // LANE_BITS  # 每个块的 lane 数量
+
     def __init__(self, size: int = 1000, hash_count: int = 7):
         """初始化布隆过滤器
-        
+
         Args:
-            size: 位数组大小
-            hash_count: 哈希函数个数
+            size: 位数组大小（按块向上取整）
+            hash_count: 每个项在块内设置的位数，最多 8 个
         """
-        # 根据预期条目数和期望的假阳性率优化大小
         self.size = size
         self.hash_count = hash_count
-        self.bit_array = [False] * self.size
-    
-    def _get_hash_values(self, item: str) -> List[int]:
-        """获取一个项的所有哈希值
-        
+        self.num_blocks = max(1, math.ceil(size / self.BLOCK_BITS))
+        self.lanes = min(max(hash_count, 1), self.MAX_LANES)
+        self.bit_array = bytearray(self.num_blocks * self.BLOCK_BYTES)
+
+    @staticmethod
+    def hash(item: str) -> Tuple[int, int]:
+        """计算项的 128 位哈希，与过滤器的大小无关
+
+        同一个键探测多个过滤器时只需计算一次，再传给 contains_hash。
+
         Args:
             item: 待哈希的项
-        
+
         Returns:
-            哈希值列表
+            (低 64 位, 高 64 位)
         """
-        hash_values = []
-        for i in range(self.hash_count):
-            # 使用不同的种子生成哈希值，确保更好的分布
-            hash1 = mmh3.hash(item, i) % self.size
-            hash2 = mmh3.hash(item, i + self.hash_count) % self.size
-            # 使用双重哈希来生成更均匀的哈希值
-            combined_hash = (hash1 + i * hash2) % self.size
-            hash_values.append(abs(combined_hash))
-        return hash_values
-    
+        return mmh3.hash64(item, signed=False)
+
+    def _locate(self, item: str) -> Tuple[int, int]:
+        """计算项所在块的字节偏移和块内掩码
+
+        Args:
+            item: 待哈希的项
+
+        Returns:
+            (块的字节偏移, 块内掩码)
+        """
+        return self._locate_hash(mmh3.hash64(item, signed=False))
+
+    def _locate_hash(self, hashed: Tuple[int, int]) -> Tuple[int, int]:
+        """根据哈希值计算块的字节偏移和块内掩码
+
+        高 64 位选择块，低 64 位拆成两个 32 位的 h1、h2，
+        按双重哈希 (h1 + i * h2) 得到每个 lane 内的位置。
+
+        Args:
+            hashed: hash() 返回的哈希值
+
+        Returns:
+            (块的字节偏移, 块内掩码)
+        """
+        low, high = hashed
+        h1 = low & 0xFFFFFFFF
+        h2 = low >> 32
+        mask = 0
+        for i in range(self.lanes):
+            mask |= 1 << (i * self.LANE_BITS + (h1 >> 27))
+            h1 = (h1 + h2) & 0xFFFFFFFF
+        return (high % self.num_blocks) * self.BLOCK_BYTES, mask
+
     def add(self, item: str):
         """添加一个项到过滤器
-        
+
         Args:
             item: 待添加的项
         """
-        for index in self._get_hash_values(item):
-            self.bit_array[index] = True
-    
+        offset, mask = self._locate(item)
+        end = offset + self.BLOCK_BYTES
+        block = int.from_bytes(self.bit_array[offset:end], 'little') | mask
+        self.bit_array[offset:end] = block.to_bytes(self.BLOCK_BYTES, 'little')
+
+    def add_many(self, items: Iterable[str]):
+        """批量添加项到过滤器
+
+        Args:
+            items: 待添加的项
+        """
+        add = self.add
+        for item in items:
+            add(item)
+
+    def contains_hash(self, hashed: Tuple[int, int]) -> bool:
+        """使用预先计算的哈希值检查项是否可能在过滤器中
+
+        Args:
+            hashed: hash() 返回的哈希值
+
+        Returns:
+            如果项可能在过滤器中返回True，否则返回False
+        """
+        offset, mask = self._locate_hash(hashed)
+        block = int.from_bytes(self.bit_array[offset:offset + self.BLOCK_BYTES], 'little')
+        return block & mask == mask
+
     def contains(self, item: str) -> bool:
         """检查一个项是否可能在过滤器中
-        
+
         Args:
             item: 待检查的项
-            
+
         Returns:
             如果项可能在过滤器中返回True，否则返回False
         """
-        return all(self.bit_array[index] for index in self._get_hash_values(item))
-    
+        offset, mask = self._locate(item)
+        block = int.from_bytes(self.bit_array[offset:offset + self.BLOCK_BYTES], 'little')
+        return block & mask == mask
+
     def to_bytes(self) -> bytes:
         """将过滤器转换为字节序列
-        
+
         Returns:
             字节序列
         """
-        # 将布尔列表转换为字节序列
-        result = bytearray()
-        for i in range(0, len(self.bit_array), 8):
-            byte = 0
-            for j in range(8):
-                if i + j < len(self.bit_array) and self.bit_array[i + j]:
-                    byte |= (1 << j)
-            result.append(byte)
-        return bytes(result)
-    
+        return bytes(self.bit_array)
+
     @classmethod
     def from_bytes(cls, data: bytes, size: int, hash_count: int) -> 'BloomFilter':
         """从字节序列恢复过滤器
-        
+
         Args:
             data: 字节序列
             size: 位数组大小
             hash_count: 哈希函数个数
-            
+
         Returns:
             恢复的过滤器
         """
         filter = cls(size, hash_count)
-        
-        # 从字节序列恢复布尔列表
-        for i in range(len(data)):
-            byte = data[i]
-            for j in range(8):
-                if i * 8 + j < size:
-                    filter.bit_array[i * 8 + j] = bool(byte & (1 << j))
-        
-        return filter
\ No newline at end of file
+        length = len(filter.bit_array)
+        # 位数组已经是紧凑的字节布局，直接整体拷贝，不足部分保留为 0
+        with memoryview(data) as view:
+            chunk = view[:length]
+            filter.bit_array[:len(chunk)] = chunk
+        return filter
@@ -1,5 +1,8 @@
 import os
+import heapq
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Iterator, Tuple
 
 from .memtable.table import MemTable
@@ -8,18 +11,42 @@ from .wal.wal import WAL
 from .filter.bloom import BloomFilter
 from .file_manager.manager import FileManager
 
+def _check_item(key: str, value: str) -> None:
+    """在调用方线程中检查一条写入，避免错误的写入到写线程中才失败
+    
+    Raises:
+        TypeError: 键或值不是 str
+        ValueError: 键 UTF-8 编码后超过 SSTable.MAX_KEY_SIZE 字节
+    """
+    if not isinstance(key, str):
+        raise TypeError(f"Key must be str, not {type(key).__name__}")
+    if not isinstance(value, str):
+        raise TypeError(f"Value must be str, not {type(value).__name__}")
+    # UTF-8 每个字符最多 4 字节，字符数足够少时不需要编码
+    if len(key) > SSTable.MAX_KEY_SIZE // 4 and len(key.encode('utf-8')) > SSTable.MAX_KEY_SIZE:
+        raise ValueError(f"Key too long: at most {SSTable.MAX_KEY_SIZE} bytes in UTF-8")
+
 class LSMTree:
     """LSM 树实现"""
     
-    def __init__(self, data_dir: str, memtable_size: int = 1024 * 1024):
+    READ_WORKERS = 4  # 并发探测 SSTable 的线程数
+    RECOVER_WORKERS = 32  # 启动时并发加载 SSTable 的最大线程数
+    
+    def __init__(self, data_dir: str, memtable_size: int = 1024 * 1024,
+                 wal_batch_size: int = 64):
         """初始化 LSM 树
         
         Args:
             data_dir: 数据目录，用于存储 WAL 和 SSTable 文件
-            memtable_size: MemTable 的最大大小（字节），默认 1MB
+            memtable_size: MemTable 的最大大小（近似字节数，估算方式见 MemTable），默认 1MB
+            wal_batch_size: 写线程每次从写队列取出的最大记录数，每批只写盘并 fsync 一次
+            
+        Raises:
+            ValueError: 数据目录中有其他版本格式写入的 SSTable（见 README 的磁盘格式说明）
         """
         self.data_dir = data_dir
         self.memtable_size = memtable_size
+        self.wal_batch_size = wal_batch_size
         self.sequence = 0  # SSTable 序列号
         
         # 创建数据目录
@@ -31,30 +58,88 @@ class LSMTree:
         self.memtable = MemTable()
         self.wal = WAL(os.path.join(data_dir, "wal"))
         self.sstables: List[SSTable] = []
+        # 与 sstables 一一对应的键范围和布隆过滤器（按列存放），get 时不用逐个访问 SSTable 属性
+        self._sst_mins: List[Tuple[int, str]] = []
+        self._sst_maxs: List[Tuple[int, str]] = []
+        self._sst_blooms: List[BloomFilter] = []
+        self.file_manager = FileManager(os.path.join(data_dir, "sstable"))
+        
+        # 用于并发控制，保护 MemTable、WAL 和 SSTable 列表
+        self._lock = threading.RLock()
+        
+        # 写队列：put 只把 (写入编号, 键, 值) 放入队列，由写线程批量写入 WAL 和 MemTable
+        self._write_q: deque = deque()
+        self._write_cv = threading.Condition()
+        self._write_seq = 0
+        # 已入队但还未写入 MemTable 的最新值，保证读到自己的写入
+        self._pending = {}
+        self._closing = False
+        # 写线程写入失败时保存的异常，由之后第一个写入、compact 或 close 抛出，读取不受影响
+        self._write_error: Optional[Exception] = None
         
         # 从磁盘恢复数据
         self._recover()
         
-        # 用于并发控制
-        self._lock = threading.Lock()
+        # 后台写线程
+        self._writer = threading.Thread(target=self._writer_loop, name="lsm-writer", daemon=True)
+        self._writer.start()
+        
+        # 用于并发探测多个 SSTable 的线程池
+        self._read_pool = ThreadPoolExecutor(max_workers=self.READ_WORKERS,
+                                             thread_name_prefix="lsm-read")
     
     def put(self, key: str, value: str):
         """写入键值对
         
+        写入只进入写队列，由写线程批量写入 WAL 和 MemTable（组提交），
+        因此返回时数据不一定已经落盘，崩溃时可能丢失队列中尚未提交的写入。
+        
         Args:
             key: 键
             value: 值
-        """
-        with self._lock:
-            # 先写 WAL
-            self.wal.append(key, value)
             
-            # 再写 MemTable
-            self.memtable.put(key, value)
+        Raises:
+            TypeError: 键或值不是 str
+            ValueError: 键 UTF-8 编码后超过 SSTable.MAX_KEY_SIZE 字节
+            RuntimeError: LSM 树已经关闭
+            Exception: 写线程之前写入失败的异常
+        """
+        _check_item(key, value)
+        with self._write_cv:
+            self._check_writable()
+            self._write_seq += 1
+            self._write_q.append((self._write_seq, key, value))
+            self._pending[key] = (self._write_seq, value)
+            self._write_cv.notify()
+    
+    def put_many(self, items: List[Tuple[str, str]]):
+        """批量写入键值对
+        
+        整批在一次加锁中进入写队列，只唤醒写线程一次，由写线程按 wal_batch_size
+        分批写入 WAL 和 MemTable。持久化语义与 put 相同。
+        
+        Args:
+            items: 键值对列表，同一个键出现多次时以最后一次为准
             
-            # 如果 MemTable 太大，触发合并
-            if self.memtable.size >= self.memtable_size:
-                self._compact_memtable()
+        Raises:
+            TypeError, ValueError: 有一条写入不合法（见 put），此时整批都不写入
+            RuntimeError: LSM 树已经关闭
+            Exception: 写线程之前写入失败的异常
+        """
+        if not items:
+            return
+        for key, value in items:
+            _check_item(key, value)
+        with self._write_cv:
+            self._check_writable()
+            seq = self._write_seq
+            queue, pending = self._write_q, self._pending
+            for key, value in items:
+                seq += 1
+                queue.append((seq, key, value))
+                pending[key] = (seq, value)
+            self._write_seq = seq
+            self._write_cv.notify()
     
     def get(self, key: str) -> Optional[str]:
         """获取键对应的值
@@ -65,19 +150,151 @@ class LSMTree:
         Returns:
             如果键存在返回对应的值，否则返回 None
         """
-        with self._lock:
-            # 先查 MemTable
-            value = self.memtable.get(key)
+        # 先查还在写队列中的写入（dict 的读取是原子的，不需要加锁）
+        pending = self._pending.get(key)
+        if pending is not None:
+            value = pending[1]
+            return None if value == "\0" else value
+        
+        while True:
+            # 只在查 MemTable 和取 SSTable 列表快照时持锁，磁盘 IO 在锁外进行
+            with self._lock:
+                value = self.memtable.get(key)
+                snapshot = (self.sstables, self._sst_mins, self._sst_maxs, self._sst_blooms)
             if value is not None:
                 return None if value == "\0" else value
             
             # 再查 SSTable，从新到旧查找
-            for sstable in reversed(self.sstables):
-                value = sstable.get(key)
-                if value is not None:
-                    return None if value == "\0" else value
+            try:
+                value = self._probe_sstables(key, *snapshot)
+            except FileNotFoundError:
+                if self.sstables is snapshot[0]:
+                    raise
+                value = None  # 快照中的 SSTable 已被合并删除
+            
+            # 探测期间 SSTable 列表被替换（合并可能已删除旧文件），用新列表重试
+            if value is None and self.sstables is not snapshot[0]:
+                continue
+            return None if value is None or value == "\0" else value
+    
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        """批量获取多个键的值
+        
+        写队列和 MemTable 只加一次锁查完整批键，SSTable 列表也只取一次快照；
+        不在内存中的键再逐个用快照探测 SSTable。
+        
+        Args:
+            keys: 键列表
             
+        Returns:
+            与 keys 一一对应的值列表，不存在或已删除的键为 None
+        """
+        results: List[Optional[str]] = [None] * len(keys)
+        missing = []
+        with self._lock:
+            pending, memtable = self._pending, self.memtable
+            for i, key in enumerate(keys):
+                entry = pending.get(key)
+                value = entry[1] if entry is not None else memtable.get(key)
+                if value is None:
+                    missing.append(i)
+                elif value != "\0":
+                    results[i] = value
+            snapshot = (self.sstables, self._sst_mins, self._sst_maxs, self._sst_blooms)
+        
+        for i in missing:
+            key = keys[i]
+            try:
+                value = self._probe_sstables(key, *snapshot)
+            except FileNotFoundError:
+                if self.sstables is snapshot[0]:
+                    raise
+                value = None  # 快照中的 SSTable 已被合并删除
+            
+            if value is None and self.sstables is not snapshot[0]:
+                # 快照已经过期，这个键按单键查询重试
+                results[i] = self.get(key)
+            elif value is not None and value != "\0":
+                results[i] = value
+        return results
+    
+    def _check_writable(self):
+        """写入前检查 LSM 树是否可写，调用方持有 _write_cv"""
+        if self._closing:
+            raise RuntimeError("LSMTree is closed")
+        self._raise_write_error()
+    
+    def _raise_write_error(self):
+        """写线程写入失败过时抛出保存的异常，并清除它，每个异常只抛出一次"""
+        with self._write_cv:
+            error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+    
+    def _probe_sstables(self, key: str, sstables: List[SSTable],
+                        mins: List[Tuple[int, str]], maxs: List[Tuple[int, str]],
+                        blooms: List[BloomFilter]) -> Optional[str]:
+        """从新到旧探测 SSTable，返回最新的值
+        
+        先在当前线程用键范围和布隆过滤器排除不可能包含该键的 SSTable，不产生任何磁盘 IO；
+        剩余多个候选时并发读取，并按从新到旧的顺序取第一个命中的结果。
+        
+        Args:
+            key: 键
+            sstables: SSTable 列表快照
+            mins: 与 sstables 对应的最小键列表
+            maxs: 与 sstables 对应的最大键列表
+            blooms: 与 sstables 对应的布隆过滤器列表
+            
+        Returns:
+            最新的值，如果所有 SSTable 都没有该键返回 None
+        """
+        sort_key = (len(key), key)  # 与 SSTable 相同的先长度后字典序
+        hashed = None  # 键的哈希只计算一次，所有布隆过滤器共用
+        candidates = []
+        for i in range(len(mins) - 1, -1, -1):
+            # 只有键在 [min_key, max_key] 范围内才检查布隆过滤器
+            if mins[i] <= sort_key <= maxs[i]:
+                if hashed is None:
+                    hashed = BloomFilter.hash(key)
+                if blooms[i].contains_hash(hashed):
+                    candidates.append(sstables[i])
+        if not candidates:
             return None
+        if len(candidates) == 1:
+            return candidates[0]._get_prechecked(key)
+        
+        futures = [self._read_pool.submit(sstable._get_prechecked, key) for sstable in candidates]
+        try:
+            for future in futures:
+                value = future.result()
+                if value is not None:
+                    return value
+        finally:
+            # 更新的 SSTable 已经命中，取消还未开始的旧探测
+            for future in futures:
+                future.cancel()
+        return None
+    
+    def _index_sstables(self):
+        """根据当前的 sstables 重建键范围和布隆过滤器列表，sstables 变化后调用
+        
+        sstables 和这几个列表只整体替换、不原地修改，get 在锁外使用的快照因此保持不变。
+        
+        没有元数据或布隆过滤器的 SSTable 使用空范围，查询时总会被跳过。
+        """
+        mins, maxs, blooms = [], [], []
+        for sstable in self.sstables:
+            metadata = sstable.metadata
+            if metadata and sstable.filter:
+                mins.append((len(metadata.min_key), metadata.min_key))
+                maxs.append((len(metadata.max_key), metadata.max_key))
+                blooms.append(sstable.filter)
+            else:
+                mins.append((1, ""))  # 大于 max 的 min，范围为空
+                maxs.append((0, ""))
+                blooms.append(None)
+        self._sst_mins, self._sst_maxs, self._sst_blooms = mins, maxs, blooms
     
     def delete(self, key: str):
         """删除键值对
@@ -99,22 +316,19 @@ class LSMTree:
             键值对迭代器
         """
         with self._lock:
-            # 收集所有键值对
-            result = {}
+            self._drain_writes()
+            
+            # 收集所有键值对，MemTable 中的值最新
+            result = dict(self.memtable.range_scan(start_key, end_key))
             
-            # 从旧到新遍历 SSTable
-            for sstable in self.sstables:
+            # 从新到旧遍历 SSTable
+            for sstable in reversed(self.sstables):
                 for key, value in sstable.range_scan(start_key, end_key):
                     if key not in result:  # 只保留最新的值
                         result[key] = value
             
-            # 最后查 MemTable
-            for key, value in self.memtable:
-                if start_key <= key <= end_key:
-                    result[key] = value
-            
-            # 按键排序并过滤删除标记
-            for key in sorted(result.keys()):
+            # 按与 SSTable 相同的先长度后字典序排序，并过滤删除标记
+            for key in sorted(result, key=MemTable._sort_key):
                 value = result[key]
                 if value != "\0":  # 跳过删除标记
                     yield key, value
@@ -126,7 +340,10 @@ class LSMTree:
         1. 如果 MemTable 不为空，将其转换为 SSTable
         2. 如果有多个 SSTable，将它们合并成一个
         """
+        self._raise_write_error()
         with self._lock:
+            self._drain_writes()
+            
             # 先将 MemTable 转换为 SSTable
             if len(self.memtable) > 0:
                 self._compact_memtable()
@@ -135,35 +352,96 @@ class LSMTree:
             if len(self.sstables) > 1:
                 self._compact_sstables()
     
+    def _writer_loop(self):
+        """写线程：等待写队列中的记录，批量写入 WAL 和 MemTable"""
+        while True:
+            with self._write_cv:
+                while not self._write_q and not self._closing:
+                    self._write_cv.wait()
+                if not self._write_q:
+                    return  # 正在关闭且队列已空
+            try:
+                self._drain_writes(self.wal_batch_size)
+            except Exception as e:
+                # 失败的这批写入已经从 pending 中移除，异常留给之后的调用方
+                with self._write_cv:
+                    self._write_error = e
+    
+    def _drain_writes(self, limit: Optional[int] = None):
+        """从写队列取出记录，一次写入 WAL 后再写入 MemTable，MemTable 写满时转换为 SSTable
+        
+        Args:
+            limit: 最多取出的记录数，None 表示取空队列
+        """
+        with self._lock:
+            while self._write_q:
+                with self._write_cv:
+                    count = len(self._write_q)
+                    if limit is not None:
+                        count = min(count, limit)
+                    batch = [self._write_q.popleft() for _ in range(count)]
+                
+                # 先写 WAL（整批只 fsync 一次），再写 MemTable
+                entries = [(key, value) for _, key, value in batch]
+                try:
+                    self.wal.append_many(entries)
+                    self.memtable.put_many(entries)
+                finally:
+                    # 已经写入 MemTable 的键不再需要从 pending 中读取；
+                    # 写入失败时也要移除，否则 get 会一直读到没有写入的值
+                    with self._write_cv:
+                        for seq, key, _ in batch:
+                            entry = self._pending.get(key)
+                            if entry is not None and entry[0] == seq:
+                                del self._pending[key]
+                
+                # 如果 MemTable 太大，触发合并
+                if self.memtable.size >= self.memtable_size:
+                    self._flush_memtable()
+                
+                if limit is not None:
+                    return
+    
+    def _stop_writer(self):
+        """通知写线程退出并等待它结束"""
+        with self._write_cv:
+            self._closing = True
+            self._write_cv.notify()
+        self._writer.join()
+    
     def _compact_memtable(self):
-        """将 MemTable 转换为 SSTable"""
+        """将写队列和 MemTable 中的数据转换为 SSTable"""
+        with self._lock:
+            self._drain_writes()
+            self._flush_memtable()
+    
+    def _flush_memtable(self):
+        """将 MemTable 转换为 SSTable，调用方持有锁"""
         # 确保目录存在
         os.makedirs(os.path.join(self.data_dir, "sstable"), exist_ok=True)
         
-        # 获取 MemTable 中的数据
-        data = list(self.memtable)  # 转换为列表以获取大小
-        if not data:  # 如果 MemTable 为空，直接返回
+        # MemTable 本身有序且知道条目数，无需先转换为列表
+        count = len(self.memtable)
+        if not count:  # 如果 MemTable 为空，直接返回
             return
             
-        # 创建文件管理器
-        file_manager = FileManager(os.path.join(self.data_dir, "sstable"))
-        
         # 创建新的 SSTable
         sstable = SSTable.create_from_memtable(
-            file_manager=file_manager,
+            file_manager=self.file_manager,
             base_name=f"sst_{self.sequence}",
             level=0,  # 新创建的 SSTable 总是在 level 0
             sequence=self.sequence,
-            entries=iter(sorted(data, key=lambda x: x[0])),  # 确保数据按键排序
-            expected_entries=len(data)
+            entries=iter(self.memtable),  # MemTable 迭代时已按键排序
+            expected_entries=count
         )
         
         if sstable:
             self.sequence += 1
             # 添加到 SSTable 列表
-            self.sstables.append(sstable)
+            self.sstables = self.sstables + [sstable]
+            self._index_sstables()
             
-            # 清空 MemTable 和 WAL
+            # 清空 MemTable 和 WAL，WAL 中的记录已经落在 SSTable 中
             self.memtable = MemTable()
             self.wal.delete()
             self.wal = WAL(os.path.join(self.data_dir, "wal"))
@@ -179,57 +457,60 @@ class LSMTree:
         if len(self.sstables) <= 1:
             return
         
-        # 收集所有数据
-        all_data = {}  # 使用字典来保存最新的值
+        # 每个 SSTable 内部已按 (长度, 键) 有序，用 k 路归并流式合并
+        merged = self._merge_sstables(self.sstables)
         
-        # 从新到旧遍历所有 SSTable，确保保留最新的值
-        for sstable in reversed(self.sstables):
-            try:
-                # 使用范围查询获取所有数据
-                min_key = sstable.metadata.min_key
-                max_key = sstable.metadata.max_key
-                for key, value in sstable.range_scan(min_key, max_key):
-                    if key not in all_data:  # 只保留最新的值
-                        all_data[key] = value
-            except Exception as e:
-                print(f"Error during SSTable scan: {e}")
-                continue
+        # 各 SSTable 的条目数之和是合并结果的上界
+        expected_entries = sum(sst.metadata.entry_count for sst in self.sstables)
         
-        # 过滤掉已删除的键
-        valid_data = [(k, v) for k, v in sorted(all_data.items()) if v != "\0"]
+        # 创建新的 SSTable
+        sstable = SSTable.create_from_memtable(
+            file_manager=self.file_manager,
+            base_name=f"sst_{self.sequence}",
+            level=1,  # 合并后的 SSTable 在 level 1
+            sequence=self.sequence,
+            entries=merged,
+            expected_entries=expected_entries
+        )
         
-        if valid_data:  # 只在有数据时创建新的 SSTable
-            # 创建文件管理器
-            file_manager = FileManager(os.path.join(self.data_dir, "sstable"))
+        if sstable:
+            self.sequence += 1
             
-            # 创建新的 SSTable
-            sstable = SSTable.create_from_memtable(
-                file_manager=file_manager,
-                base_name=f"sst_{self.sequence}",
-                level=1,  # 合并后的 SSTable 在 level 1
-                sequence=self.sequence,
-                entries=iter(valid_data),
-                expected_entries=len(valid_data)
-            )
+            # 保存旧的 SSTable 列表
+            old_sstables = self.sstables[:]
             
-            if sstable:
-                self.sequence += 1
-                
-                # 保存旧的 SSTable 列表
-                old_sstables = self.sstables[:]
-                
-                # 更新 SSTable 列表
-                self.sstables = [sstable]
-                
-                # 删除旧的 SSTable 文件
-                for old_sstable in old_sstables:
-                    try:
-                        old_sstable.close()
-                        old_sstable.delete()
-                    except Exception as e:
-                        print(f"Error deleting old SSTable: {e}")
-            else:
-                print("Failed to create compacted SSTable")
+            # 更新 SSTable 列表
+            self.sstables = [sstable]
+            self._index_sstables()
+            
+            # 删除旧的 SSTable 文件
+            for old_sstable in old_sstables:
+                try:
+                    old_sstable.close()
+                    old_sstable.delete()
+                except Exception as e:
+                    print(f"Error deleting old SSTable: {e}")
+        elif merged.written:
+            print("Failed to create compacted SSTable")
+    
+    def _merge_sstables(self, sstables: List[SSTable]) -> '_MergeIterator':
+        """k 路归并多个 SSTable，同一个键只保留序列号最大（最新）的值，并跳过删除标记
+        
+        Args:
+            sstables: 要合并的 SSTable 列表
+            
+        Returns:
+            按键有序的键值对迭代器
+        """
+        streams = [self._tagged_entries(sstable) for sstable in sstables]
+        return _MergeIterator(heapq.merge(*streams))
+    
+    @staticmethod
+    def _tagged_entries(sstable: SSTable) -> Iterator[Tuple[Tuple[int, str], int, bytes]]:
+        """将 SSTable 的键值对转换为可归并的 ((长度, 键), -序列号, 值) 元组，值保持为 bytes"""
+        sequence = -sstable.sequence
+        for key, value in sstable.scan_raw():
+            yield (len(key), key), sequence, value
     
     def _recover(self):
         """从磁盘恢复数据"""
@@ -253,19 +534,23 @@ class LSMTree:
             # 更新序列号为最大序列号 + 1
             self.sequence = max_sequence + 1 if max_sequence >= 0 else 0
             
-            # 按序列号排序，确保按正确顺序加载（降序，最新的在前面）
-            meta_files.sort(key=lambda x: x[0], reverse=True)  # 按序列号降序排序
+            # 按序列号升序排列，与运行时一致：最新的 SSTable 在列表末尾
+            meta_files.sort(key=lambda x: x[0])
             
-            # 加载每个 SSTable
-            for sequence, _ in meta_files:
+            # 每个 SSTable 的加载相互独立且以 IO 为主，并发加载后按序列号顺序加入列表
+            if meta_files:
+                workers = min(self.RECOVER_WORKERS, len(meta_files))
                 try:
-                    sstable = SSTable(sstable_dir, 0, sequence)  # 先假设是 level 0
-                    if sstable.load():
-                        self.sstables.append(sstable)
-                    else:
-                        print(f"Failed to load SSTable {sequence}")
-                except Exception as e:
-                    print(f"Error loading SSTable {sequence}: {e}")
+                    with ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix="lsm-recover") as pool:
+                        loaded = list(pool.map(
+                            lambda item: self._load_sstable(sstable_dir, item[0]), meta_files))
+                except ValueError:
+                    # 不支持的 SSTable 版本：不能带着缺失的数据继续运行
+                    self.wal.close()
+                    raise
+                self.sstables = [sstable for sstable in loaded if sstable is not None]
+                self._index_sstables()
         
         # 然后恢复 WAL，因为它包含最新的数据
         wal_path = os.path.join(self.data_dir, "wal")
@@ -286,10 +571,37 @@ class LSMTree:
                 self.wal = WAL(wal_path)
                 self.memtable = MemTable()
 
+    @staticmethod
+    def _load_sstable(sstable_dir: str, sequence: int) -> Optional[SSTable]:
+        """加载单个 SSTable
+        
+        Args:
+            sstable_dir: SSTable 目录
+            sequence: 序列号
+            
+        Returns:
+            加载成功的 SSTable，文件损坏时返回 None
+            
+        Raises:
+            ValueError: SSTable 是其他版本的格式写入的
+        """
+        sstable = SSTable(sstable_dir, 0, sequence)  # 先假设是 level 0
+        if sstable.load():
+            return sstable
+        print(f"Failed to load SSTable {sequence}")
+        return None
+
     def close(self):
-        """关闭 LSM 树，确保数据持久化"""
+        """关闭 LSM 树，确保数据持久化
+        
+        关闭后不能再写入。写线程之前写入失败时，资源照常释放，最后抛出保存的异常。
+        """
+        # 先停止写线程，剩余的写入在下面同步处理
+        self._stop_writer()
         with self._lock:
             try:
+                self._drain_writes()
+                
                 # 如果 MemTable 不为空，将其转换为 SSTable
                 if len(self.memtable) > 0:
                     self._compact_memtable()
@@ -302,8 +614,38 @@ class LSMTree:
                 for sstable in self.sstables:
                     sstable.close()
                 
-                # 最后关闭 WAL
+                # 关闭 WAL
                 self.wal.close()
+                
+                # 关闭读线程池
+                self._read_pool.shutdown(wait=True)
             except Exception as e:
                 print(f"Error during LSM tree closure: {e}")
-                raise
\ No newline at end of file
+                raise
+        self._raise_write_error()
+
+
+class _MergeIterator:
+    """归并结果的迭代器，对相同的键只保留第一个（最新的）值并过滤删除标记
+    
+    值是 SSTable 中未解码的 bytes，直接交给新的 SSTable 写入。
+    """
+    
+    def __init__(self, merged: Iterator[Tuple[Tuple[int, str], int, bytes]]):
+        self._merged = merged
+        self._last_key = None
+        self.written = 0  # 已输出的有效键值对数量
+    
+    def __iter__(self) -> '_MergeIterator':
+        return self
+    
+    def __next__(self) -> Tuple[str, bytes]:
+        for sort_key, _, value in self._merged:
+            if sort_key == self._last_key:
+                continue  # 更旧的版本
+            self._last_key = sort_key
+            if value == b"\0":
+                continue  # 删除标记
+            self.written += 1
+            return sort_key[1], value
+        raise StopIteration
@@ -1,13 +1,23 @@
-from typing import Dict, Optional, Iterator, Tuple
 import sys
+from typing import Iterable, Optional, Iterator, List, Tuple
+from sortedcontainers import SortedDict
 
 class MemTable:
-    """内存表实现，使用跳表或有序字典存储键值对"""
+    """内存表实现，使用有序字典存储键值对
+    
+    数据大小按每条记录 len(key) + len(value) + ENTRY_OVERHEAD 估算。对 ASCII 字符串
+    这与 sys.getsizeof(key) + sys.getsizeof(value) 相同，LSMTree 的 memtable_size
+    阈值因此仍近似表示内存占用，但每次写入不需要调用 getsizeof。
+    """
+    
+    # 键和值两个 str 对象的固定开销（CPython 中空 ASCII 字符串的大小）
+    ENTRY_OVERHEAD = 2 * sys.getsizeof('')
     
     def __init__(self):
         """初始化内存表"""
-        self._data: Dict[str, str] = {}  # 使用字典存储键值对
-        self._size = 0  # 当前使用的内存大小（字节）
+        # 按 (长度, 键) 排序的有序字典，与 SSTable 中键的顺序一致
+        self._data: SortedDict = SortedDict(self._sort_key)
+        self._size = 0  # 当前数据大小（近似字节数，见类文档）
     
     def put(self, key: str, value: str):
         """插入或更新键值对
@@ -16,17 +26,36 @@ class MemTable:
             key: 键
             value: 值
         """
-        # 计算新数据的大小
-        new_size = sys.getsizeof(key) + sys.getsizeof(value)
-        
         # 如果键已存在，减去旧数据的大小
-        if key in self._data:
-            old_value = self._data[key]
-            self._size -= (sys.getsizeof(key) + sys.getsizeof(old_value))
+        old_value = self._data.get(key)
+        if old_value is not None:
+            self._size -= len(key) + len(old_value) + self.ENTRY_OVERHEAD
         
         # 更新数据和大小
         self._data[key] = value
-        self._size += new_size
+        self._size += len(key) + len(value) + self.ENTRY_OVERHEAD
+    
+    def put_many(self, items: Iterable[Tuple[str, str]]):
+        """批量插入或更新键值对，结果与按顺序逐个调用 put 相同
+        
+        整批共用一次属性查找，数据大小在局部变量中累加，最后写回一次
+        
+        Args:
+            items: 键值对序列
+        """
+        data = self._data
+        get = data.get
+        size = self._size
+        overhead = self.ENTRY_OVERHEAD
+        try:
+            for key, value in items:
+                old_value = get(key)
+                if old_value is not None:
+                    size -= len(key) + len(old_value) + overhead
+                data[key] = value
+                size += len(key) + len(value) + overhead
+        finally:
+            self._size = size
     
     def get(self, key: str) -> Optional[str]:
         """获取键对应的值
@@ -48,37 +77,19 @@ class MemTable:
         if key in self._data:
             # 更新大小
             value = self._data[key]
-            self._size -= (sys.getsizeof(key) + sys.getsizeof(value))
+            self._size -= len(key) + len(value) + self.ENTRY_OVERHEAD
             # 删除键值对
             del self._data[key]
     
     @staticmethod
-    def _compare_keys(key1: str, key2: str) -> int:
-        """比较两个键的大小
+    def _sort_key(key: str) -> Tuple[int, str]:
+        """有序字典使用的排序键：先比较长度，再按字符串比较
         
-        先比较长度，长度相同时按字符串比较
-        
-        Args:
-            key1: 第一个键
-            key2: 第二个键
-            
-        Returns:
-            如果key1 < key2返回-1
-            如果key1 == key2返回0
-            如果key1 > key2返回1
+        这是整个存储引擎统一的键顺序，不能换成普通的字符串比较：SSTable 按这个顺序写入数据，
+        稀疏索引的二分查找、min_key/max_key 范围判断和合并时的 k 路归并都依赖它。
+        SortedDict 只在插入时为每个键计算一次排序键，查询和遍历不会再构造元组。
         """
-        # 先比较长度
-        len1, len2 = len(key1), len(key2)
-        if len1 < len2:
-            return -1
-        if len1 > len2:
-            return 1
-        # 长度相同时按字符串比较
-        if key1 < key2:
-            return -1
-        if key1 > key2:
-            return 1
-        return 0
+        return len(key), key
     
     def range_scan(self, start_key: str, end_key: str) -> Iterator[Tuple[str, str]]:
         """范围查询
@@ -90,19 +101,33 @@ class MemTable:
         Returns:
             范围内的键值对迭代器
         """
-        for key in sorted(self._data.keys(), key=lambda k: (len(k), k)):
-            if self._compare_keys(start_key, key) <= 0 and self._compare_keys(key, end_key) <= 0:
-                yield key, self._data[key]
+        # irange 通过二分定位起点，只遍历范围内的键，O(log n + m)
+        data = self._data
+        for key in data.irange(start_key, end_key):
+            yield key, data[key]
+    
+    def snapshot(self) -> List[Tuple[str, str]]:
+        """按键顺序返回全部键值对的列表
+        
+        用 zip/map 一次构造整个列表，不经过逐项 yield 的迭代器
+        """
+        data = self._data
+        return list(zip(data, map(data.__getitem__, data)))
+    
+    def range_snapshot(self, start_key: str, end_key: str) -> List[Tuple[str, str]]:
+        """按键顺序返回范围内键值对的列表，范围与 range_scan 相同（两端都包含）"""
+        data = self._data
+        keys = list(data.irange(start_key, end_key))
+        return list(zip(keys, map(data.__getitem__, keys)))
     
     @property
     def size(self) -> int:
-        """获取当前使用的内存大小（字节）"""
+        """获取当前数据大小（近似字节数）"""
         return self._size
     
     def __iter__(self) -> Iterator[Tuple[str, str]]:
         """返回按键排序的键值对迭代器"""
-        for key in sorted(self._data.keys(), key=lambda k: (len(k), k)):
-            yield key, self._data[key]
+        return iter(self._data.items())
     
     def __len__(self) -> int:
         """返回键值对数量"""
@@ -1,16 +1,76 @@
 import os
-import json
+import mmap
 import struct
+from array import array
+from bisect import bisect_right
 from typing import Dict, Optional, List, Tuple, Iterator
 from ..file_manager.manager import FileManager
 from ..filter.bloom import BloomFilter
 from ..config import default_config
 
+_U32 = struct.Struct('>I')  # 记录中的 4 字节长度前缀
+_PACK_U32 = _U32.pack
+_UNPACK_U32 = _U32.unpack_from
+_META = struct.Struct('>IIQQQQ')  # 元数据的定长部分：level, sequence, data_size, index_offset, bloom_offset, entry_count
+_KEY_LEN = struct.Struct('>H')  # 元数据中 min_key/max_key 和索引键的 2 字节长度前缀
+_INDEX_OFFSET = struct.Struct('>Q')  # 索引项中键之后的 offset(8B)
+_KEY_PREFIX = struct.Struct('>HH')  # 数据区记录开头的 shared(与前一个键共享的前缀长度), suffix_size
+_BLOOM_HEADER = struct.Struct('>II')  # 布隆过滤器区域开头的 size, hash_count
+
+def _sync(fd: int) -> None:
+    """将文件数据同步到磁盘，支持时只同步数据（fdatasync）"""
+    if hasattr(os, 'fdatasync'):
+        os.fdatasync(fd)
+    else:
+        os.fsync(fd)
+
+def _shared_prefix_len(a: bytes, b: bytes) -> int:
+    """计算两个字节串公共前缀的长度
+    
+    Args:
+        a: 前一个键
+        b: 当前键
+        
+    Returns:
+        公共前缀的字节数
+    """
+    n = min(len(a), len(b))
+    # 按大端整数异或，最高的非零位就是第一个不同的字节，比较在 C 中完成，不逐字节循环
+    diff = int.from_bytes(a[:n], 'big') ^ int.from_bytes(b[:n], 'big')
+    return n - (diff.bit_length() + 7) // 8
+
+def _write_parts(f, parts: List) -> None:
+    """将多个缓冲区完整地依次写入文件
+    
+    支持 os.writev 时用一次系统调用写出所有缓冲区，不需要先拼接成一个新的 bytes；
+    否则逐个写入。两种方式都会处理部分写入，因此可以用于无缓冲的文件对象。
+    
+    Args:
+        f: 以二进制模式打开的文件对象
+        parts: 字节缓冲区列表
+    """
+    f.flush()  # 先写出文件对象中缓冲的数据，保证顺序
+    views = [memoryview(part).cast('B') for part in parts]
+    if not hasattr(os, 'writev'):
+        for view in views:
+            while view:
+                view = view[f.write(view):]
+        return
+    fd = f.fileno()
+    while views:
+        written = os.writev(fd, views)
+        # 去掉已经完整写出的缓冲区，部分写出的缓冲区只保留剩余部分
+        while views and written >= len(views[0]):
+            written -= len(views[0])
+            views.pop(0)
+        if written:
+            views[0] = views[0][written:]
+
 class SSTableMetadata:
     """SSTable元数据"""
     
     def __init__(self, level: int, sequence: int, data_size: int, min_key: str, max_key: str,
-                 index_offset: int, bloom_offset: int):
+                 index_offset: int, bloom_offset: int, entry_count: int = 0):
         """初始化SSTable元数据
         
         Args:
@@ -21,6 +81,7 @@ class SSTableMetadata:
             max_key: 最大键
             index_offset: 索引区域的偏移量
             bloom_offset: 布隆过滤器的偏移量
+            entry_count: 键值对数量
         """
         self.level = level
         self.sequence = sequence
@@ -29,6 +90,7 @@ class SSTableMetadata:
         self.max_key = max_key
         self.index_offset = index_offset
         self.bloom_offset = bloom_offset
+        self.entry_count = entry_count
     
     def to_dict(self) -> dict:
         """转换为字典"""
@@ -39,7 +101,8 @@ class SSTableMetadata:
             'min_key': self.min_key,
             'max_key': self.max_key,
             'index_offset': self.index_offset,
-            'bloom_offset': self.bloom_offset
+            'bloom_offset': self.bloom_offset,
+            'entry_count': self.entry_count
         }
     
     @classmethod
@@ -52,8 +115,41 @@ class SSTableMetadata:
             min_key=data['min_key'],
             max_key=data['max_key'],
             index_offset=data['index_offset'],
-            bloom_offset=data['bloom_offset']
+            bloom_offset=data['bloom_offset'],
+            entry_count=data.get('entry_count', 0)
         )
+    
+    def to_bytes(self) -> bytes:
+        """序列化为定长二进制布局：定长字段 + 带 2 字节长度前缀的 min_key、max_key"""
+        min_key = self.min_key.encode('utf-8')
+        max_key = self.max_key.encode('utf-8')
+        return b''.join((
+            _META.pack(self.level, self.sequence, self.data_size,
+                       self.index_offset, self.bloom_offset, self.entry_count),
+            _KEY_LEN.pack(len(min_key)), min_key,
+            _KEY_LEN.pack(len(max_key)), max_key
+        ))
+    
+    @classmethod
+    def from_bytes(cls, data: bytes, offset: int = 0) -> 'SSTableMetadata':
+        """从二进制布局解析元数据
+        
+        Args:
+            data: 包含元数据的字节序列
+            offset: 元数据在 data 中的起始位置
+            
+        Returns:
+            解析出的元数据
+        """
+        level, sequence, data_size, index_offset, bloom_offset, entry_count = _META.unpack_from(data, offset)
+        pos = offset + _META.size
+        keys = []
+        for _ in range(2):
+            size, = _KEY_LEN.unpack_from(data, pos)
+            pos += _KEY_LEN.size
+            keys.append(data[pos:pos + size].decode('utf-8'))
+            pos += size
+        return cls(level, sequence, data_size, keys[0], keys[1], index_offset, bloom_offset, entry_count)
 
 class SSTable:
     """
@@ -61,12 +157,12 @@ class SSTable:
     
     文件布局：
     +----------------+  <- 0
-    |    Header     |  文件头(4KB)：魔数(4B) + 版本(4B) + 元数据
+    |    Header     |  文件头(4KB)：魔数(4B) + 版本(4B) + 二进制元数据（见 SSTableMetadata.to_bytes）
     +----------------+  <- 4KB
-    |     Data      |  数据区域：key_size(4B) + key + value_size(4B) + value
-    |      ...      |
+    |     Data      |  数据区域：shared(2B) + suffix_size(2B) + key[shared:] + value_size(4B) + value
+    |      ...      |  键做前缀压缩，只存与前一个键不同的后缀；每个索引项指向的记录是重启点，shared 为 0
     +----------------+  <- index_offset
-    |     Index     |  索引区域：稀疏索引，每N条记录一个索引项
+    |     Index     |  索引区域：稀疏索引（fence pointer），每N条记录一个索引项：key_size(2B) + key + offset(8B)
     |      ...      |
     +----------------+  <- bloom_offset
     |    Bloom      |  布隆过滤器
@@ -75,7 +171,12 @@ class SSTable:
     """
     
     # 常量定义
-    INDEX_INTERVAL = 128  # 每128条记录创建一个索引项
+    INDEX_INTERVAL = 128  # 默认每128条记录创建一个索引项
+    MAX_INDEX_ENTRIES = 8192  # 大表增大索引间隔，使索引项数量不超过这个值
+    WRITE_BUFFER_SIZE = 1 << 20  # 数据区写缓冲区大小，攒满后再写入文件
+    # 键 UTF-8 编码后的最大字节数：min_key 和 max_key 都要放进文件头的元数据，
+    # 这比键长度字段（2 字节）的上限更小。由 LSMTree.put 检查
+    MAX_KEY_SIZE = (default_config.SST_HEADER_SIZE - 8 - _META.size - 2 * _KEY_LEN.size) // 2
     
     def __init__(self, 
                  base_dir: str,
@@ -101,36 +202,35 @@ class SSTable:
         # 元数据
         self.metadata = None
         
-        # 索引
-        self.index = {}
-    
-    @classmethod
-    def _compare_keys(cls, key1: str, key2: str) -> int:
-        """比较两个键的大小
+        # 二分查找用的稀疏索引：按数据区顺序排列的 ((长度, 键) 列表, 偏移量数组)
+        self._sparse_index: Tuple[List[Tuple[int, str]], array] = ([], array('Q'))
         
-        先比较长度，长度相同时按字符串比较
+        # 整个文件的只读内存映射，读取直接在映射上切片
+        self._mm: Optional[mmap.mmap] = None
+    
+    def _map(self) -> mmap.mmap:
+        """以只读方式映射整个文件，并提示内核按随机访问处理"""
+        with open(self.file_path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # 定点查询是随机访问，关闭无用的预读；不支持 madvise 的平台忽略
+        if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_RANDOM'):
+            mm.madvise(mmap.MADV_RANDOM)
+        return mm
+    
+    def _set_index(self, keys: List[str], offsets: List[int]):
+        """设置稀疏索引
         
         Args:
-            key1: 第一个键
-            key2: 第二个键
-            
-        Returns:
-            如果key1 < key2返回-1
-            如果key1 == key2返回0
-            如果key1 > key2返回1
+            keys: 索引键，按数据区顺序排列
+            offsets: 每个索引键对应记录的偏移量
         """
-        # 先比较长度
-        len1, len2 = len(key1), len(key2)
-        if len1 < len2:
-            return -1
-        if len1 > len2:
-            return 1
-        # 长度相同时按字符串比较
-        if key1 < key2:
-            return -1
-        if key1 > key2:
-            return 1
-        return 0
+        self._sparse_index = ([(len(k), k) for k in keys], array('Q', offsets))
+    
+    @property
+    def index(self) -> Dict[str, int]:
+        """稀疏索引的字典视图（键 -> 偏移量），每次访问时构造，仅用于调试和统计"""
+        keys, offsets = self._sparse_index
+        return {key: offset for (_, key), offset in zip(keys, offsets)}
     
     @classmethod
     def create_from_memtable(cls,
@@ -148,7 +248,7 @@ class SSTable:
             base_name: SSTable文件名前缀
             level: SSTable所在层级
             sequence: 序列号
-            entries: 键值对迭代器，必须按键排序
+            entries: 键值对迭代器，必须按键排序；值可以是 str 或已编码的 bytes
             expected_entries: 预期的条目数量
             
         Returns:
@@ -162,68 +262,83 @@ class SSTable:
             optimal_hash_count = 7  # 使用固定的哈希函数个数
             table.filter = BloomFilter(optimal_size, optimal_hash_count)
             
-            # 写入文件头
-            with open(table.file_path, 'wb') as f:
-                # 写入魔数和版本号
-                f.write(default_config.SST_MAGIC_NUMBER)
-                f.write(struct.pack('>I', default_config.SST_VERSION))
-                
-                # 预留文件头空间
-                f.write(b'\0' * (default_config.SST_HEADER_SIZE - 8))
-            
             # 写入数据并创建索引
             data_offset = default_config.SST_HEADER_SIZE
             index_entries = []
             min_key = None
             max_key = None
             entry_count = 0
+            # 表越大索引间隔越大，内存中的索引项数量保持有界
+            interval = max(cls.INDEX_INTERVAL, expected_entries // cls.MAX_INDEX_ENTRIES)
             
-            with open(table.file_path, 'ab') as f:
+            # 整个构建过程只使用一个文件句柄，最后再回到文件头写入元数据。
+            # 数据已经在 buf 中按 WRITE_BUFFER_SIZE 攒批，文件对象不再额外缓冲一次
+            with open(table.file_path, 'w+b', buffering=0) as f:
+                # 写入魔数和版本号，并预留文件头空间
+                _write_parts(f, [
+                    default_config.SST_MAGIC_NUMBER,
+                    _PACK_U32(default_config.SST_VERSION),
+                    bytes(default_config.SST_HEADER_SIZE - 8)
+                ])
+                
+                buf = bytearray()
+                add_to_filter = table.filter.add
+                prev_key = b''
                 for key, value in entries:
                     # 更新键范围
                     if min_key is None:
                         min_key = key
                     max_key = key
                     
-                    # 添加到布隆过滤器
-                    table.filter.add(key)
+                    # 边写边加入布隆过滤器，不在内存中保留所有键
+                    add_to_filter(key)
                     
-                    # 写入键值对
+                    # 键值对追加到写缓冲区
                     key_bytes = key.encode('utf-8')
-                    value_bytes = value.encode('utf-8')
-                    key_size = len(key_bytes)
-                    value_size = len(value_bytes)
+                    # 合并时值直接以 bytes 传入，不再解码后重新编码
+                    value_bytes = value if type(value) is bytes else value.encode('utf-8')
                     
-                    record = struct.pack('>I', key_size) + key_bytes + struct.pack('>I', value_size) + value_bytes
-                    f.write(record)
+                    # 每个索引项处是重启点，保存完整的键，其余记录只保存与前一个键不同的后缀
+                    if entry_count % interval == 0:
+                        index_entries.append((key, data_offset))
+                        shared = 0
+                    else:
+                        shared = _shared_prefix_len(prev_key, key_bytes)
+                    prev_key = key_bytes
+                    suffix = key_bytes[shared:]
                     
-                    # 创建索引项
-                    if entry_count % cls.INDEX_INTERVAL == 0:
-                        index_entries.append({
-                            'key': key,
-                            'offset': data_offset,
-                            'size': len(record)
-                        })
+                    buf += _KEY_PREFIX.pack(shared, len(suffix))
+                    buf += suffix
+                    buf += _PACK_U32(len(value_bytes))
+                    buf += value_bytes
+                    if len(buf) >= cls.WRITE_BUFFER_SIZE:
+                        _write_parts(f, [buf])
+                        buf.clear()
                     
-                    data_offset += len(record)
+                    data_offset += 8 + len(suffix) + len(value_bytes)
                     entry_count += 1
+                _write_parts(f, [buf])
                 
                 if entry_count == 0:  # 没有数据，创建失败
                     os.remove(table.file_path)
                     return None
                 
-                # 写入索引
+                # 索引在内存中拼好，与布隆过滤器一起一次写入
                 index_offset = data_offset
-                for entry in index_entries:
-                    index_line = f"{entry['key']}\t{entry['offset']}\t{entry['size']}\n"
-                    f.write(index_line.encode('utf-8'))
-                
-                # 写入布隆过滤器
-                bloom_offset = f.tell()
-                # 写入布隆过滤器的大小和哈希函数个数
-                f.write(struct.pack('>II', table.filter.size, table.filter.hash_count))
-                # 写入位数组
-                f.write(table.filter.to_bytes())
+                index_parts = []
+                for index_key, offset in index_entries:
+                    key_bytes = index_key.encode('utf-8')
+                    index_parts.append(_KEY_LEN.pack(len(key_bytes)))
+                    index_parts.append(key_bytes)
+                    index_parts.append(_INDEX_OFFSET.pack(offset))
+                index_bytes = b''.join(index_parts)
+                bloom_offset = index_offset + len(index_bytes)
+                # 布隆过滤器的大小和哈希函数个数，以及位数组（直接使用位数组的视图，不复制）
+                _write_parts(f, [
+                    index_bytes,
+                    _BLOOM_HEADER.pack(table.filter.size, table.filter.hash_count),
+                    memoryview(table.filter.bit_array)
+                ])
                 
                 # 创建元数据
                 metadata = SSTableMetadata(
@@ -233,209 +348,249 @@ class SSTable:
                     min_key=min_key,
                     max_key=max_key,
                     index_offset=index_offset,
-                    bloom_offset=bloom_offset
+                    bloom_offset=bloom_offset,
+                    entry_count=entry_count
                 )
                 
                 # 写入元数据到文件头
-                metadata_json = json.dumps(metadata.to_dict())
-                metadata_bytes = metadata_json.encode('utf-8')
+                metadata_bytes = metadata.to_bytes()
                 if len(metadata_bytes) > default_config.SST_HEADER_SIZE - 8:
                     raise ValueError("Metadata too large for header")
                 
-                # 使用 'r+b' 模式重写文件头
-                with open(table.file_path, 'r+b') as header_file:
-                    header_file.seek(8)  # 跳过魔数和版本号
-                    header_file.write(metadata_bytes)
-                    header_file.write(b'\0' * (default_config.SST_HEADER_SIZE - 8 - len(metadata_bytes)))
+                # 回到文件头，跳过魔数和版本号，写入元数据（其余部分已经是 0）
+                f.seek(8)
+                _write_parts(f, [metadata_bytes])
+                # 整个文件只在最后同步一次，之后才能安全地删除 WAL
+                _sync(f.fileno())
             
             table.metadata = metadata
             # 加载索引到内存
-            table.index = {entry['key']: (entry['offset'], entry['size']) for entry in index_entries}
+            table._set_index([index_key for index_key, _ in index_entries],
+                             [offset for _, offset in index_entries])
+            table._mm = table._map()
             return table
             
         except Exception as e:
             print(f"Error creating SSTable: {e}")
-            if os.path.exists(table.file_path):
-                try:
-                    os.remove(table.file_path)
-                except:
-                    pass
+            try:
+                os.remove(table.file_path)
+            except OSError:
+                pass
             return None
 
     def load(self) -> bool:
         """加载SSTable
         
         Returns:
-            是否成功加载
+            是否成功加载，文件损坏时返回 False
+            
+        Raises:
+            ValueError: 文件是其他版本的格式写入的，不能按当前格式读取
         """
         try:
-            with open(self.file_path, 'rb') as f:
-                # 验证魔数
-                magic = f.read(4)
-                if magic != default_config.SST_MAGIC_NUMBER:
-                    print("Invalid magic number")
-                    return False
-                
-                # 验证版本号
-                version = struct.unpack('>I', f.read(4))[0]
-                if version != default_config.SST_VERSION:
-                    print("Invalid version")
-                    return False
-                
-                # 读取元数据
-                metadata_bytes = f.read(default_config.SST_HEADER_SIZE - 8)
-                try:
-                    # 找到第一个 null 字节的位置
-                    null_pos = metadata_bytes.find(b'\0')
-                    if null_pos == -1:
-                        null_pos = len(metadata_bytes)
-                    metadata_json = metadata_bytes[:null_pos].decode('utf-8')
-                    if not metadata_json:
-                        print("Empty metadata")
-                        return False
-                    self.metadata = SSTableMetadata.from_dict(json.loads(metadata_json))
-                except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                    print(f"Failed to parse metadata: {e}")
-                    return False
-                
-                # 加载索引
-                f.seek(self.metadata.index_offset)
-                index_data = f.read(self.metadata.bloom_offset - self.metadata.index_offset)
-                self.index = {}
-                for line in index_data.decode('utf-8').splitlines():
-                    if line.strip():
-                        key, offset, size = line.split('\t')
-                        self.index[key] = (int(offset), int(size))
-                
-                # 加载布隆过滤器
-                f.seek(self.metadata.bloom_offset)
-                # 读取布隆过滤器的大小和哈希函数个数
-                size, hash_count = struct.unpack('>II', f.read(8))
-                # 读取布隆过滤器的位数组数据
-                filter_data = f.read()
-                # 使用读取的参数创建布隆过滤器
-                self.filter = BloomFilter.from_bytes(filter_data, size, hash_count)
-                
-                return True
+            mm = self._map()
+        except Exception as e:
+            print(f"Failed to load SSTable: {e}")
+            return False
+        # 直接在文件头上解析，不需要额外的读取
+        header = mm[:default_config.SST_HEADER_SIZE]
+        
+        # 验证魔数
+        if len(header) < 8 or header[:4] != default_config.SST_MAGIC_NUMBER:
+            print("Invalid magic number")
+            return False
+        
+        # 验证版本号：旧格式的文件不是损坏，跳过它会让其中的数据悄悄丢失，因此直接报错
+        version = _UNPACK_U32(header, 4)[0]
+        if version != default_config.SST_VERSION:
+            mm.close()
+            raise ValueError(f"Unsupported SSTable version {version} in {self.file_path}, "
+                             f"expected {default_config.SST_VERSION}")
+        
+        try:
+            # 解析元数据
+            try:
+                metadata = SSTableMetadata.from_bytes(header, 8)
+            except (struct.error, UnicodeDecodeError) as e:
+                print(f"Failed to parse metadata: {e}")
+                return False
+            
+            # 加载索引
+            index_data = mm[metadata.index_offset:metadata.bloom_offset]
+            keys, offsets = [], []
+            pos = 0
+            while pos < len(index_data):
+                key_size, = _KEY_LEN.unpack_from(index_data, pos)
+                pos += _KEY_LEN.size
+                keys.append(index_data[pos:pos + key_size].decode('utf-8'))
+                pos += key_size
+                offsets.append(_INDEX_OFFSET.unpack_from(index_data, pos)[0])
+                pos += _INDEX_OFFSET.size
+            
+            # 加载布隆过滤器：大小和哈希函数个数，之后是位数组
+            size, hash_count = _BLOOM_HEADER.unpack_from(mm, metadata.bloom_offset)
+            filter_data = mm[metadata.bloom_offset + 8:]
+            
+            self.metadata = metadata
+            self._set_index(keys, offsets)
+            self.filter = BloomFilter.from_bytes(filter_data, size, hash_count)
+            self._mm = mm
+            return True
         except Exception as e:
             print(f"Failed to load SSTable: {e}")
             return False
     
-    def get(self, key: str) -> Optional[str]:
-        """从SSTable中获取值"""
-        if not self.metadata or not self.filter:
+    def get(self, key: str, hashed: Optional[Tuple[int, int]] = None) -> Optional[str]:
+        """从SSTable中获取值
+        
+        Args:
+            key: 键
+            hashed: 预先计算的 BloomFilter.hash(key)，为 None 时现场计算
+            
+        Returns:
+            键对应的值，不存在返回 None
+        """
+        metadata, bloom = self.metadata, self.filter
+        if not metadata or not bloom:
             return None
         
-        # 检查布隆过滤器
-        if not self.filter.contains(key):
+        # 先用键范围排除，比布隆过滤器的哈希和探测更便宜
+        target = (len(key), key)
+        min_key, max_key = metadata.min_key, metadata.max_key
+        if target < (len(min_key), min_key) or target > (len(max_key), max_key):
             return None
         
-        # 二分查找最近的索引项
-        index_keys = sorted(self.index.keys())
-        if not index_keys:
+        # 检查布隆过滤器
+        if hashed is None:
+            hashed = BloomFilter.hash(key)
+        if not bloom.contains_hash(hashed):
             return None
+        return self._get_prechecked(key)
+    
+    def _get_prechecked(self, key: str) -> Optional[str]:
+        """跳过键范围和布隆过滤器检查，直接在数据区查找
         
-        # 找到小于等于目标key的最大索引项
-        left, right = 0, len(index_keys) - 1
-        while left <= right:
-            mid = (left + right) // 2
-            if self._compare_keys(index_keys[mid], key) <= 0:
-                left = mid + 1
-            else:
-                right = mid - 1
+        供 LSMTree._probe_sstables 使用，它在调用前已经做过这两项检查。
         
-        if right < 0:
+        Args:
+            key: 键
+            
+        Returns:
+            键对应的值，不存在返回 None
+        """
+        # 先取出局部引用，读取过程中即使被并发 close 也不受影响
+        metadata, mm = self.metadata, self._mm
+        index_keys, index_offsets = self._sparse_index
+        if not metadata or mm is None:
             return None
         
-        # 获取索引项信息
-        index_key = index_keys[right]
-        start_offset = self.index[index_key][0]
+        target = (len(key), key)
+        # 二分查找小于等于目标key的最大索引项，索引键与数据区相同按先长度后字典序排列
+        block = bisect_right(index_keys, target) - 1
+        if block < 0:
+            return None
+        pos = index_offsets[block]
+        # 键只可能出现在这个索引项到下一个索引项之间
+        end = index_offsets[block + 1] if block + 1 < len(index_offsets) else metadata.index_offset
         
-        # 从数据区域顺序查找
-        with open(self.file_path, 'rb') as f:
-            f.seek(start_offset)
-            while f.tell() < self.metadata.index_offset:
-                try:
-                    # 读取键
-                    key_size_bytes = f.read(4)
-                    if not key_size_bytes:
-                        break
-                    key_size = struct.unpack('>I', key_size_bytes)[0]
-                    curr_key = f.read(key_size).decode('utf-8')
-                    
-                    # 读取值
-                    value_size_bytes = f.read(4)
-                    if not value_size_bytes:
-                        break
-                    value_size = struct.unpack('>I', value_size_bytes)[0]
-                    
-                    if curr_key == key:
-                        value_bytes = f.read(value_size)
-                        if len(value_bytes) != value_size:
-                            return None
-                        return value_bytes.decode('utf-8')
-                    elif self._compare_keys(curr_key, key) > 0:
-                        break
-                    else:
-                        f.seek(value_size, 1)  # 跳过值
-                except (struct.error, UnicodeDecodeError):
-                    break  # 处理文件末尾或损坏的情况
+        # 从重启点开始逐条还原前缀压缩的键，按字节比较查找，只解码命中的值
+        key_bytes = key.encode('utf-8')
+        prev_key = b''
+        try:
+            while pos < end:
+                shared, suffix_size = _KEY_PREFIX.unpack_from(mm, pos)
+                pos += 4
+                prev_key = prev_key[:shared] + mm[pos:pos + suffix_size]
+                pos += suffix_size
+                
+                # 读取值大小
+                value_size = _UNPACK_U32(mm, pos)[0]
+                pos += 4
+                
+                if prev_key == key_bytes:
+                    value_bytes = mm[pos:pos + value_size]
+                    if len(value_bytes) != value_size:
+                        return None
+                    return value_bytes.decode('utf-8')
+                pos += value_size  # 跳过值
+        except (struct.error, UnicodeDecodeError):
+            pass  # 处理文件末尾或损坏的情况
         
         return None
     
     def range_scan(self, start_key: str, end_key: str) -> Iterator[Tuple[str, str]]:
         """范围查询"""
-        if not self.metadata:
+        for key, value in self._scan(start_key, end_key):
+            yield key, value.decode('utf-8')
+    
+    def scan_raw(self) -> Iterator[Tuple[str, bytes]]:
+        """顺序遍历所有键值对，值保持为未解码的 bytes，供合并时直接写入新的 SSTable"""
+        metadata, mm = self.metadata, self._mm
+        if not metadata:
+            return iter(())
+        # 映射按随机访问关闭了预读，整表扫描前提示内核预读整个数据区
+        if mm is not None and hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+            mm.madvise(mmap.MADV_WILLNEED, 0, metadata.index_offset)
+        return self._scan(metadata.min_key, metadata.max_key)
+    
+    def _scan(self, start_key: str, end_key: str) -> Iterator[Tuple[str, bytes]]:
+        """范围扫描，返回键和未解码的值"""
+        metadata, mm = self.metadata, self._mm
+        index_keys, index_offsets = self._sparse_index
+        if not metadata or mm is None:
             return
         
+        # 与数据区相同的先长度后字典序，元组比较在 C 中完成
+        lower = (len(start_key), start_key)
+        upper = (len(end_key), end_key)
+        
         # 检查是否与查询范围有交集
-        if (self._compare_keys(start_key, self.metadata.max_key) > 0 or
-            self._compare_keys(end_key, self.metadata.min_key) < 0):
+        if (lower > (len(metadata.max_key), metadata.max_key) or
+                upper < (len(metadata.min_key), metadata.min_key)):
             return
         
-        # 从数据区域开始扫描
-        with open(self.file_path, 'rb') as f:
-            f.seek(default_config.SST_HEADER_SIZE)  # 从数据区域开始
-            while f.tell() < self.metadata.index_offset:
-                try:
-                    # 读取键
-                    key_size_bytes = f.read(4)
-                    if not key_size_bytes:
-                        break
-                    key_size = struct.unpack('>I', key_size_bytes)[0]
-                    key = f.read(key_size).decode('utf-8')
-                    
-                    # 读取值大小
-                    value_size_bytes = f.read(4)
-                    if not value_size_bytes:
-                        break
-                    value_size = struct.unpack('>I', value_size_bytes)[0]
-                    
-                    # 检查键是否在范围内
-                    if self._compare_keys(key, start_key) >= 0 and self._compare_keys(key, end_key) <= 0:
-                        # 读取值
-                        value = f.read(value_size).decode('utf-8')
-                        yield key, value
-                    elif self._compare_keys(key, end_key) > 0:
-                        # 如果超出范围，提前结束
-                        break
-                    else:
-                        # 跳过值
-                        f.seek(value_size, 1)
-                except (struct.error, UnicodeDecodeError) as e:
-                    print(f"Error during range scan: {e}")
+        # 用稀疏索引定位到可能包含 start_key 的数据段，跳过之前的所有记录
+        block = bisect_right(index_keys, lower) - 1
+        pos = index_offsets[block] if block >= 0 else default_config.SST_HEADER_SIZE
+        end = metadata.index_offset
+        key_bytes = b''
+        try:
+            while pos < end:
+                # 读取键，用前一个键的前缀加上本条记录的后缀还原
+                shared, suffix_size = _KEY_PREFIX.unpack_from(mm, pos)
+                pos += 4
+                key_bytes = key_bytes[:shared] + mm[pos:pos + suffix_size]
+                key = key_bytes.decode('utf-8')
+                pos += suffix_size
+                
+                # 读取值大小
+                value_size = _UNPACK_U32(mm, pos)[0]
+                pos += 4
+                
+                # 检查键是否在范围内
+                sort_key = (len(key), key)
+                if sort_key > upper:
+                    # 如果超出范围，提前结束
                     break
+                if sort_key >= lower:
+                    yield key, mm[pos:pos + value_size]
+                pos += value_size
+        except (struct.error, UnicodeDecodeError) as e:
+            print(f"Error during range scan: {e}")
     
     def close(self):
         """关闭SSTable，释放资源"""
         self.filter = None
         self.metadata = None
-        self.index = {}
+        self._sparse_index = ([], array('Q'))
+        # 只释放引用：正在读取的线程仍持有映射，最后一个引用消失时映射自动关闭
+        self._mm = None
     
     def delete(self):
         """删除SSTable文件"""
         try:
-            if os.path.exists(self.file_path):
-                os.remove(self.file_path)
+            os.remove(self.file_path)
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"Failed to delete SSTable: {e}")
@@ -1,7 +1,34 @@
+import os
 import random
 import string
+from functools import lru_cache
 from typing import List, Tuple
 
+_ALPHABET = string.ascii_letters + string.digits
+
+# 随机字节到字母表的映射表：每个字符对应 4 个字节值；248 及以上的字节直接丢弃，
+# 保证每个字符出现的概率相同
+_BYTE_TABLE = (_ALPHABET * 5)[:256].encode('ascii')
+_REJECTED_BYTES = bytes(range(len(_ALPHABET) * 4, 256))
+
+def generate_random_bytes(length: int) -> bytes:
+    """生成指定长度的随机 ASCII 字节串，字符集与 generate_random_string 相同
+    
+    结果可以直接写入 WAL，不需要再编码。随机字节由 os.urandom 一次取出，映射由 bytes.translate 完成
+    
+    Args:
+        length: 字节串长度
+        
+    Returns:
+        随机字节串
+    """
+    chars = b''
+    while len(chars) < length:
+        # 多取一些字节补偿被丢弃的部分，通常一次就够
+        need = length - len(chars)
+        chars += os.urandom(need + need // 16 + 8).translate(_BYTE_TABLE, _REJECTED_BYTES)
+    return chars[:length]
+
 def generate_random_string(length: int) -> str:
     """生成指定长度的随机字符串
     
@@ -11,38 +38,56 @@ def generate_random_string(length: int) -> str:
     Returns:
         随机字符串
     """
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+    return generate_random_bytes(length).decode('ascii')
 
-def generate_sequential_kv_pairs(count: int) -> List[Tuple[str, str]]:
+def generate_random_strings(count: int, length: int) -> List[str]:
+    """一次生成多个指定长度的随机字符串，所有字符来自同一批随机字节
+    
+    Args:
+        count: 字符串数量
+        length: 每个字符串的长度
+        
+    Returns:
+        随机字符串列表
+    """
+    chars = generate_random_string(count * length)
+    return [chars[start:start + length] for start in range(0, count * length, length)]
+
+@lru_cache(maxsize=None)
+def generate_sequential_kv_pairs(count: int) -> Tuple[Tuple[str, str], ...]:
     """生成顺序的键值对
     
+    相同参数的结果会被缓存并在调用之间共用，因此返回不可修改的元组，需要修改时先转成 list。
+    
     Args:
         count: 键值对数量
         
     Returns:
-        键值对列表，键为 "key_00000001" 格式
+        键值对元组，键为 "key_00000001" 格式
     """
-    pairs = []
-    for i in range(count):
-        key = f"key_{i:08d}"
-        value = f"value_{i:08d}"
-        pairs.append((key, value))
-    return pairs
+    return tuple((f"key_{i:08d}", f"value_{i:08d}") for i in range(count))
 
-def generate_random_kv_pairs(count: int, key_length: int = 16, value_length: int = 100) -> List[Tuple[str, str]]:
+@lru_cache(maxsize=None)
+def generate_random_kv_pairs(count: int, key_length: int = 16, value_length: int = 100,
+                             seed: int = 0) -> Tuple[Tuple[str, str], ...]:
     """生成随机的键值对
     
+    使用固定种子的独立随机数生成器，相同参数总是得到相同的数据；结果会被缓存并在调用之间共用，
+    因此返回不可修改的元组，需要修改时先转成 list。
+    
     Args:
         count: 键值对数量
         key_length: 键长度
         value_length: 值长度
+        seed: 随机种子
         
     Returns:
-        随机键值对列表
+        随机键值对元组
     """
-    pairs = []
-    for _ in range(count):
-        key = generate_random_string(key_length)
-        value = generate_random_string(value_length)
-        pairs.append((key, value))
-    return pairs
+    # 一次生成所有字符再按定长切片，避免每个键值对各调用两次 random.choices
+    record_length = key_length + value_length
+    chars = ''.join(random.Random(seed).choices(_ALPHABET, k=count * record_length))
+    return tuple(
+        (chars[start:start + key_length], chars[start + key_length:start + record_length])
+        for start in range(0, count * record_length, record_length)
+    )
@@ -1,14 +1,25 @@
 import os
 import json
-from typing import Dict, Optional, Iterator, Tuple, List
+from typing import Dict, Iterable, Optional, Iterator, Tuple, List, Union
 from ..file_manager.manager import FileManager
 
 import os
 import struct
+import threading
 from typing import Iterator, Tuple, Dict
 
+_U32 = struct.Struct('>I')  # 记录中的 4 字节长度前缀
+_PACK_U32 = _U32.pack
+_UNPACK_U32 = _U32.unpack
+_WRITE_BUFFER_SIZE = 1024 * 1024  # 文件写缓冲区大小，未同步的小记录攒够后才调用一次 write
+
 class WAL:
-    """预写日志（Write-Ahead Log）实现"""
+    """预写日志（Write-Ahead Log）实现
+    
+    写入只进入文件缓冲区，需要持久化时调用 commit() 或使用 sync=True。
+    多个线程同时等待持久化时采用组提交：由第一个等待者执行一次 fsync，
+    覆盖在此之前写入的所有记录，其余等待者直接共享这次 fsync 的结果。
+    """
     
     def __init__(self, directory: str):
         """初始化WAL
@@ -19,35 +30,98 @@ class WAL:
         self.directory = directory
         self.file_path = os.path.join(directory, "wal")
         self.file = None
+        # 保护文件写入和组提交状态
+        self._lock = threading.Lock()
+        self._commit_cv = threading.Condition(self._lock)
+        self._written = 0  # 已写入的记录数
+        self._synced = 0  # 已确认落盘的记录数
+        self._syncing = False  # 是否有线程正在执行 fsync
         self._open()
     
     def _open(self):
         """打开WAL文件"""
         # 确保目录存在
         os.makedirs(self.directory, exist_ok=True)
-        # 以追加模式打开文件
-        self.file = open(self.file_path, 'ab')
+        # 以追加模式打开文件，使用较大的写缓冲区；commit() 和同步写入在 fsync 前会先 flush
+        self.file = open(self.file_path, 'ab', buffering=_WRITE_BUFFER_SIZE)
     
-    def append(self, key: str, value: str):
+    def append(self, key: Union[str, bytes], value: Union[str, bytes], sync: bool = False):
         """追加一条记录
         
         Args:
-            key: 键
-            value: 值。空字符串表示删除操作
+            key: 键，str 或已编码的 bytes
+            value: 值，str 或已编码的 bytes。空字符串表示删除操作
+            sync: 是否等待记录落盘后再返回
         """
-        # 将键值对编码为字节
-        key_bytes = key.encode('utf-8')
-        value_bytes = value.encode('utf-8')
+        # 将键值对编码为字节，已经是 bytes 的不再编码
+        key_bytes = key if type(key) is bytes else key.encode('utf-8')
+        value_bytes = value if type(value) is bytes else value.encode('utf-8')
         
-        # 写入格式：key_size(4字节) + key + value_size(4字节) + value
-        self.file.write(struct.pack('>I', len(key_bytes)))
-        self.file.write(key_bytes)
-        self.file.write(struct.pack('>I', len(value_bytes)))
-        self.file.write(value_bytes)
+        # 写入格式：key_size(4字节) + key + value_size(4字节) + value，拼好后一次写入
+        record = b''.join((_PACK_U32(len(key_bytes)), key_bytes,
+                           _PACK_U32(len(value_bytes)), value_bytes))
+        with self._commit_cv:
+            self.file.write(record)
+            self._written += 1
+            if sync:
+                self._wait_synced(self._written)
+    
+    def commit(self):
+        """确保此前写入的所有记录都已落盘"""
+        with self._commit_cv:
+            self._wait_synced(self._written)
+    
+    def _wait_synced(self, target: int):
+        """等待前 target 条记录落盘，调用方持有 _commit_cv
+        
+        没有线程在 fsync 时由当前线程执行 fsync，fsync 期间释放锁，
+        让其他线程继续写入并排队等待下一次组提交。
+        
+        Args:
+            target: 需要落盘的记录数
+        """
+        while self._synced < target:
+            if self._syncing:
+                self._commit_cv.wait()
+                continue
+            self._syncing = True
+            written = self._written
+            self.file.flush()
+            fd = self.file.fileno()
+            self._lock.release()
+            try:
+                os.fsync(fd)
+            finally:
+                self._lock.acquire()
+                self._syncing = False
+                self._commit_cv.notify_all()
+            self._synced = max(self._synced, written)
+    
+    def append_many(self, entries: Iterable[Tuple[Union[str, bytes], Union[str, bytes]]]):
+        """批量追加记录，整批只调用一次 write 和一次 fsync
+        
+        Args:
+            entries: 键值对的可迭代对象（列表或生成器），键和值可以是 str 或已编码的 bytes
+        """
+        # 先在内存中拼好整批记录，再一次性写入；entries 可能是生成器，边遍历边计数
+        buf = bytearray()
+        count = 0
+        for key, value in entries:
+            key_bytes = key if type(key) is bytes else key.encode('utf-8')
+            value_bytes = value if type(value) is bytes else value.encode('utf-8')
+            buf += _PACK_U32(len(key_bytes))
+            buf += key_bytes
+            buf += _PACK_U32(len(value_bytes))
+            buf += value_bytes
+            count += 1
+        if not count:
+            return
         
-        # 确保写入磁盘
-        self.file.flush()
-        os.fsync(self.file.fileno())
+        with self._commit_cv:
+            self.file.write(buf)
+            self._written += count
+            # 确保写入磁盘
+            self._wait_synced(self._written)
     
     def recover(self) -> Iterator[Tuple[str, str]]:
         """从WAL文件中恢复数据。
@@ -75,7 +149,7 @@ class WAL:
                                 break
                             
                             # 读取键
-                            key_size = struct.unpack('>I', key_size_bytes)[0]
+                            key_size = _UNPACK_U32(key_size_bytes)[0]
                             if key_size <= 0 or key_size > 1024 * 1024:  # 键的大小不合理
                                 print(f"Invalid key size: {key_size}")
                                 break
@@ -96,7 +170,7 @@ class WAL:
                             if len(value_size_bytes) < 4:  # 文件损坏
                                 print("Incomplete value size")
                                 break
-                            value_size = struct.unpack('>I', value_size_bytes)[0]
+                            value_size = _UNPACK_U32(value_size_bytes)[0]
                             
                             if value_size < 0 or value_size > 1024 * 1024 * 10:  # 值的大小不合理
                                 print(f"Invalid value size: {value_size}")
@@ -123,8 +197,8 @@ class WAL:
             except IOError as e:
                 print(f"Error during WAL recovery: {e}")
         
-        # 返回所有键值对
-        result = [(key, value) for key, value in sorted(latest_values.items())]
+        # 返回所有键值对；sorted 已经生成列表，list(recover()) 会按迭代器的长度提示一次分配好空间
+        result = sorted(latest_values.items())
         
         # 重新打开文件以供写入
         self._open()
@@ -133,9 +207,10 @@ class WAL:
     
     def close(self):
         """关闭WAL文件"""
-        if self.file:
-            self.file.close()
-            self.file = None
+        with self._lock:
+            if self.file:
+                self.file.close()
+                self.file = None
     
     def delete(self):
         """删除WAL文件"""
@@ -1,9 +1,12 @@
-from typing import Any, List, Optional, Tuple
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterator, List, Optional, Tuple
 
 class BPlusNode:
     def __init__(self, is_leaf: bool = False, order: int = 4):
         self.is_leaf = is_leaf
         self.keys: List[Any] = []
+        # Leaf nodes keep values parallel to keys so keys can be bisected directly
+        self.values: List[Any] = []
         self.children: List[BPlusNode] = []
         self.next: Optional[BPlusNode] = None
         self.order = order
@@ -17,6 +20,7 @@ class BPlusTree:
         self.order = order
 
     def insert(self, key: Any, value: Any):
+        """Insert a key-value pair, replacing the value if the key already exists."""
         # If root is full, create new root
         if self.root.is_full():
             new_root = BPlusNode(is_leaf=False, order=self.order)
@@ -24,7 +28,79 @@ class BPlusTree:
             self._split_child(new_root, 0)
             self.root = new_root
 
-        self._insert_non_full(self.root, key, value)
+        # Descend iteratively, splitting full children on the way down
+        node = self.root
+        while not node.is_leaf:
+            i = bisect_right(node.keys, key)
+            if node.children[i].is_full():
+                self._split_child(node, i)
+                if key >= node.keys[i]:
+                    i += 1
+            node = node.children[i]
+
+        i = bisect_left(node.keys, key)
+        if i < len(node.keys) and node.keys[i] == key:
+            node.values[i] = value
+        else:
+            node.keys.insert(i, key)
+            node.values.insert(i, value)
+
+    def bulk_load(self, items: List[Tuple[Any, Any]]):
+        """Insert key-value pairs sorted by key; later pairs win on duplicate keys.
+
+        An empty tree is built bottom-up from packed leaves instead of
+        descending from the root once per key.
+        """
+        if self.root.keys or not self.root.is_leaf:
+            for key, value in items:
+                self.insert(key, value)
+            return
+
+        keys: List[Any] = []
+        values: List[Any] = []
+        for key, value in items:
+            if keys and keys[-1] == key:
+                values[-1] = value
+            else:
+                keys.append(key)
+                values.append(value)
+        if not keys:
+            return
+
+        # Build leaves, then each internal level, spreading entries evenly so
+        # that no node ends up under-full
+        order = self.order
+        level = []
+        for start, end in self._chunks(len(keys), order - 1):
+            leaf = BPlusNode(is_leaf=True, order=order)
+            leaf.keys = keys[start:end]
+            leaf.values = values[start:end]
+            if level:
+                level[-1][0].next = leaf
+            level.append((leaf, leaf.keys[0]))
+
+        while len(level) > 1:
+            parents = []
+            for start, end in self._chunks(len(level), order):
+                node = BPlusNode(is_leaf=False, order=order)
+                node.children = [child for child, _ in level[start:end]]
+                node.keys = [low for _, low in level[start + 1:end]]
+                parents.append((node, level[start][1]))
+            level = parents
+        self.root = level[0][0]
+
+    @staticmethod
+    def _chunks(count: int, capacity: int) -> List[Tuple[int, int]]:
+        """Split range(count) into the fewest near-equal runs of at most capacity."""
+        groups = -(-count // capacity)
+        size, extra = divmod(count, groups)
+        bounds = []
+        start = 0
+        for i in range(groups):
+            end = start + size + (1 if i < extra else 0)
+            bounds.append((start, end))
+            start = end
+        return bounds
 
     def _split_child(self, parent: BPlusNode, child_index: int):
         order = self.order
@@ -35,12 +111,14 @@ class BPlusTree:
         if child.is_leaf:
             mid = (order - 1) // 2
             new_node.keys = child.keys[mid:]
+            new_node.values = child.values[mid:]
             child.keys = child.keys[:mid]
-            
+            child.values = child.values[:mid]
+
             # Update leaf node links
             new_node.next = child.next
             child.next = new_node
-            
+
             # Insert the first key of new node into parent
             parent.keys.insert(child_index, new_node.keys[0])
             parent.children.insert(child_index + 1, new_node)
@@ -49,68 +127,117 @@ class BPlusTree:
             mid = (order - 1) // 2
             new_node.keys = child.keys[mid + 1:]
             new_node.children = child.children[mid + 1:]
-            
+
             parent.keys.insert(child_index, child.keys[mid])
             parent.children.insert(child_index + 1, new_node)
-            
+
             child.keys = child.keys[:mid]
             child.children = child.children[:mid + 1]
 
-    def _insert_non_full(self, node: BPlusNode, key: Any, value: Any):
-        i = len(node.keys) - 1
+    def delete(self, key: Any) -> bool:
+        """Delete a key, returning whether it was present."""
+        # Descend iteratively, remembering the path for rebalancing
+        path = []
+        node = self.root
+        while not node.is_leaf:
+            i = bisect_right(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+
+        i = bisect_left(node.keys, key)
+        if i == len(node.keys) or node.keys[i] != key:
+            return False
+        del node.keys[i]
+        del node.values[i]
+
+        # Fix underflows bottom-up; separators equal to the deleted key stay valid bounds
+        min_keys = max(1, (self.order - 1) // 2)
+        while path and len(node.keys) < min_keys:
+            parent, child_index = path.pop()
+            self._rebalance(parent, child_index, min_keys)
+            node = parent
+
+        # Shrink the tree when the root is left with a single child
+        while not self.root.is_leaf and not self.root.keys:
+            self.root = self.root.children[0]
+        return True
+
+    def _rebalance(self, parent: BPlusNode, child_index: int, min_keys: int):
+        """Borrow from a sibling of an underfull child, or merge it with one."""
+        child = parent.children[child_index]
+        left = parent.children[child_index - 1] if child_index > 0 else None
+        right = parent.children[child_index + 1] if child_index + 1 < len(parent.children) else None
+
+        if left is not None and len(left.keys) > min_keys:
+            if child.is_leaf:
+                child.keys.insert(0, left.keys.pop())
+                child.values.insert(0, left.values.pop())
+                parent.keys[child_index - 1] = child.keys[0]
+            else:
+                child.keys.insert(0, parent.keys[child_index - 1])
+                parent.keys[child_index - 1] = left.keys.pop()
+                child.children.insert(0, left.children.pop())
+            return
+
+        if right is not None and len(right.keys) > min_keys:
+            if child.is_leaf:
+                child.keys.append(right.keys.pop(0))
+                child.values.append(right.values.pop(0))
+                parent.keys[child_index] = right.keys[0]
+            else:
+                child.keys.append(parent.keys[child_index])
+                parent.keys[child_index] = right.keys.pop(0)
+                child.children.append(right.children.pop(0))
+            return
 
-        if node.is_leaf:
-            while i >= 0 and key < node.keys[i]:
-                i -= 1
-            node.keys.insert(i + 1, (key, value))
+        # Neither sibling can spare a key: merge with one of them
+        if left is None and right is None:
+            return
+        if left is not None:
+            separator = child_index - 1
+            left, right = left, child
         else:
-            while i >= 0 and key < node.keys[i]:
-                i -= 1
-            i += 1
-            
-            if node.children[i].is_full():
-                self._split_child(node, i)
-                if key > node.keys[i]:
-                    i += 1
-                    
-            self._insert_non_full(node.children[i], key, value)
+            separator = child_index
+            left, right = child, right
+
+        if left.is_leaf:
+            left.keys.extend(right.keys)
+            left.values.extend(right.values)
+            left.next = right.next
+        else:
+            left.keys.append(parent.keys[separator])
+            left.keys.extend(right.keys)
+            left.children.extend(right.children)
+        del parent.keys[separator]
+        del parent.children[separator + 1]
 
     def search(self, key: Any) -> Optional[Any]:
-        return self._search(self.root, key)
-
-    def _search(self, node: BPlusNode, key: Any) -> Optional[Any]:
-        i = 0
-        while i < len(node.keys) and key > node.keys[i]:
-            i += 1
-
-        if node.is_leaf:
-            if i < len(node.keys) and node.keys[i][0] == key:
-                return node.keys[i][1]
-            return None
-        
-        if i < len(node.keys) and key == node.keys[i]:
-            i += 1
-        return self._search(node.children[i], key)
+        node = self._find_leaf(self.root, key)
+        i = bisect_left(node.keys, key)
+        if i < len(node.keys) and node.keys[i] == key:
+            return node.values[i]
+        return None
 
     def range_search(self, start_key: Any, end_key: Any) -> List[Tuple[Any, Any]]:
         """Search for all key-value pairs within the given range."""
-        result = []
+        return list(self.iter_range(start_key, end_key))
+
+    def iter_range(self, start_key: Any, end_key: Any) -> Iterator[Tuple[Any, Any]]:
+        """Lazily yield the key-value pairs within the given range in key order."""
         node = self._find_leaf(self.root, start_key)
-        
+        i = bisect_left(node.keys, start_key)
+
         while node:
-            for key, value in node.keys:
-                if start_key <= key <= end_key:
-                    result.append((key, value))
-                elif key > end_key:
-                    return result
+            keys, values = node.keys, node.values
+            for j in range(i, len(keys)):
+                if keys[j] > end_key:
+                    return
+                yield keys[j], values[j]
             node = node.next
-        return result
+            i = 0
 
     def _find_leaf(self, node: BPlusNode, key: Any) -> BPlusNode:
-        if node.is_leaf:
-            return node
-            
-        i = 0
-        while i < len(node.keys) and key >= node.keys[i]:
-            i += 1
-        return self._find_leaf(node.children[i], key)
+        # Keys equal to a separator live in the right subtree
+        while not node.is_leaf:
+            node = node.children[bisect_right(node.keys, key)]
+        return node
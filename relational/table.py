@@ -1,4 +1,4 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from dataclasses import dataclass
 from .bplus_tree import BPlusTree
 from lsm.lsm import LSMTree
@@ -14,39 +14,59 @@ class Table:
     def __init__(self, name: str, columns: List[Column], lsm_path: str):
         self.name = name
         self.columns = {col.name: col for col in columns}
+        # Column name -> nullable flag, the only schema data row validation needs
+        self._column_nullable = {col.name: col.nullable for col in columns}
         self.primary_key_col = next((col for col in columns if col.primary_key), None)
+        if not self.primary_key_col:
+            raise ValueError("No primary key defined for table")
+        self._pk_name = self.primary_key_col.name
         
         # Initialize storage
         self.lsm_store = LSMTree(lsm_path)
-        self.index = BPlusTree(order=4)  # B+ tree index for primary key
-        
-        # Load existing data into index
-        self._load_index()
+        # B+ tree index for primary key, filled lazily: point lookups cache the
+        # rows they read, and the first range scan loads the whole table
+        self.index = BPlusTree(order=4)
+        self._index_loaded = False
 
     def _load_index(self):
         """Load existing data from LSM tree into B+ tree index"""
         # Use range_scan with minimum and maximum possible keys
         for key, value in self.lsm_store.range_scan("\0", "\xff"):
             if isinstance(value, dict):  # Ensure value is a valid row
-                self.index.insert(key, value)
+                # Rows already cached by get/insert/update are at least as new
+                if self.index.search(key) is None:
+                    self.index.insert(key, value)
+        self._index_loaded = True
 
-    def insert(self, row: Dict[str, Any]):
-        """Insert a new row into the table"""
-        # Validate row structure
-        for col_name, value in row.items():
-            if col_name not in self.columns:
+    def _check_columns(self, values: Dict[str, Any]):
+        """Validate column names and nullability of a full or partial row"""
+        column_nullable = self._column_nullable
+        for col_name, value in values.items():
+            nullable = column_nullable.get(col_name)
+            if nullable is None:
                 raise ValueError(f"Unknown column: {col_name}")
             
-            if not self.columns[col_name].nullable and value is None:
+            if value is None and not nullable:
                 raise ValueError(f"Column {col_name} cannot be null")
 
+    def _primary_key_of(self, row: Dict[str, Any]) -> Any:
+        """Validate a row against the table schema and return its primary key"""
+        # Validate row structure
+        self._check_columns(row)
+
         # Get primary key value
-        if not self.primary_key_col:
-            raise ValueError("No primary key defined for table")
-            
-        pk_value = row.get(self.primary_key_col.name)
+        pk_value = row.get(self._pk_name)
         if pk_value is None:
             raise ValueError("Primary key value cannot be null")
+        return pk_value
+
+    def insert(self, row: Dict[str, Any]):
+        """Insert a new row into the table
+
+        The index caches the caller's dict itself, not a copy, and update()
+        patches it in place, so callers must not modify a row after inserting it.
+        """
+        pk_value = self._primary_key_of(row)
 
         # Store in LSM tree
         self.lsm_store.put(pk_value, row)
@@ -54,38 +74,75 @@ class Table:
         # Update index
         self.index.insert(pk_value, row)
 
+    def insert_many(self, rows: List[Dict[str, Any]]):
+        """Insert several rows; nothing is written if any row is invalid
+
+        As with insert(), the index caches the caller's dicts without copying.
+        """
+        pairs = [(self._primary_key_of(row), row) for row in rows]
+        # Stable sort: of several rows with the same key, the last one wins
+        pairs.sort(key=lambda pair: pair[0])
+
+        self.lsm_store.put_many(pairs)
+        self.index.bulk_load(pairs)
+
     def get(self, primary_key: Any) -> Optional[Dict[str, Any]]:
         """Retrieve a row by its primary key"""
-        return self.index.search(primary_key)
+        row = self.index.search(primary_key)
+        if row is None and not self._index_loaded:
+            row = self.lsm_store.get(primary_key)
+            if row is not None:
+                self.index.insert(primary_key, row)
+        return row
 
-    def scan(self, start_key: Any = None, end_key: Any = None) -> List[Dict[str, Any]]:
-        """Scan table for rows within key range"""
+    def scan(self, start_key: Any = None, end_key: Any = None) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the rows within key range, so callers can stop early"""
         if start_key is None or end_key is None:
             # Full table scan from LSM
-            return [value for _, value in self.lsm_store.scan()]
+            yield from (value for _, value in self.lsm_store.scan())
+            return
         
         # Range scan using index
-        return [row for _, row in self.index.range_search(start_key, end_key)]
+        if not self._index_loaded:
+            self._load_index()
+        yield from (row for _, row in self.index.iter_range(start_key, end_key))
 
     def update(self, primary_key: Any, new_values: Dict[str, Any]):
-        """Update a row by its primary key"""
+        """Update a row by its primary key
+
+        The row is patched in place: get() always leaves the row cached in the
+        index, so the index already holds this object and needs no insert.
+        Row dicts previously returned by get() or passed to insert() see the
+        new values too. new_values is validated first, so an invalid update
+        leaves the row untouched.
+        """
         existing_row = self.get(primary_key)
         if not existing_row:
             raise ValueError(f"No row found with primary key: {primary_key}")
 
+        # Validate before patching the shared row
+        self._check_columns(new_values)
+        if new_values.get(self._pk_name, primary_key) != primary_key:
+            raise ValueError("Primary key value cannot be changed")
+
         # Update values
-        updated_row = existing_row.copy()
-        updated_row.update(new_values)
+        existing_row.update(new_values)
 
         # Store updated row
-        self.lsm_store.put(primary_key, updated_row)
-        self.index.insert(primary_key, updated_row)
+        self.lsm_store.put(primary_key, existing_row)
 
     def delete(self, primary_key: Any):
         """Delete a row by its primary key"""
         # Remove from LSM tree
         self.lsm_store.delete(primary_key)
         
-        # Note: We should also implement deletion in B+ tree
-        # For now, we'll rebuild the index
-        self._load_index()
+        # Remove from index
+        self.index.delete(primary_key)
+
+    def delete_many(self, primary_keys: List[Any]):
+        """Delete several rows by primary key"""
+        # Deleting in key order keeps consecutive removals in the same leaves,
+        # so underflowing leaves are merged with their neighbours fewer times
+        for primary_key in sorted(primary_keys):
+            self.lsm_store.delete(primary_key)
+            self.index.delete(primary_key)
@@ -36,7 +36,7 @@ def main():
     print(f"Found user: {user}")
 
     # Scan range
-    users = users_table.scan(start_key=1, end_key=2)
+    users = list(users_table.scan(start_key=1, end_key=2))
     print(f"Users in range: {users}")
 
     # Update user
@@ -3,35 +3,42 @@
 定义SQL语句的抽象语法树节点结构。
 """
 
+import sys
 from dataclasses import dataclass
+from enum import IntEnum
 from typing import List, Optional, Union,Any
 
+# 节点使用 __slots__ 存储字段，不再为每个实例分配 __dict__，
+# 大量节点时更省内存，属性访问也更快；dataclass 的 slots 参数需要 Python 3.10
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+# 解析器按位置参数构造表达式节点（省去关键字参数的开销），调整字段顺序时要同步修改 parser.py
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class Node:
     """AST 基础节点"""
     pass
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Expression(Node):
     """表达式基类"""
     pass
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Literal(Expression):
     """字面量"""
     value: Union[str, int, float, bool, None]
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Identifier(Expression):
     """标识符"""
     name: str
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class BinaryOp(Expression):
     """二元运算"""
     left: Expression
@@ -39,34 +46,53 @@ class BinaryOp(Expression):
     right: Expression
 
 
-@dataclass
+@dataclass(**_SLOTS)
+class BoolOp(Expression):
+    """逻辑运算，连续的同一运算符展平为一个节点：a AND b AND c -> BoolOp('AND', [a, b, c])"""
+    operator: str  # 'AND' 或 'OR'
+    operands: List[Expression]
+
+
+@dataclass(**_SLOTS)
 class UnaryOp(Expression):
     """一元运算"""
     operator: str
     operand: Expression
 
 
-@dataclass
-class FunctionCall:
+class AggKind(IntEnum):
+    """函数种类，执行时按整数分派；USER 表示普通函数"""
+    USER = 0
+    COUNT = 1
+    SUM = 2
+    AVG = 3
+    MAX = 4
+    MIN = 5
+
+
+@dataclass(**_SLOTS)
+class FunctionCall(Expression):
+    """函数调用"""
     name: str
     args: List[Any]
     alias: Optional[str] = None
+    kind: AggKind = AggKind.USER
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ColumnRef(Expression):
     """列引用"""
     table: Optional[str]
     column: str
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Statement(Node):
     """语句基类"""
     pass
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class SelectStatement(Statement):
     """SELECT 语句"""
     distinct: bool
@@ -80,7 +106,7 @@ class SelectStatement(Statement):
     offset: Optional[Expression]
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class InsertStatement(Statement):
     """INSERT 语句"""
     table: Identifier
@@ -88,7 +114,7 @@ class InsertStatement(Statement):
     values: List[List[Expression]]
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class UpdateStatement(Statement):
     """UPDATE 语句"""
     table: Identifier
@@ -96,14 +122,14 @@ class UpdateStatement(Statement):
     where: Optional[Expression]
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class DeleteStatement(Statement):
     """DELETE 语句"""
     table: Identifier
     where: Optional[Expression]
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class JoinClause(Node):
     """JOIN 子句"""
     join_type: str  # 'INNER', 'LEFT', 'RIGHT', 'OUTER'
@@ -111,14 +137,14 @@ class JoinClause(Node):
     condition: Expression
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class OrderByItem(Node):
     """ORDER BY 项"""
     expression: Expression
     direction: str  # 'ASC' or 'DESC'
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class TableRef(Expression):
     """表引用"""
     name: str
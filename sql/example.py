@@ -37,7 +37,7 @@ def format_ast(node, indent=0):
 from lexer import Lexer
 from parser import Parser
 from ast_nodes import (
-    SelectStatement, ColumnRef, BinaryOp, 
+    SelectStatement, ColumnRef, BinaryOp, BoolOp,
     Literal, FunctionCall, TableRef
 )
 
@@ -69,6 +69,10 @@ def format_ast(node, indent=0):
         format_ast(node.left, indent + 1)
         print(f"{prefix}Right:")
         format_ast(node.right, indent + 1)
+    elif isinstance(node, BoolOp):
+        print(f"{prefix}Operation: {node.operator}")
+        for operand in node.operands:
+            format_ast(operand, indent + 1)
     elif isinstance(node, Literal):
         print(f"{prefix}Literal: {node.value}")
     elif isinstance(node, FunctionCall):
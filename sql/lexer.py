@@ -3,7 +3,11 @@
 负责将 SQL 语句分解成一系列标记（tokens）。
 """
 
+import re
+import sys
 from enum import Enum
+from itertools import takewhile
+from typing import Any, Iterator
 
 
 class TokenType(Enum):
@@ -77,16 +81,50 @@ class TokenType(Enum):
 
 class Token:
     """SQL 标记"""
-    def __init__(self, type_: TokenType, value: str, line: int, column: int):
+    __slots__ = ('type', 'value', 'line', 'column', 'parsed_value')
+    
+    def __init__(self, type_: TokenType, value: str, line: int, column: int,
+                 parsed_value: Any = None):
         self.type = type_
         self.value = value
         self.line = line
         self.column = column
+        # 数字标记在词法分析时已经转换好的 int 或 float 值
+        self.parsed_value = parsed_value
     
     def __str__(self):
         return f"Token({self.type}, '{self.value}', line={self.line}, column={self.column})"
 
 
+_OPERATORS = {
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.MULTIPLY,
+    '**': TokenType.STAR,
+    '/': TokenType.DIVIDE,
+    '=': TokenType.EQUALS,
+    '>': TokenType.GREATER,
+    '<': TokenType.LESS,
+    '>=': TokenType.GREATER_EQUALS,
+    '<=': TokenType.LESS_EQUALS,
+    '!=': TokenType.NOT_EQUALS,
+    '.': TokenType.DOT,
+    ',': TokenType.COMMA,
+    ';': TokenType.SEMICOLON,
+    '(': TokenType.LEFT_PAREN,
+    ')': TokenType.RIGHT_PAREN,
+}
+
+# 字符串中的转义序列：\n、\t、\r 转为对应字符，其余转义保留被转义的字符本身
+_ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+
+
+def _unescape(match: re.Match) -> str:
+    char = match.group(1)
+    return _ESCAPES.get(char, char)
+
+
 class Lexer:
     """SQL 词法分析器"""
     
@@ -136,243 +174,93 @@ class Lexer:
     
     def __init__(self, text: str):
         self.text = text
-        self.pos = 0
-        self.line = 1
-        self.column = 1
-        self.current_char = text[0] if text else None
-    
-    def error(self):
-        raise Exception(f'非法字符 {self.current_char} 在第 {self.line} 行，第 {self.column} 列')
-    
-    def advance(self):
-        """移动到下一个字符"""
-        self.pos += 1
-        if self.pos > len(self.text) - 1:
-            self.current_char = None
-        else:
-            if self.text[self.pos] == '\n':
-                self.line += 1
-                self.column = 1
-            else:
-                self.column += 1
-            self.current_char = self.text[self.pos]
-    
-    def skip_whitespace(self):
-        """跳过空白字符"""
-        while self.current_char and self.current_char.isspace():
-            if self.current_char == '\n':
-                self.line += 1
-                self.column = 0
-            self.advance()
-    
-    def skip_comment(self):
-        """跳过注释"""
-        while self.current_char and self.current_char != '\n':
-            self.advance()
-        if self.current_char == '\n':
-            self.advance()
-    
-    def get_identifier(self):
-        """获取标识符或关键字"""
-        result = ''
-        column = self.column
-        
-        while self.current_char and (self.current_char.isalnum() or self.current_char == '_'):
-            result += self.current_char
-            self.advance()
-        
-        token_type = self.KEYWORDS.get(result.upper(), TokenType.IDENTIFIER)
-        return Token(token_type, result, self.line, column)
+        # 整个输入只由 _TOKEN_RE 扫描一遍，按需逐个产出标记
+        self._tokens = self._tokenize()
     
-    def get_number(self):
-        """获取数字"""
-        result = ''
-        column = self.column
+    def _tokenize(self) -> Iterator[Token]:
+        """按 _TOKEN_RE 的匹配结果依次生成标记，结束后一直返回 EOF"""
+        text = self.text
+        keywords = self.KEYWORDS
+        line, line_start = 1, 0  # 当前行号和行首位置，只在跨行的匹配之后更新
         
-        # 处理负号
-        if self.current_char == '-':
-            result += self.current_char
-            self.advance()
-        
-        # 处理整数部分
-        while self.current_char and self.current_char.isdigit():
-            result += self.current_char
-            self.advance()
-        
-        # 处理小数点和小数部分
-        if self.current_char == '.':
-            result += self.current_char
-            self.advance()
-            while self.current_char and self.current_char.isdigit():
-                result += self.current_char
-                self.advance()
-        
-        # 处理科学计数法
-        if self.current_char in ('e', 'E'):
-            result += self.current_char
-            self.advance()
-            if self.current_char in ('+', '-'):
-                result += self.current_char
-                self.advance()
-            while self.current_char and self.current_char.isdigit():
-                result += self.current_char
-                self.advance()
-        
-        return Token(TokenType.NUMBER, result, self.line, column)
-    
-    def get_string(self):
-        """获取字符串字面量"""
-        result = ''
-        column = self.column
-        quote = self.current_char  # 记录是单引号还是双引号
-        self.advance()  # 跳过开始的引号
-        
-        while self.current_char and self.current_char != quote:
-            if self.current_char == '\\':
-                self.advance()
-                if self.current_char == 'n':
-                    result += '\n'
-                elif self.current_char == 't':
-                    result += '\t'
-                elif self.current_char == 'r':
-                    result += '\r'
-                else:
-                    result += self.current_char
-            else:
-                result += self.current_char
-            self.advance()
-        
-        if self.current_char != quote:
-            raise Exception(f'未闭合的字符串在第 {self.line} 行')
+        for match in _TOKEN_RE.finditer(text):
+            kind = match.lastgroup
+            value = match.group()
+            start = match.start()
+            column = start - line_start + 1
+            
+            if kind == 'IDENTIFIER':
+                # 同名标识符共用一个字符串对象，之后的比较和哈希都更便宜
+                token = Token(TokenType.IDENTIFIER, sys.intern(value), line, column)
+            elif kind == 'KEYWORD':
+                token = Token(keywords[value.upper()], value, line, column)
+            elif kind == 'INTEGER':
+                token = Token(TokenType.NUMBER, value, line, column, int(value))
+            elif kind == 'FLOAT':
+                try:
+                    number = float(value)
+                except ValueError:
+                    raise Exception(f'非法数字 {value} 在第 {line} 行，第 {column} 列')
+                token = Token(TokenType.NUMBER, value, line, column, number)
+            elif kind == 'OPERATOR':
+                token = Token(_OPERATORS[value], value, line, column)
+            elif kind == 'STRING':
+                body = value[1:-1]
+                if '\\' in body:
+                    body = _ESCAPE_RE.sub(_unescape, body)
+                token = Token(TokenType.STRING, body, line, column)
+            elif kind == 'ERROR':
+                if value in ('"', "'"):
+                    raise Exception(f'未闭合的字符串在第 {line} 行')
+                raise Exception(f'非法字符 {value} 在第 {line} 行，第 {column} 列')
+            else:  # 空白和注释
+                token = None
+            
+            # 空白、注释和字符串可能跨行
+            if kind == 'WHITESPACE' or kind == 'COMMENT' or kind == 'STRING':
+                end = match.end()
+                newlines = text.count('\n', start, end)
+                if newlines:
+                    line += newlines
+                    line_start = text.rfind('\n', start, end) + 1
+            
+            if token is not None:
+                yield token
         
-        self.advance()  # 跳过结束的引号
-        return Token(TokenType.STRING, result, self.line, column)
-    
-    def peek(self) -> str:
-        """查看下一个字符"""
-        peek_pos = self.pos + 1
-        if peek_pos > len(self.text) - 1:
-            return None
-        return self.text[peek_pos]
+        eof = Token(TokenType.EOF, '', line, len(text) - line_start + 1)
+        while True:
+            yield eof
     
     def get_next_token(self) -> Token:
         """获取下一个标记"""
-        while self.current_char:
-            
-            # 跳过空白字符
-            if self.current_char.isspace():
-                self.skip_whitespace()
-                continue
-            
-            # 跳过单行注释
-            if self.current_char == '-' and self.peek() == '-':
-                self.advance()
-                self.advance()
-                self.skip_comment()
-                continue
-            
-            # 跳过多行注释
-            if self.current_char == '/' and self.peek() == '*':
-                self.advance()
-                self.advance()
-                while self.current_char:
-                    if self.current_char == '*' and self.peek() == '/':
-                        self.advance()
-                        self.advance()
-                        break
-                    self.advance()
-                continue
-            
-            # 标识符
-            if self.current_char.isalpha() or self.current_char == '_':
-                return self.get_identifier()
-            
-            # 数字
-            if self.current_char.isdigit() or (self.current_char == '-' and self.peek().isdigit()):
-                return self.get_number()
-            
-            # 字符串
-            if self.current_char in ("'", '"'):
-                return self.get_string()
-            
-            # 运算符
-            if self.current_char == '+':
-                column = self.column
-                self.advance()
-                return Token(TokenType.PLUS, '+', self.line, column)
-            
-            if self.current_char == '-':
-                column = self.column
-                self.advance()
-                return Token(TokenType.MINUS, '-', self.line, column)
-            
-            if self.current_char == '*':
-                column = self.column
-                self.advance()
-                if self.current_char == '*':
-                    self.advance()
-                    return Token(TokenType.STAR, '**', self.line, column)
-                return Token(TokenType.MULTIPLY, '*', self.line, column)
-            
-            if self.current_char == '/':
-                column = self.column
-                self.advance()
-                return Token(TokenType.DIVIDE, '/', self.line, column)
-            
-            if self.current_char == '=':
-                column = self.column
-                self.advance()
-                return Token(TokenType.EQUALS, '=', self.line, column)
-            
-            if self.current_char == '>':
-                column = self.column
-                self.advance()
-                if self.current_char == '=':
-                    self.advance()
-                    return Token(TokenType.GREATER_EQUALS, '>=', self.line, column)
-                return Token(TokenType.GREATER, '>', self.line, column)
-            
-            if self.current_char == '<':
-                column = self.column
-                self.advance()
-                if self.current_char == '=':
-                    self.advance()
-                    return Token(TokenType.LESS_EQUALS, '<=', self.line, column)
-                return Token(TokenType.LESS, '<', self.line, column)
-            
-            if self.current_char == '!':
-                column = self.column
-                self.advance()
-                if self.current_char == '=':
-                    self.advance()
-                    return Token(TokenType.NOT_EQUALS, '!=', self.line, column)
-                self.error()
-            
-            if self.current_char == '.':
-                column = self.column
-                self.advance()
-                return Token(TokenType.DOT, '.', self.line, column)
-            
-            if self.current_char == ',':
-                column = self.column
-                self.advance()
-                return Token(TokenType.COMMA, ',', self.line, column)
-            
-            if self.current_char == ';':
-                column = self.column
-                self.advance()
-                return Token(TokenType.SEMICOLON, ';', self.line, column)
-            
-            if self.current_char == '(':
-                column = self.column
-                self.advance()
-                return Token(TokenType.LEFT_PAREN, '(', self.line, column)
-            
-            if self.current_char == ')':
-                column = self.column
-                self.advance()
-                return Token(TokenType.RIGHT_PAREN, ')', self.line, column)
-            
-            self.error()
+        return next(self._tokens)
+    
+    def __iter__(self) -> Iterator[Token]:
+        """依次产出剩余的标记，遇到 EOF 时停止（不包括 EOF）
         
-        return Token(TokenType.EOF, '', self.line, self.column)
+        循环由 takewhile 在 C 层驱动，list(lexer) 一次取出全部标记
+        """
+        return takewhile(_is_not_eof, self._tokens)
+
+
+def _is_not_eof(token: Token) -> bool:
+    return token.type is not TokenType.EOF
+
+
+# 关键字不区分大小写，长的在前；\b 保证 SELECTED 这样的标识符不会被拆开
+_KEYWORD_PATTERN = '|'.join(sorted(Lexer.KEYWORDS, key=len, reverse=True))
+
+# 所有标记的正则，按顺序尝试：关键字先于标识符，注释先于运算符，负数先于减号，
+# 带小数点或指数的数字先于整数，词法分析时就能确定数字的类型；
+# 最后的 ERROR 匹配任意单个字符，保证输入中的每个字符都被覆盖
+_TOKEN_RE = re.compile(r'''
+    (?P<WHITESPACE>\s+)
+  | (?P<COMMENT>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<KEYWORD>(?i:%s)\b)
+  | (?P<IDENTIFIER>[^\W\d]\w*)
+  | (?P<FLOAT>-?\d+(?:\.\d*(?:[eE][+-]?\d*)?|[eE][+-]?\d*))
+  | (?P<INTEGER>-?\d+)
+  | (?P<STRING>'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*")
+  | (?P<OPERATOR>\*\*|>=|<=|!=|[-+*/=<>.,;()])
+  | (?P<ERROR>.)
+''' % _KEYWORD_PATTERN, re.VERBOSE | re.DOTALL)
@@ -1,3 +1,4 @@
+from dataclasses import replace
 from typing import Optional
 from ast_nodes import *
 
@@ -6,6 +7,9 @@ class QueryOptimizer:
         """优化查询语句"""
         if not isinstance(ast, SelectStatement):
             return ast
+        
+        # 输入的 AST 可能来自 parse_sql 的缓存，只修改复制出来的语句节点
+        ast = replace(ast)
             
         # 1. 谓词下推优化
         ast = self._push_down_predicates(ast)
@@ -27,39 +31,59 @@ class QueryOptimizer:
             
         # 如果有 JOIN，尝试将条件下推到相应的表
         if stmt.from_table and stmt.from_table.joins:
-            new_where = []
-            pushed_conditions = []
-            
-            def can_push_down(expr, table_name):
-                """检查条件是否只依赖于特定表"""
+            def referenced_tables(expr):
+                """返回条件依赖的表名集合，含有无法下推的节点时返回 None"""
                 if isinstance(expr, ColumnRef):
-                    return expr.table == table_name
+                    return frozenset((expr.table,))
                 elif isinstance(expr, BinaryOp):
-                    return (can_push_down(expr.left, table_name) and 
-                           can_push_down(expr.right, table_name))
+                    left = referenced_tables(expr.left)
+                    right = referenced_tables(expr.right)
+                    if left is None or right is None:
+                        return None
+                    return left | right
+                elif isinstance(expr, BoolOp):
+                    tables = frozenset()
+                    for operand in expr.operands:
+                        operand_tables = referenced_tables(operand)
+                        if operand_tables is None:
+                            return None
+                        tables |= operand_tables
+                    return tables
                 elif isinstance(expr, Literal):
-                    return True
-                return False
+                    return frozenset()
+                return None
+            
+            # WHERE 只分解一次，每个条件只遍历一次，记下它依赖的表；
+            # 每个 JOIN 只检查还没有被下推的条件
+            remaining = [(cond, referenced_tables(cond))
+                         for cond in self._split_and_conditions(stmt.where)]
             
-            # 遍历所有 JOIN，将可以下推的条件放到对应的 JOIN ON 子句中
+            # 遍历所有 JOIN，将只依赖这个表的条件放到对应的 JOIN ON 子句中；
+            # 条件有变化的 JOIN 复制一份再修改，不改动原来的节点。
+            # 只下推到 INNER JOIN：外连接的 ON 条件不过滤行，只决定是否补 NULL，
+            # 把 WHERE 条件移进去会改变结果。不引用任何表的条件（如 1 = 0）也留在 WHERE 中
+            joins = []
             for join in stmt.from_table.joins:
-                if isinstance(stmt.where, BinaryOp) and stmt.where.operator == 'AND':
-                    conditions = self._split_and_conditions(stmt.where)
-                    for cond in conditions:
-                        if can_push_down(cond, join.table.name):
-                            pushed_conditions.append(cond)
-                            if not join.on:
-                                join.on = cond
-                            else:
-                                join.on = BinaryOp(left=join.on, operator='AND', right=cond)
-                        else:
-                            new_where.append(cond)
-                            
-            # 重建 WHERE 子句
-            if new_where:
-                stmt.where = self._combine_and_conditions(new_where)
-            else:
-                stmt.where = None
+                if join.join_type != 'INNER':
+                    joins.append(join)
+                    continue
+                # 列引用使用表的别名（如果有）
+                target = frozenset((join.table.alias or join.table.name,))
+                pushed, kept = [], []
+                for cond, tables in remaining:
+                    if tables and tables <= target:
+                        pushed.append(cond)
+                    else:
+                        kept.append((cond, tables))
+                if pushed:
+                    on = self._split_and_conditions(join.condition) if join.condition else []
+                    join = replace(join, condition=self._combine_and_conditions(on + pushed))
+                joins.append(join)
+                remaining = kept
+            stmt.from_table = replace(stmt.from_table, joins=joins)
+            
+            # 用剩下的条件重建 WHERE 子句
+            stmt.where = self._combine_and_conditions([cond for cond, _ in remaining])
                 
         return stmt
     
@@ -85,16 +109,12 @@ class QueryOptimizer:
         if stmt.where:
             self._collect_columns_from_expr(stmt.where, needed_columns)
         
-        # 更新 SELECT 列表
+        # 更新 SELECT 列表，只有确实裁掉了列时才重建
         if needed_columns:
-            new_columns = []
-            for col in stmt.columns:
-                if isinstance(col, ColumnRef):
-                    if (col.table, col.column) in needed_columns:
-                        new_columns.append(col)
-                else:
-                    new_columns.append(col)
-            stmt.columns = new_columns
+            new_columns = [col for col in stmt.columns
+                           if not isinstance(col, ColumnRef) or (col.table, col.column) in needed_columns]
+            if len(new_columns) != len(stmt.columns):
+                stmt.columns = new_columns
             
         return stmt
     
@@ -121,42 +141,54 @@ class QueryOptimizer:
                             return Literal(left.value / right.value)
                     except:
                         pass
+                # 子表达式都没有变化时复用原节点，不分配新对象
+                if left is expr.left and right is expr.right:
+                    return expr
                 return BinaryOp(left=left, operator=expr.operator, right=right)
+            if isinstance(expr, BoolOp):
+                operands = [fold_expr(operand) for operand in expr.operands]
+                if all(new is old for new, old in zip(operands, expr.operands)):
+                    return expr
+                return BoolOp(operator=expr.operator, operands=operands)
             return expr
         
         # 优化 WHERE 子句中的常量表达式
         if stmt.where:
             stmt.where = fold_expr(stmt.where)
             
-        # 优化 SELECT 列表中的常量表达式
-        new_columns = []
-        for col in stmt.columns:
-            if isinstance(col, BinaryOp):
-                new_columns.append(fold_expr(col))
-            else:
-                new_columns.append(col)
-        stmt.columns = new_columns
+        # 优化 SELECT 列表中的常量表达式，有列被折叠时才重建列表
+        new_columns = [fold_expr(col) for col in stmt.columns]
+        if any(new is not old for new, old in zip(new_columns, stmt.columns)):
+            stmt.columns = new_columns
         
         return stmt
     
     def _split_and_conditions(self, expr: BinaryOp) -> list:
-        """将 AND 连接的条件分解为列表"""
-        if not isinstance(expr, BinaryOp) or expr.operator != 'AND':
-            return [expr]
-        return (self._split_and_conditions(expr.left) + 
-                self._split_and_conditions(expr.right))
+        """将 AND 连接的条件分解为列表，按从左到右的顺序返回
+        
+        用显式栈代替递归，条件很多时不会超出递归深度，也不会反复拼接列表
+        """
+        conditions = []
+        stack = [expr]
+        while stack:
+            expr = stack.pop()
+            if isinstance(expr, BoolOp) and expr.operator == 'AND':
+                # 逆序压栈，保证左侧先出栈
+                stack.extend(reversed(expr.operands))
+            elif isinstance(expr, BinaryOp) and expr.operator == 'AND':
+                stack.append(expr.right)
+                stack.append(expr.left)
+            else:
+                conditions.append(expr)
+        return conditions
     
     def _combine_and_conditions(self, conditions: list) -> BinaryOp:
-        """将条件列表组合为 AND 表达式"""
+        """将条件列表组合为一个 AND 表达式"""
         if not conditions:
             return None
         if len(conditions) == 1:
             return conditions[0]
-        return BinaryOp(
-            left=conditions[0],
-            operator='AND',
-            right=self._combine_and_conditions(conditions[1:])
-        )
+        return BoolOp(operator='AND', operands=list(conditions))
     
     def _collect_columns_from_expr(self, expr, columns_set):
         """从表达式中收集列引用"""
@@ -165,6 +197,9 @@ class QueryOptimizer:
         elif isinstance(expr, BinaryOp):
             self._collect_columns_from_expr(expr.left, columns_set)
             self._collect_columns_from_expr(expr.right, columns_set)
+        elif isinstance(expr, BoolOp):
+            for operand in expr.operands:
+                self._collect_columns_from_expr(operand, columns_set)
         elif isinstance(expr, FunctionCall):
             for arg in expr.args:
                 self._collect_columns_from_expr(arg, columns_set)
\ No newline at end of file
@@ -3,45 +3,183 @@
 将词法分析器生成的标记序列解析成抽象语法树(AST)。
 """
 
+import functools
+import operator
+import re
+import sys
 from typing import List, Optional
 
 from lexer import Lexer, Token, TokenType
 from ast_nodes import (
-    BinaryOp, ColumnRef, DeleteStatement, Expression, FunctionCall,
+    AggKind, BinaryOp, BoolOp, ColumnRef, DeleteStatement, Expression, FunctionCall,
     Identifier, InsertStatement, JoinClause, Literal, OrderByItem,
     SelectStatement, Statement, TableRef, UnaryOp, UpdateStatement
 )
 
+# 二元运算符的优先级，数值越大结合越紧
+_PREC_OR = 1
+_PREC_AND = 2
+_PREC_COMPARISON = 3
+_PREC_ADDITIVE = 4
+_PREC_MULTIPLICATIVE = 5
+_PRECEDENCE = {
+    TokenType.OR: _PREC_OR,
+    TokenType.AND: _PREC_AND,
+    TokenType.EQUALS: _PREC_COMPARISON,
+    TokenType.NOT_EQUALS: _PREC_COMPARISON,
+    TokenType.LESS: _PREC_COMPARISON,
+    TokenType.LESS_EQUALS: _PREC_COMPARISON,
+    TokenType.GREATER: _PREC_COMPARISON,
+    TokenType.GREATER_EQUALS: _PREC_COMPARISON,
+    TokenType.LIKE: _PREC_COMPARISON,
+    TokenType.IN: _PREC_COMPARISON,
+    TokenType.BETWEEN: _PREC_COMPARISON,
+    TokenType.PLUS: _PREC_ADDITIVE,
+    TokenType.MINUS: _PREC_ADDITIVE,
+    TokenType.MULTIPLY: _PREC_MULTIPLICATIVE,
+    TokenType.DIVIDE: _PREC_MULTIPLICATIVE,
+}
+
+# 运算符标记对应的字符串，所有节点共用这些字符串对象，关键字运算符统一为大写
+_OPERATOR_STRINGS = {
+    TokenType.EQUALS: '=',
+    TokenType.NOT_EQUALS: '!=',
+    TokenType.LESS: '<',
+    TokenType.LESS_EQUALS: '<=',
+    TokenType.GREATER: '>',
+    TokenType.GREATER_EQUALS: '>=',
+    TokenType.LIKE: 'LIKE',
+    TokenType.IN: 'IN',
+    TokenType.PLUS: '+',
+    TokenType.MINUS: '-',
+    TokenType.MULTIPLY: '*',
+    TokenType.DIVIDE: '/',
+    TokenType.NOT: 'NOT',
+}
+
+# 两边都是数字字面量时在构造节点时直接计算的运算符
+_FOLDABLE_OPS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+_NUMBER_TYPES = (int, float)
+
+# 出现在这些标记之前的单个标识符就是完整的列，不可能是表达式或带别名
+_COLUMN_END_TOKENS = frozenset((TokenType.COMMA, TokenType.FROM, TokenType.EOF))
+
+# 聚合函数关键字对应的函数种类，其他函数名都是 AggKind.USER
+_AGG_KINDS = {
+    TokenType.COUNT: AggKind.COUNT,
+    TokenType.SUM: AggKind.SUM,
+    TokenType.AVG: AggKind.AVG,
+    TokenType.MAX: AggKind.MAX,
+    TokenType.MIN: AggKind.MIN,
+}
+
+# 多选一的标记类型检查用 frozenset，一次哈希查找代替逐个比较
+_UNARY_OPS = frozenset((TokenType.PLUS, TokenType.MINUS, TokenType.NOT))
+_AGGREGATES = frozenset((TokenType.COUNT, TokenType.SUM, TokenType.AVG, TokenType.MAX, TokenType.MIN))
+_SORT_DIRECTIONS = frozenset((TokenType.ASC, TokenType.DESC))
+_JOIN_TOKENS = frozenset((
+    TokenType.JOIN, TokenType.LEFT, TokenType.RIGHT, TokenType.INNER, TokenType.OUTER
+))
+# 表名后面只有跟着这些标记时才可能有别名或 JOIN
+_TABLE_SUFFIX_TOKENS = _JOIN_TOKENS | {TokenType.AS, TokenType.IDENTIFIER}
+
+# 最常见的简单查询：SELECT 列,列 FROM 表 [WHERE 列 比较运算符 整数]，不经过词法和语法分析直接构造 AST
+_SIMPLE_IDENT = r'[^\W\d]\w*'
+_SIMPLE_SELECT_RE = re.compile(
+    r'\s*SELECT\s+(\*|{0}(?:\s*,\s*{0})*)\s+FROM\s+({0})'
+    r'(?:\s+WHERE\s+({0})\s*(>=|<=|!=|=|>|<)\s*(-?\d+))?\s*;?\s*'.format(_SIMPLE_IDENT),
+    re.IGNORECASE
+)
+_SIMPLE_IDENT_RE = re.compile(_SIMPLE_IDENT)
+_COMPARISON_STRINGS = {op: op for op in ('=', '!=', '<', '<=', '>', '>=')}
+
 
 class Parser:
     """SQL 语法分析器"""
     
     def __init__(self, lexer: Lexer):
+        self.reset(lexer)
+    
+    def reset(self, lexer: Lexer):
+        """换一个词法分析器重新开始，同一个解析器可以依次解析多条语句"""
         self.lexer = lexer
-        self.current_token = self.lexer.get_next_token()
+        # 一次性取出全部标记，解析时只移动下标；最后一个标记总是 EOF
+        self.tokens: List[Token] = list(lexer)
+        self.tokens.append(lexer.get_next_token())
+        self.pos = 0
+        self.current_token = self.tokens[0]
     
     def error(self, message: str = "语法错误"):
         raise Exception(f"{message} 在第 {self.current_token.line} 行，第 {self.current_token.column} 列")
     
     def eat(self, token_type: TokenType):
         """验证当前标记类型并获取下一个标记"""
-        if self.current_token.type == token_type:
-            self.current_token = self.lexer.get_next_token()
+        # 枚举成员是单例，用 is 比较
+        if self.current_token.type is token_type:
+            # 停在 EOF 上，与词法分析器在结尾一直返回 EOF 的行为一致
+            if self.pos + 1 < len(self.tokens):
+                self.pos += 1
+                self.current_token = self.tokens[self.pos]
         else:
             self.error(f"预期标记类型 {token_type}，实际得到 {self.current_token.type}")
     
+    def _advance(self):
+        """移动到下一个标记，不检查类型；只在调用方已经判断过当前标记类型时使用"""
+        pos = self.pos + 1
+        if pos < len(self.tokens):
+            self.pos = pos
+            self.current_token = self.tokens[pos]
+    
+    def _peek(self, k: int = 1) -> Token:
+        """向前查看第 k 个标记，不移动位置；超出末尾时返回 EOF"""
+        pos = self.pos + k
+        if pos < len(self.tokens):
+            return self.tokens[pos]
+        return self.tokens[-1]
+    
+    @staticmethod
+    def try_fast_parse(sql: str) -> Optional[SelectStatement]:
+        """简单 SELECT 的快速路径，不符合 _SIMPLE_SELECT_RE 的语句返回 None
+        
+        得到的 AST 与完整解析的结果相同；标识符是关键字时（如 count）交给完整解析器处理
+        """
+        match = _SIMPLE_SELECT_RE.fullmatch(sql)
+        if match is None:
+            return None
+        column_text, table, where_column, op, number = match.groups()
+        column_names = _SIMPLE_IDENT_RE.findall(column_text)
+        keywords = Lexer.KEYWORDS
+        if any(name.upper() in keywords for name in (*column_names, table, where_column or '')):
+            return None
+        
+        intern = sys.intern
+        if column_names:
+            columns = [Identifier(intern(name)) for name in column_names]
+        else:
+            columns = [Literal('*')]
+        where = None
+        if where_column is not None:
+            where = BinaryOp(Identifier(intern(where_column)), _COMPARISON_STRINGS[op], Literal(int(number)))
+        return SelectStatement(False, columns, TableRef(intern(table), None, []), where,
+                               None, None, None, None, None)
+    
     def parse(self) -> Statement:
         """解析SQL语句"""
-        if self.current_token.type == TokenType.SELECT:
-            return self.parse_select()
-        elif self.current_token.type == TokenType.INSERT:
-            return self.parse_insert()
-        elif self.current_token.type == TokenType.UPDATE:
-            return self.parse_update()
-        elif self.current_token.type == TokenType.DELETE:
-            return self.parse_delete()
-        else:
+        handler = self._STATEMENT_PARSERS.get(self.current_token.type)
+        if handler is None:
             self.error("无效的SQL语句")
+        return handler(self)
     
     def parse_select(self) -> SelectStatement:
         """解析SELECT语句"""
@@ -51,7 +189,7 @@ class Parser:
         distinct = False
         if self.current_token.type == TokenType.DISTINCT:
             distinct = True
-            self.eat(TokenType.DISTINCT)
+            self._advance()
         
         # 解析选择列
         columns = self.parse_column_list()
@@ -59,32 +197,32 @@ class Parser:
         # 解析FROM子句
         from_table = None
         if self.current_token.type == TokenType.FROM:
-            self.eat(TokenType.FROM)
+            self._advance()
             from_table = self.parse_table_reference()
         
         # 解析WHERE子句
         where = None
         if self.current_token.type == TokenType.WHERE:
-            self.eat(TokenType.WHERE)
+            self._advance()
             where = self.parse_expression()
         
         # 解析GROUP BY子句
         group_by = None
         if self.current_token.type == TokenType.GROUP:
-            self.eat(TokenType.GROUP)
+            self._advance()
             self.eat(TokenType.BY)
             group_by = self.parse_expression_list()
         
         # 解析HAVING子句
         having = None
         if self.current_token.type == TokenType.HAVING:
-            self.eat(TokenType.HAVING)
+            self._advance()
             having = self.parse_expression()
         
         # 解析ORDER BY子句
         order_by = None
         if self.current_token.type == TokenType.ORDER:
-            self.eat(TokenType.ORDER)
+            self._advance()
             self.eat(TokenType.BY)
             order_by = self.parse_order_by_list()
         
@@ -92,10 +230,10 @@ class Parser:
         limit = None
         offset = None
         if self.current_token.type == TokenType.LIMIT:
-            self.eat(TokenType.LIMIT)
+            self._advance()
             limit = self.parse_expression()
             if self.current_token.type == TokenType.OFFSET:
-                self.eat(TokenType.OFFSET)
+                self._advance()
                 offset = self.parse_expression()
         
         return SelectStatement(
@@ -121,7 +259,7 @@ class Parser:
         # 解析列名列表
         columns = None
         if self.current_token.type == TokenType.LEFT_PAREN:
-            self.eat(TokenType.LEFT_PAREN)
+            self._advance()
             columns = []
             while True:
                 columns.append(self.parse_identifier())
@@ -145,7 +283,7 @@ class Parser:
             values.append(row_values)
             if self.current_token.type != TokenType.COMMA:
                 break
-            self.eat(TokenType.COMMA)
+            self._advance()
         
         return InsertStatement(table=table, columns=columns, values=values)
     
@@ -166,12 +304,12 @@ class Parser:
             set_pairs.append((column, value))
             if self.current_token.type != TokenType.COMMA:
                 break
-            self.eat(TokenType.COMMA)
+            self._advance()
         
         # 解析WHERE子句
         where = None
         if self.current_token.type == TokenType.WHERE:
-            self.eat(TokenType.WHERE)
+            self._advance()
             where = self.parse_expression()
         
         return UpdateStatement(table=table, set_pairs=set_pairs, where=where)
@@ -187,218 +325,203 @@ class Parser:
         # 解析WHERE子句
         where = None
         if self.current_token.type == TokenType.WHERE:
-            self.eat(TokenType.WHERE)
+            self._advance()
             where = self.parse_expression()
         
         return DeleteStatement(table=table, where=where)
     
     def parse_expression(self) -> Expression:
         """解析表达式"""
-        return self.parse_or_expression()
+        return self.parse_binary(_PREC_OR)
     
-    def parse_or_expression(self) -> Expression:
-        """解析OR表达式"""
-        expr = self.parse_and_expression()
-        
-        while self.current_token.type == TokenType.OR:
-            operator = self.current_token.value
-            self.eat(TokenType.OR)
-            right = self.parse_and_expression()
-            expr = BinaryOp(left=expr, operator=operator, right=right)
+    def parse_binary(self, min_precedence: int) -> Expression:
+        """按优先级解析二元表达式（Pratt 解析）
         
-        return expr
-    
-    def parse_and_expression(self) -> Expression:
-        """解析AND表达式"""
-        expr = self.parse_comparison()
+        一个循环处理所有优先级不低于 min_precedence 的运算符，右侧只解析优先级更高的部分，
+        因此同级运算符左结合。每个操作数只经过一次 parse_unary，不再逐级穿过每个优先级的函数。
         
-        while self.current_token.type == TokenType.AND:
-            operator = self.current_token.value
-            self.eat(TokenType.AND)
-            right = self.parse_comparison()
-            expr = BinaryOp(left=expr, operator=operator, right=right)
+        Args:
+            min_precedence: 本次解析接受的最低运算符优先级
+            
+        Returns:
+            表达式节点
+        """
+        expr = self.parse_unary()
         
-        return expr
-    
-    def parse_comparison(self) -> Expression:
-        """解析比较表达式"""
-        expr = self.parse_additive()
-        
-        while self.current_token.type in (
-            TokenType.EQUALS, TokenType.NOT_EQUALS,
-            TokenType.LESS, TokenType.LESS_EQUALS,
-            TokenType.GREATER, TokenType.GREATER_EQUALS,
-            TokenType.LIKE, TokenType.IN, TokenType.BETWEEN
-        ):
-            operator = self.current_token.value
-            self.eat(self.current_token.type)
+        while True:
+            token = self.current_token
+            precedence = _PRECEDENCE.get(token.type, 0)
+            if precedence < min_precedence:
+                return expr
+            self._advance()
             
-            if operator == 'BETWEEN':
-                start = self.parse_additive()
+            if token.type is TokenType.AND or token.type is TokenType.OR:
+                right = self.parse_binary(precedence + 1)
+                expr = self._boolop('AND' if token.type is TokenType.AND else 'OR', expr, right)
+            elif token.type is TokenType.BETWEEN:
+                # BETWEEN 的上下界是加法表达式，中间的 AND 不是逻辑运算
+                start = self.parse_binary(_PREC_ADDITIVE)
                 self.eat(TokenType.AND)
-                end = self.parse_additive()
-                expr = BinaryOp(
-                    left=expr,
-                    operator='BETWEEN',
-                    right=BinaryOp(left=start, operator='AND', right=end)
-                )
+                end = self.parse_binary(_PREC_ADDITIVE)
+                expr = BinaryOp(expr, 'BETWEEN', BinaryOp(start, 'AND', end))
             else:
-                right = self.parse_additive()
-                expr = BinaryOp(left=expr, operator=operator, right=right)
-        
-        return expr
+                right = self.parse_binary(precedence + 1)
+                expr = self._binop(expr, _OPERATOR_STRINGS[token.type], right)
     
-    def parse_additive(self) -> Expression:
-        """解析加法表达式"""
-        expr = self.parse_multiplicative()
-        
-        while self.current_token.type in (TokenType.PLUS, TokenType.MINUS):
-            operator = self.current_token.value
-            self.eat(self.current_token.type)
-            right = self.parse_multiplicative()
-            expr = BinaryOp(left=expr, operator=operator, right=right)
-        
-        return expr
+    def _binop(self, left: Expression, op: str, right: Expression) -> Expression:
+        """构造二元运算节点，两边都是数字字面量时直接返回计算结果"""
+        if (type(left) is Literal and type(right) is Literal
+                and type(left.value) in _NUMBER_TYPES and type(right.value) in _NUMBER_TYPES):
+            func = _FOLDABLE_OPS.get(op)
+            if func is not None and not (op == '/' and right.value == 0):
+                return Literal(func(left.value, right.value))
+        return BinaryOp(left, op, right)
     
-    def parse_multiplicative(self) -> Expression:
-        """解析乘法表达式"""
-        expr = self.parse_unary()
-        
-        while self.current_token.type in (TokenType.MULTIPLY, TokenType.DIVIDE):
-            operator = self.current_token.value
-            self.eat(self.current_token.type)
-            right = self.parse_unary()
-            expr = BinaryOp(left=expr, operator=operator, right=right)
-        
-        return expr
+    def _boolop(self, op: str, left: Expression, right: Expression) -> Expression:
+        """构造 AND/OR 节点
+        
+        连续的同种运算追加到同一个 BoolOp 中，不构造左深的链；
+        布尔字面量直接化简：x AND TRUE => x，x AND FALSE => FALSE，OR 同理。
+        """
+        absorbing = op == 'OR'  # OR 遇到 TRUE、AND 遇到 FALSE 时整体确定
+        for side, other in ((left, right), (right, left)):
+            if type(side) is Literal and type(side.value) is bool:
+                return side if side.value is absorbing else other
+        if type(left) is BoolOp and left.operator == op:
+            left.operands.append(right)
+            return left
+        return BoolOp(op, [left, right])
     
     def parse_unary(self) -> Expression:
         """解析一元表达式"""
-        if self.current_token.type in (TokenType.PLUS, TokenType.MINUS, TokenType.NOT):
-            operator = self.current_token.value
-            self.eat(self.current_token.type)
+        if self.current_token.type in _UNARY_OPS:
+            operator = _OPERATOR_STRINGS[self.current_token.type]
+            self._advance()
             operand = self.parse_unary()
-            return UnaryOp(operator=operator, operand=operand)
+            return UnaryOp(operator, operand)
         
         return self.parse_primary()
     
     def parse_primary(self) -> Expression:
         """解析基本表达式"""
+        handler = self._PRIMARY_PARSERS.get(self.current_token.type)
+        if handler is None:
+            self.error(f"无效的表达式 {self.current_token.value}")
+        return handler(self)
+    
+    def parse_number(self) -> Literal:
+        """解析数字字面量"""
         token = self.current_token
-        
-        if token.type == TokenType.NUMBER:
-            self.eat(TokenType.NUMBER)
-            try:
-                value = int(token.value)
-            except ValueError:
-                value = float(token.value)
-            return Literal(value=value)
-        
-        elif token.type == TokenType.STRING:
-            self.eat(TokenType.STRING)
-            return Literal(value=token.value)
-        
-        elif token.type == TokenType.NULL:
-            self.eat(TokenType.NULL)
-            return Literal(value=None)
-        
-        elif token.type == TokenType.LEFT_PAREN:
-            self.eat(TokenType.LEFT_PAREN)
-            expr = self.parse_expression()
-            self.eat(TokenType.RIGHT_PAREN)
-            return expr
-        
-        elif token.type in (
-            TokenType.IDENTIFIER,
-            TokenType.COUNT, TokenType.SUM, TokenType.AVG,
-            TokenType.MAX, TokenType.MIN
-        ):
-            return self.parse_identifier_or_function()
-        
-        self.error(f"无效的表达式 {token.value}")
+        self._advance()  # 由 _PRIMARY_PARSERS 按标记类型分派而来
+        # 词法分析时已经按 int 或 float 转换好了
+        return Literal(token.parsed_value)
+    
+    def parse_string(self) -> Literal:
+        """解析字符串字面量"""
+        token = self.current_token
+        self._advance()  # 由 _PRIMARY_PARSERS 按标记类型分派而来
+        return Literal(token.value)
+    
+    def parse_null(self) -> Literal:
+        """解析NULL"""
+        self._advance()  # 由 _PRIMARY_PARSERS 按标记类型分派而来
+        return Literal(None)
+    
+    def parse_parenthesized(self) -> Expression:
+        """解析括号中的表达式"""
+        self.eat(TokenType.LEFT_PAREN)
+        expr = self.parse_expression()
+        self.eat(TokenType.RIGHT_PAREN)
+        return expr
     
     def parse_identifier_or_function(self):
         """解析标识符或函数调用"""
         token = self.current_token
         name = token.value
+        kind = _AGG_KINDS.get(token.type, AggKind.USER)
         
         # 处理标识符或聚合函数关键字
         if token.type == TokenType.IDENTIFIER:
-            self.eat(TokenType.IDENTIFIER)
-        elif token.type in (TokenType.COUNT, TokenType.SUM, TokenType.AVG, TokenType.MAX, TokenType.MIN):
-            self.eat(token.type)
+            self._advance()
+        elif token.type in _AGGREGATES:
+            self._advance()
         else:
             self.error(f"预期标识符或聚合函数，实际得到 {token.type}")
         
         # 如果下一个token是左括号，这是一个函数调用
         if self.current_token.type == TokenType.LEFT_PAREN:
-            self.eat(TokenType.LEFT_PAREN)
+            self._advance()
             args = []
             
             # 处理特殊情况：COUNT(*)
             if self.current_token.type == TokenType.STAR:
-                args.append(Literal(value='*'))
-                self.eat(TokenType.STAR)
+                args.append(Literal('*'))
+                self._advance()
             else:
                 # 解析普通参数列表
                 while True:
                     args.append(self.parse_expression())
                     if self.current_token.type != TokenType.COMMA:
                         break
-                    self.eat(TokenType.COMMA)
+                    self._advance()
             
             self.eat(TokenType.RIGHT_PAREN)
             
             # 检查是否有 AS 子句
             if self.current_token.type == TokenType.AS:
-                self.eat(TokenType.AS)
+                self._advance()
                 alias = self.current_token.value
                 self.eat(TokenType.IDENTIFIER)
-                return FunctionCall(name=name, args=args, alias=alias)
+                return FunctionCall(name, args, alias, kind)
             
-            return FunctionCall(name=name, args=args)
+            return FunctionCall(name, args, None, kind)
         
         # 如果后面跟着点号，说明是表.列引用
         elif self.current_token.type == TokenType.DOT:
-            self.eat(TokenType.DOT)
+            self._advance()
             column = self.current_token.value
             self.eat(TokenType.IDENTIFIER)
-            return ColumnRef(table=name, column=column)
+            return ColumnRef(name, column)
         
         # 否则就是普通标识符
-        return Identifier(name=name)
+        return Identifier(name)
     def parse_identifier(self) -> Identifier:
         """解析标识符"""
         name = self.current_token.value
         self.eat(TokenType.IDENTIFIER)
-        return Identifier(name=name)
+        return Identifier(name)
     
     def parse_column_list(self) -> List[Expression]:
         """解析列名列表"""
         columns = []
         while True:
             if self.current_token.type == TokenType.STAR:
-                columns.append(Literal(value='*'))
-                self.eat(TokenType.STAR)
+                columns.append(Literal('*'))
+                self._advance()
+            elif (self.current_token.type is TokenType.IDENTIFIER
+                  and self._peek().type in _COLUMN_END_TOKENS):
+                # 最常见的裸列名：向前看一个标记就能确定，不用走完整的表达式解析
+                columns.append(Identifier(self.current_token.value))
+                self._advance()
             else:
                 expr = self.parse_expression()
                 
                 # 处理列别名
                 if self.current_token.type == TokenType.AS:
-                    self.eat(TokenType.AS)
+                    self._advance()
                     alias = self.current_token.value
                     self.eat(TokenType.IDENTIFIER)
-                    expr = ColumnRef(table=None, column=alias)
+                    expr = ColumnRef(None, alias)
                 elif self.current_token.type == TokenType.IDENTIFIER:
                     alias = self.current_token.value
-                    self.eat(TokenType.IDENTIFIER)
-                    expr = ColumnRef(table=None, column=alias)
+                    self._advance()
+                    expr = ColumnRef(None, alias)
                 
                 columns.append(expr)
             
             if self.current_token.type != TokenType.COMMA:
                 break
-            self.eat(TokenType.COMMA)
+            self._advance()
         return columns
     
     def parse_expression_list(self) -> List[Expression]:
@@ -408,7 +531,7 @@ class Parser:
             expressions.append(self.parse_expression())
             if self.current_token.type != TokenType.COMMA:
                 break
-            self.eat(TokenType.COMMA)
+            self._advance()
         return expressions
     
     def parse_order_by_list(self) -> List[OrderByItem]:
@@ -418,56 +541,57 @@ class Parser:
             expr = self.parse_expression()
             direction = 'ASC'
             
-            if self.current_token.type in (TokenType.ASC, TokenType.DESC):
+            if self.current_token.type in _SORT_DIRECTIONS:
                 direction = self.current_token.value
-                self.eat(self.current_token.type)
+                self._advance()
             
             items.append(OrderByItem(expression=expr, direction=direction))
             
             if self.current_token.type != TokenType.COMMA:
                 break
-            self.eat(TokenType.COMMA)
+            self._advance()
         return items
     
     def parse_table_reference(self) -> Expression:
         """解析表引用"""
         # 解析基本表名或子查询
         if self.current_token.type == TokenType.LEFT_PAREN:
-            self.eat(TokenType.LEFT_PAREN)
+            self._advance()
             table = self.parse_select()
             self.eat(TokenType.RIGHT_PAREN)
         else:
             table = self.parse_identifier()
+            # 最常见的 FROM 单个表名：没有别名也没有 JOIN，直接返回
+            if self.current_token.type not in _TABLE_SUFFIX_TOKENS:
+                return TableRef(name=table.name, alias=None, joins=[])
         
         # 解析表别名
         alias = None
         if self.current_token.type == TokenType.AS:
-            self.eat(TokenType.AS)
+            self._advance()
             alias = self.current_token.value
             self.eat(TokenType.IDENTIFIER)
         elif self.current_token.type == TokenType.IDENTIFIER:
             alias = self.current_token.value
-            self.eat(TokenType.IDENTIFIER)
+            self._advance()
         
         # 解析JOIN子句
         joins = []
-        while self.current_token.type in (
-            TokenType.JOIN, TokenType.LEFT, TokenType.RIGHT, TokenType.INNER, TokenType.OUTER
-        ):
+        while self.current_token.type in _JOIN_TOKENS:
             join_type = 'INNER'
             
             if self.current_token.type == TokenType.LEFT:
                 join_type = 'LEFT'
-                self.eat(TokenType.LEFT)
+                self._advance()
                 if self.current_token.type == TokenType.OUTER:
-                    self.eat(TokenType.OUTER)
+                    self._advance()
             elif self.current_token.type == TokenType.RIGHT:
                 join_type = 'RIGHT'
-                self.eat(TokenType.RIGHT)
+                self._advance()
                 if self.current_token.type == TokenType.OUTER:
-                    self.eat(TokenType.OUTER)
+                    self._advance()
             elif self.current_token.type == TokenType.INNER:
-                self.eat(TokenType.INNER)
+                self._advance()
             
             self.eat(TokenType.JOIN)
             join_table = self.parse_table_reference()
@@ -483,3 +607,38 @@ class Parser:
             ))
         
         return TableRef(name=table.name, alias=alias, joins=joins)
+
+
+# 按当前标记类型分派到对应的解析方法，一次字典查找代替逐个比较
+Parser._STATEMENT_PARSERS = {
+    TokenType.SELECT: Parser.parse_select,
+    TokenType.INSERT: Parser.parse_insert,
+    TokenType.UPDATE: Parser.parse_update,
+    TokenType.DELETE: Parser.parse_delete,
+}
+
+Parser._PRIMARY_PARSERS = {
+    TokenType.NUMBER: Parser.parse_number,
+    TokenType.STRING: Parser.parse_string,
+    TokenType.NULL: Parser.parse_null,
+    TokenType.LEFT_PAREN: Parser.parse_parenthesized,
+    TokenType.IDENTIFIER: Parser.parse_identifier_or_function,
+    TokenType.COUNT: Parser.parse_identifier_or_function,
+    TokenType.SUM: Parser.parse_identifier_or_function,
+    TokenType.AVG: Parser.parse_identifier_or_function,
+    TokenType.MAX: Parser.parse_identifier_or_function,
+    TokenType.MIN: Parser.parse_identifier_or_function,
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_sql(sql: str) -> Statement:
+    """解析一条 SQL 语句，相同的 SQL 字符串直接返回缓存的 AST
+    
+    缓存的 AST 会被多次返回，调用方不能原地修改它；需要改写时先复制
+    （QueryOptimizer 只替换它复制出来的节点）。清空缓存用 parse_sql.cache_clear()。
+    """
+    statement = Parser.try_fast_parse(sql)
+    if statement is None:
+        statement = Parser(Lexer(sql)).parse()
+    return statement
@@ -1,22 +1,33 @@
 """SQL 解析器测试"""
 
+import textwrap
 import unittest
-from lexer import Lexer
-from parser import Parser
+from lexer import Lexer, TokenType
+from parser import Parser, parse_sql
+from optimizer import QueryOptimizer
 from ast_nodes import (
     SelectStatement, InsertStatement, UpdateStatement, DeleteStatement,
-    BinaryOp, ColumnRef, Identifier, Literal, TableRef, JoinClause
+    AggKind, BinaryOp, BoolOp, ColumnRef, FunctionCall, Identifier, Literal, TableRef, JoinClause
 )
 
 
+def _parse(sql: str):
+    """通过 parse_sql 的缓存解析；先去掉公共缩进和首尾空白，只有缩进不同的语句共用同一个缓存项"""
+    return parse_sql(textwrap.dedent(sql).strip())
+
+
 class TestParser(unittest.TestCase):
     """SQL 解析器测试类"""
 
+    @classmethod
+    def setUpClass(cls):
+        # 所有测试共用一个解析器，每次通过 reset 换上新的词法分析器
+        cls._parser = Parser(Lexer(""))
+
     def parse_sql(self, sql: str) -> Parser:
-        """辅助方法：创建解析器并解析SQL"""
-        lexer = Lexer(sql)
-        parser = Parser(lexer)
-        return parser
+        """辅助方法：让共用的解析器准备解析SQL"""
+        self._parser.reset(Lexer(sql))
+        return self._parser
 
     def test_select_simple(self):
         """测试简单的 SELECT 语句"""
@@ -153,8 +164,9 @@ class TestParser(unittest.TestCase):
         self.assertIsInstance(stmt.from_table, TableRef)
         self.assertEqual(stmt.from_table.name, "users")
         self.assertEqual(stmt.from_table.alias, "u")
-        self.assertIsInstance(stmt.where, BinaryOp)
+        self.assertIsInstance(stmt.where, BoolOp)
         self.assertEqual(stmt.where.operator, "AND")
+        self.assertEqual(len(stmt.where.operands), 2)
         self.assertEqual(len(stmt.group_by), 2)
         self.assertIsInstance(stmt.having, BinaryOp)
         self.assertEqual(len(stmt.order_by), 1)
@@ -164,6 +176,191 @@ class TestParser(unittest.TestCase):
         self.assertIsInstance(stmt.offset, Literal)
         self.assertEqual(stmt.offset.value, 0)
 
+    def test_bool_op_flattening(self):
+        """测试连续的 AND/OR 展平为一个节点"""
+        sql = "SELECT id FROM t WHERE a = 1 AND b = 2 and c BETWEEN 1 AND 5 OR d = 4"
+        stmt = self.parse_sql(sql).parse()
+
+        self.assertIsInstance(stmt.where, BoolOp)
+        self.assertEqual(stmt.where.operator, "OR")
+        self.assertEqual(len(stmt.where.operands), 2)
+        conjunction = stmt.where.operands[0]
+        self.assertIsInstance(conjunction, BoolOp)
+        self.assertEqual(conjunction.operator, "AND")
+        self.assertEqual(len(conjunction.operands), 3)
+        self.assertEqual(conjunction.operands[2].operator, "BETWEEN")
+
+    def test_constant_folding_on_construction(self):
+        """测试构造节点时化简常量表达式"""
+        stmt = self.parse_sql("SELECT 1 + 2 * 3, 1 / 0 FROM t WHERE 1 = 1 AND b > 2").parse()
+        self.assertEqual(stmt.columns[0], Literal(value=7))
+        # 除以零不折叠，留给执行时报错
+        self.assertIsInstance(stmt.columns[1], BinaryOp)
+        self.assertEqual(stmt.where.operator, ">")
+
+        stmt = self.parse_sql("SELECT a FROM t WHERE x = 1 AND 1 > 2 OR y = 2").parse()
+        self.assertEqual(stmt.where, BinaryOp(left=Identifier(name="y"), operator="=", right=Literal(value=2)))
+
+        stmt = self.parse_sql("SELECT a FROM t WHERE x = 1 OR 2 > 1").parse()
+        self.assertEqual(stmt.where, Literal(value=True))
+
+    def test_column_list_aliases(self):
+        """测试裸列名、隐式别名和 AS 别名混合的列列表"""
+        stmt = self.parse_sql("SELECT a, b c, d AS e, f + 1, g FROM t").parse()
+        self.assertEqual(stmt.columns, [
+            Identifier(name="a"),
+            ColumnRef(table=None, column="c"),
+            ColumnRef(table=None, column="e"),
+            BinaryOp(left=Identifier(name="f"), operator="+", right=Literal(value=1)),
+            Identifier(name="g"),
+        ])
+
+    def test_operator_strings(self):
+        """测试运算符使用统一的字符串，关键字运算符为大写"""
+        stmt = self.parse_sql("SELECT a FROM t WHERE name like 'J%' and x + 1 > y + 2").parse()
+        like, comparison = stmt.where.operands
+        self.assertEqual(like.operator, "LIKE")
+        self.assertEqual(comparison.operator, ">")
+        self.assertIs(comparison.left.operator, comparison.right.operator)
+
+    def test_function_kind(self):
+        """测试聚合函数带有对应的 AggKind，普通函数为 USER"""
+        stmt = self.parse_sql("SELECT count(*), MAX(a) AS m, lower(b) FROM t").parse()
+        self.assertEqual([col.kind for col in stmt.columns], [AggKind.COUNT, AggKind.MAX, AggKind.USER])
+        self.assertEqual(stmt.columns[1], FunctionCall(name="MAX", args=[Identifier(name="a")], alias="m", kind=AggKind.MAX))
+
+    def test_parse_cache(self):
+        """测试相同的 SQL 复用缓存的 AST，优化器不修改缓存的 AST"""
+        sql = "SELECT u.id FROM users u JOIN orders o ON u.id = o.user_id WHERE o.total > 100 AND u.age > 18"
+        stmt = parse_sql(sql)
+        self.assertIs(parse_sql(sql), stmt)
+        where = stmt.where
+        condition = stmt.from_table.joins[0].condition
+
+        optimized = QueryOptimizer().optimize(stmt)
+        self.assertIsNot(optimized, stmt)
+        self.assertIsInstance(optimized.from_table.joins[0].condition, BoolOp)
+        self.assertIs(stmt.where, where)
+        self.assertIs(stmt.from_table.joins[0].condition, condition)
+
+        parse_sql.cache_clear()
+        self.assertIsNot(parse_sql(sql), stmt)
+
+    def test_parse_cache_dedent(self):
+        """测试只有缩进不同的语句经过 _parse 后命中同一个缓存项"""
+        nested = """
+            SELECT id, name
+            FROM users
+            WHERE age > 18
+        """
+        flat = "\nSELECT id, name\nFROM users\nWHERE age > 18\n"
+        stmt = _parse(nested)
+        self.assertIs(_parse(flat), stmt)
+        # 原始字符串不同，直接调用 parse_sql 各占一个缓存项，但 AST 相同
+        self.assertIsNot(parse_sql(nested), parse_sql(flat))
+        self.assertEqual(parse_sql(nested), stmt)
+
+    def test_fast_parse(self):
+        """测试简单 SELECT 的快速路径与完整解析的结果相同，其他语句返回 None"""
+        simple = [
+            "SELECT id, name FROM users",
+            "select * from users where age > 18;",
+            "SELECT a,b FROM t WHERE x>=-3",
+            "  SELECT a FROM t WHERE b != 007  ",
+        ]
+        for sql in simple:
+            fast = Parser.try_fast_parse(sql)
+            self.assertIsNotNone(fast, sql)
+            self.assertEqual(fast, Parser(Lexer(sql)).parse())
+
+        for sql in ("SELECT count FROM t", "SELECT a FROM users u", "SELECT a FROM t WHERE b = 1.5",
+                    "SELECT a FROM t WHERE b = 'x'", "SELECT a FROM t WHERE from = 1", "DELETE FROM t"):
+            self.assertIsNone(Parser.try_fast_parse(sql), sql)
+
+    def test_predicate_pushdown_join_types(self):
+        """测试谓词只下推到 INNER JOIN，外连接和不引用表的条件留在 WHERE 中"""
+        optimizer = QueryOptimizer()
+        stmt = optimizer.optimize(parse_sql(
+            "SELECT u.id FROM users u JOIN orders o ON u.id = o.user_id WHERE o.total > 100 AND u.age > 18"))
+        condition = stmt.from_table.joins[0].condition
+        self.assertEqual(condition.operator, "AND")
+        self.assertEqual(condition.operands[1], BinaryOp(ColumnRef("o", "total"), ">", Literal(100)))
+        self.assertEqual(stmt.where, BinaryOp(ColumnRef("u", "age"), ">", Literal(18)))
+
+        for sql in ("SELECT u.id FROM users u LEFT JOIN orders o ON u.id = o.user_id WHERE o.total > 100",
+                    "SELECT u.id FROM users u RIGHT JOIN orders o ON u.id = o.user_id WHERE o.total > 100",
+                    "SELECT u.id FROM users u JOIN orders o ON u.id = o.user_id WHERE 1 = 0"):
+            original = parse_sql(sql)
+            stmt = optimizer.optimize(original)
+            self.assertEqual(stmt.from_table.joins, original.from_table.joins, sql)
+            self.assertEqual(stmt.where, original.where, sql)
+
+        # LEFT JOIN 之后的 INNER JOIN 仍然可以下推只依赖它自己的条件
+        stmt = optimizer.optimize(parse_sql(
+            "SELECT u.id FROM users u LEFT JOIN orders o ON u.id = o.user_id "
+            "JOIN items i ON o.id = i.order_id WHERE o.total > 100 AND i.price > 5"))
+        left, inner = stmt.from_table.joins
+        self.assertEqual(left.condition, BinaryOp(ColumnRef("u", "id"), "=", ColumnRef("o", "user_id")))
+        self.assertEqual(inner.condition.operands[1], BinaryOp(ColumnRef("i", "price"), ">", Literal(5)))
+        self.assertEqual(stmt.where, BinaryOp(ColumnRef("o", "total"), ">", Literal(100)))
+
+    def test_parser_reset(self):
+        """测试同一个解析器 reset 后解析下一条语句"""
+        parser = Parser(Lexer("SELECT a FROM t"))
+        first = parser.parse()
+        parser.reset(Lexer("DELETE FROM t WHERE id = 1"))
+        self.assertIsInstance(parser.parse(), DeleteStatement)
+        parser.reset(Lexer("SELECT a FROM t"))
+        self.assertEqual(parser.parse(), first)
+
+
+class TestLexer(unittest.TestCase):
+    """SQL 词法分析器测试类"""
+
+    def test_comments_strings_and_positions(self):
+        """测试注释、字符串转义、负数以及行列号"""
+        sql = "SELECT -1.5e3, 'a\\tb' -- 注释\n  FROM t /* 多行\n注释 */ WHERE x != y"
+        lexer = Lexer(sql)
+
+        tokens = list(lexer)
+
+        self.assertEqual(
+            [(t.type, t.value) for t in tokens],
+            [(TokenType.SELECT, 'SELECT'), (TokenType.NUMBER, '-1.5e3'),
+             (TokenType.COMMA, ','), (TokenType.STRING, 'a\tb'),
+             (TokenType.FROM, 'FROM'), (TokenType.IDENTIFIER, 't'),
+             (TokenType.WHERE, 'WHERE'), (TokenType.IDENTIFIER, 'x'),
+             (TokenType.NOT_EQUALS, '!='), (TokenType.IDENTIFIER, 'y')]
+        )
+        self.assertEqual((tokens[4].line, tokens[4].column), (2, 3))
+        self.assertEqual((tokens[6].line, tokens[6].column), (3, 7))
+        # EOF 之后继续返回 EOF
+        self.assertEqual(lexer.get_next_token().type, TokenType.EOF)
+
+    def test_illegal_character(self):
+        """测试非法字符和未闭合的字符串"""
+        for sql in ("SELECT a ! b", "SELECT 'abc"):
+            lexer = Lexer(sql)
+            with self.assertRaises(Exception):
+                list(lexer)
+
+    def test_numbers(self):
+        """测试数字在词法分析时转换为 int 或 float"""
+        lexer = Lexer("1 -3 2.5 1e3 7.")
+        tokens = list(lexer)
+        self.assertTrue(all(token.type == TokenType.NUMBER for token in tokens))
+        values = [token.parsed_value for token in tokens]
+        self.assertEqual(values, [1, -3, 2.5, 1000.0, 7.0])
+        self.assertEqual([type(v) for v in values], [int, int, float, float, float])
+
+    def test_identifiers_interned(self):
+        """测试同名标识符共用同一个字符串对象"""
+        lexer = Lexer("SELECT u.name_col, v.name_col FROM users u")
+        names = [token.value for token in lexer
+                 if token.type == TokenType.IDENTIFIER and token.value == 'name_col']
+        self.assertEqual(len(names), 2)
+        self.assertIs(names[0], names[1])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1 +1,15 @@
+import os
+import tempfile
 
+# 测试数据默认放在内存文件系统上，fsync 和目录操作不会被慢磁盘拖慢；
+# 设置环境变量 LSM_TESTS_ON_DISK=1 时改用系统临时目录，在真实磁盘上验证 fsync 路径
+_SHM_DIR = "/dev/shm"
+
+
+def make_temp_dir() -> str:
+    """创建测试用的临时目录，有可写的 /dev/shm 时优先使用它"""
+    base = None
+    if (not os.environ.get("LSM_TESTS_ON_DISK")
+            and os.path.isdir(_SHM_DIR) and os.access(_SHM_DIR, os.W_OK)):
+        base = _SHM_DIR
+    return tempfile.mkdtemp(dir=base)
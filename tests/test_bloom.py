@@ -71,6 +71,32 @@ class TestBloomFilter(unittest.TestCase):
         # 验证未添加的项仍然不存在
         self.assertFalse(restored.contains("nonexistent"))
     
+    def test_packed_layout(self):
+        """测试位数组按块紧凑存储"""
+        filter = BloomFilter(size=1000, hash_count=5)
+        # 1000 位向上取整为 4 个 256 位的块
+        self.assertEqual(len(filter.to_bytes()), 4 * 32)
+
+        filter.add("test1")
+        # 一个项只会修改一个块
+        touched = [i for i in range(4) if any(filter.to_bytes()[i * 32:(i + 1) * 32])]
+        self.assertEqual(len(touched), 1)
+
+    def test_add_many_and_hash(self):
+        """测试批量添加与预先计算哈希的查询"""
+        items = [f"item{i}" for i in range(500)]
+        bf = BloomFilter(5000, 7)
+        bf.add_many(items)
+        
+        single = BloomFilter(5000, 7)
+        for item in items:
+            single.add(item)
+        self.assertEqual(bf.to_bytes(), single.to_bytes())
+        
+        for item in items:
+            self.assertTrue(bf.contains_hash(BloomFilter.hash(item)))
+            self.assertEqual(bf.contains_hash(BloomFilter.hash(item + "x")), bf.contains(item + "x"))
+    
     def test_different_hash_counts(self):
         """测试不同数量的哈希函数"""
         test_items = ["test1", "test2", "test3"]
@@ -0,0 +1,93 @@
+import unittest
+import random
+from relational.bplus_tree import BPlusTree
+
+class TestBPlusTree(unittest.TestCase):
+    def setUp(self):
+        """测试前初始化B+树"""
+        self.tree = BPlusTree(order=4)
+    
+    def test_insert_and_search(self):
+        """测试乱序插入后的查找"""
+        keys = list(range(200))
+        random.shuffle(keys)
+        for key in keys:
+            self.tree.insert(key, f"value{key}")
+        
+        for key in range(200):
+            self.assertEqual(self.tree.search(key), f"value{key}")
+        self.assertIsNone(self.tree.search(200))
+        self.assertIsNone(self.tree.search(-1))
+    
+    def test_update_existing_key(self):
+        """测试重复插入同一个键时更新值"""
+        for key in range(20):
+            self.tree.insert(key, "old")
+        self.tree.insert(7, "new")
+        
+        self.assertEqual(self.tree.search(7), "new")
+        self.assertEqual(len(self.tree.range_search(0, 19)), 20)
+    
+    def test_range_search(self):
+        """测试跨多个叶子节点的范围查询"""
+        for key in range(0, 100, 2):
+            self.tree.insert(key, key * 10)
+        
+        self.assertEqual(self.tree.range_search(11, 21),
+                         [(12, 120), (14, 140), (16, 160), (18, 180), (20, 200)])
+        self.assertEqual(self.tree.range_search(200, 300), [])
+        self.assertEqual(len(self.tree.range_search(0, 98)), 50)
+        
+        # 惰性遍历可以提前结束
+        items = self.tree.iter_range(11, 99)
+        self.assertEqual(next(items), (12, 120))
+        self.assertEqual(next(items), (14, 140))
+    
+    def test_delete(self):
+        """测试删除后借用和合并节点"""
+        keys = list(range(300))
+        for key in keys:
+            self.tree.insert(key, key)
+        
+        random.shuffle(keys)
+        deleted = set()
+        for key in keys[:250]:
+            self.assertTrue(self.tree.delete(key))
+            deleted.add(key)
+        self.assertFalse(self.tree.delete(keys[0]))
+        
+        remaining = sorted(set(range(300)) - deleted)
+        self.assertEqual(self.tree.range_search(0, 299), [(k, k) for k in remaining])
+        for key in range(300):
+            self.assertEqual(self.tree.search(key), None if key in deleted else key)
+        
+        # 删空之后仍可以继续插入
+        for key in remaining:
+            self.assertTrue(self.tree.delete(key))
+        self.assertTrue(self.tree.root.is_leaf)
+        self.assertEqual(self.tree.range_search(0, 299), [])
+        self.tree.insert(5, "five")
+        self.assertEqual(self.tree.search(5), "five")
+    
+    def test_bulk_load(self):
+        """测试从有序数据批量构建B+树"""
+        items = [(key, key * 2) for key in range(0, 500, 5)] + [(495, "last")]
+        self.tree.bulk_load(items)
+        
+        expected = dict(items)
+        self.assertEqual(self.tree.range_search(0, 500), sorted(expected.items()))
+        self.assertEqual(self.tree.search(495), "last")
+        self.assertIsNone(self.tree.search(3))
+        
+        # 批量构建后仍可以正常插入和删除
+        self.tree.insert(3, "three")
+        self.assertTrue(self.tree.delete(250))
+        self.assertEqual(self.tree.search(3), "three")
+        self.assertIsNone(self.tree.search(250))
+        
+        # 非空树上逐个插入
+        self.tree.bulk_load([(1, "one"), (2, "two")])
+        self.assertEqual(self.tree.range_search(0, 5), [(0, 0), (1, "one"), (2, "two"), (3, "three"), (5, 10)])
+
+if __name__ == '__main__':
+    unittest.main()
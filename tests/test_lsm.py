@@ -1,23 +1,29 @@
+import logging
 import unittest
-import tempfile
 import shutil
 import os
 import random
+import struct
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple
 
 from lsm.lsm import LSMTree
+from lsm.sstable.table import SSTable
+from tests import make_temp_dir
 from lsm.utils.generator import (
     generate_random_kv_pairs,
     generate_sequential_kv_pairs,
-    generate_random_string
+    generate_random_strings
 )
 
+logger = logging.getLogger(__name__)
+
 class TestLSM(unittest.TestCase):
     def setUp(self):
         """创建临时目录"""
-        self.temp_dir = tempfile.mkdtemp()
+        self.temp_dir = make_temp_dir()
         self.lsm = LSMTree(self.temp_dir, memtable_size=4096)  # 使用小的 MemTable 以便测试
 
     def tearDown(self):
@@ -78,97 +84,90 @@ class TestLSM(unittest.TestCase):
         self.assertEqual(results[0][0], "key2")
         self.assertEqual(results[-1][0], "key4")
 
+    def test_range_scan_key_order(self):
+        """测试范围查询按先长度后字典序返回最新的值"""
+        self.lsm.put("b", "old")
+        self.lsm.put("aa", "1")
+        self.lsm._compact_memtable()
+        self.lsm.put("b", "new")
+        self.lsm._compact_memtable()
+        self.lsm.put("a", "2")
+        self.lsm.put("ccc", "3")
+        
+        self.assertEqual(list(self.lsm.range_scan("a", "bb")),
+                         [("a", "2"), ("b", "new"), ("aa", "1")])
+
     def test_compaction(self):
-        """测试压缩机制"""
-        # 写入足够多的数据触发 MemTable 转换为 SSTable
+        """测试压缩机制：恰好两次 MemTable 转换，再合并为一个 SSTable"""
         pairs = generate_sequential_kv_pairs(1000)
+        half = len(pairs) // 2
+        
+        # 键值长度都相同，MemTable 大小取前一半数据的大小，每写完一半恰好转换一次
+        self.lsm.close()
+        memtable_size = sum(len(k) + len(v) for k, v in pairs[:half])
+        self.lsm = LSMTree(self.temp_dir, memtable_size=memtable_size)
+        
+        for batch in (pairs[:half], pairs[half:]):
+            self.lsm.put_many(batch)
+            # 等待写队列中的记录全部写入
+            self.lsm._drain_writes()
+        self.assertEqual(len(self.lsm.sstables), 2)
+        self.assertEqual(len(self.lsm.memtable), 0)
+        
+        self.lsm.compact()
+        self.assertEqual(len(self.lsm.sstables), 1)
         
+        # 验证所有数据都可以被读取
+        keys = [key for key, _ in pairs]
+        self.assertEqual(self.lsm.get_many(keys), [value for _, value in pairs])
+
+    def test_compaction_small_memtable(self):
+        """测试很小的 MemTable 反复转换并自动合并"""
+        pairs = generate_sequential_kv_pairs(20)
+        
+        self.lsm.close()
+        self.lsm = LSMTree(self.temp_dir, memtable_size=64)
         for key, value in pairs:
             self.lsm.put(key, value)
+            self.lsm._drain_writes()
         
-        # 确保数据被正确压缩
-        self.assertGreater(len(self.lsm.sstables), 0)
+        self.lsm.compact()
+        self.assertEqual(len(self.lsm.sstables), 1)
         
-        # 验证所有数据都可以被读取
-        for key, expected_value in pairs:
-            value = self.lsm.get(key)
-            self.assertEqual(value, expected_value)
+        keys = [key for key, _ in pairs]
+        self.assertEqual(self.lsm.get_many(keys), [value for _, value in pairs])
 
     def test_recovery(self):
         """测试崩溃恢复"""
-        print("\n=== 开始测试 ===")
-        
         # 写入一些数据
         pairs = generate_random_kv_pairs(100)
-        print(f"\n=== 生成了 {len(pairs)} 个键值对 ===")
-        print("前5个键值对示例:")
-        for key, value in pairs[:5]:
-            print(f"  {key} -> {value}")
+        logger.debug("生成了 %d 个键值对", len(pairs))
         
-        print("\n=== 写入数据 ===")
         for i, (key, value) in enumerate(pairs):
             self.lsm.put(key, value)
             if i < 5:  # 只检查前5个
-                current = self.lsm.get(key)
-                print(f"写入后立即读取 #{i}: {key} -> {current}")
-                assert current == value, f"立即读取失败: 期望 {value}, 得到 {current}"
-        
-        print(f"\nMemTable大小: {len(self.lsm.memtable)}")
-        print(f"SSTable数量: {len(self.lsm.sstables)}")
-        
-        # 验证写入后的数据
-        print("\n=== 验证写入的数据 ===")
-        errors = 0
-        for i, (key, expected) in enumerate(pairs):
-            value = self.lsm.get(key)
-            if value != expected:
-                print(f"错误 #{i}: {key} -> 得到 {value}, 期望 {expected}")
-                errors += 1
-                if errors >= 5:  # 只显示前5个错误
-                    break
-        if errors == 0:
-            print("所有数据验证正确")
-        
-        # 关闭 LSM 树
-        print("\n=== 关闭 LSM 树 ===")
-        self.lsm.close()
+                self.assertEqual(self.lsm.get(key), value, f"写入后立即读取 #{i} 失败")
+        
+        logger.debug("MemTable大小: %d, SSTable数量: %d",
+                     len(self.lsm.memtable), len(self.lsm.sstables))
+        
+        # 验证写入后的数据（随机键可能重复，以最后一次写入为准）
+        expected = dict(pairs)
+        keys = list(expected)
+        self.assertEqual(self.lsm.get_many(keys), list(expected.values()))
         
-        # 重新打开 LSM 树
-        print("\n=== 重新打开 LSM 树 ===")
+        # 关闭后重新打开 LSM 树
+        self.lsm.close()
         self.lsm = LSMTree(self.temp_dir)
         
-        print(f"\n恢复后:")
-        print(f"SSTable数量: {len(self.lsm.sstables)}")
-        if self.lsm.sstables:
-            print("\nSSTable信息:")
-            for i, sst in enumerate(self.lsm.sstables):
-                print(f"\nSSTable #{i}:")
-                print(f"  序列号: {sst.sequence}")
-                if sst.metadata:
-                    print(f"  数据大小: {sst.metadata.data_size}")
-                    print(f"  键范围: {sst.metadata.min_key} -> {sst.metadata.max_key}")
+        for i, sst in enumerate(self.lsm.sstables):
+            if sst.metadata:
+                logger.debug("恢复后 SSTable #%d: 序列号 %d, 键范围 %s -> %s", i, sst.sequence,
+                             sst.metadata.min_key, sst.metadata.max_key)
         
-        # 验证恢复后的数据
-        print("\n=== 验证恢复后的数据 ===")
-        errors = 0
-        for i, (key, expected) in enumerate(pairs):
-            value = self.lsm.get(key)
-            if value != expected:
-                print(f"错误 #{i}: {key} -> 得到 {value}, 期望 {expected}")
-                # 尝试从每个SSTable直接读取
-                print(f"  尝试从每个SSTable直接读取 {key}:")
-                for j, sst in enumerate(self.lsm.sstables):
-                    sst_value = sst.get(key)
-                    print(f"    SSTable #{j}: {sst_value}")
-                errors += 1
-                if errors >= 5:  # 只显示前5个错误
-                    break
-        
-        if errors == 0:
-            print("所有数据恢复正确")
-        else:
-            print(f"\n总计 {errors} 个错误")
-            self.fail("数据恢复验证失败")
+        # 验证恢复后的数据：批量点查一次，再用一次覆盖所有 16 位键的范围扫描走合并路径
+        self.assertEqual(self.lsm.get_many(keys), list(expected.values()))
+        self.assertEqual(dict(self.lsm.range_scan("0" * 16, "z" * 16)), expected)
 
     def test_simple_recovery(self):
         """测试简单的恢复场景"""
@@ -179,96 +178,258 @@ class TestLSM(unittest.TestCase):
             ("key3", "value3"),
         ]
         
-        print("\n=== 写入初始数据 ===")
         for key, value in test_data:
             self.lsm.put(key, value)
-            print(f"写入: {key} -> {value}")
             # 立即读取验证
-            current_value = self.lsm.get(key)
-            print(f"立即读取: {key} -> {current_value}")
-        
-        print("\n=== MemTable 状态 ===")
-        print(f"MemTable 大小: {len(self.lsm.memtable)}")
+            self.assertEqual(self.lsm.get(key), value)
         
         # 强制进行一次 compact
-        print("\n=== 强制 Compact MemTable ===")
         self.lsm._compact_memtable()
-        
-        print("\n=== Compact 后状态 ===")
-        print(f"MemTable 大小: {len(self.lsm.memtable)}")
-        print(f"SSTable 数量: {len(self.lsm.sstables)}")
+        logger.debug("Compact 后 MemTable 大小: %d, SSTable 数量: %d",
+                     len(self.lsm.memtable), len(self.lsm.sstables))
         
         # 确保数据可以正确读取
-        print("\n=== Compact 后验证数据 ===")
         for key, expected_value in test_data:
-            value = self.lsm.get(key)
-            print(f"读取: {key} -> {value} (期望: {expected_value})")
-            self.assertEqual(value, expected_value)
+            self.assertEqual(self.lsm.get(key), expected_value)
         
-        # 关闭 LSM 树
-        print("\n=== 关闭 LSM 树 ===")
+        # 关闭后重新打开 LSM 树
         self.lsm.close()
-        
-        # 重新打开 LSM 树
-        print("\n=== 重新打开 LSM 树 ===")
         self.lsm = LSMTree(self.temp_dir)
         
         # 验证恢复后的数据
-        print("\n=== 验证恢复后的数据 ===")
         for key, expected_value in test_data:
-            value = self.lsm.get(key)
-            print(f"读取: {key} -> {value} (期望: {expected_value})")
-            self.assertEqual(value, expected_value)
-        
-        # 打印 SSTable 信息
-        print("\n=== SSTable 信息 ===")
-        print(f"SSTable 数量: {len(self.lsm.sstables)}")
-        for i, sstable in enumerate(self.lsm.sstables):
-            print(f"SSTable {i}:")
-            print(f"  序列号: {sstable.sequence}")
-            print(f"  文件路径: {sstable.file_path}")
-            if sstable.metadata:
-                print(f"  最小键: {sstable.metadata.min_key}")
-                print(f"  最大键: {sstable.metadata.max_key}")
-            
-            # 尝试从这个 SSTable 读取所有键
-            print("  存储的键值对:")
-            for key, expected_value in test_data:
-                value = sstable.get(key)
-                print(f"    {key} -> {value}")
+            self.assertEqual(self.lsm.get(key), expected_value)
+        
+        # 所有键都在某个 SSTable 中
+        for key, expected_value in test_data:
+            values = [sstable.get(key) for sstable in self.lsm.sstables]
+            logger.debug("%s 在各个 SSTable 中的值: %s", key, values)
+            self.assertIn(expected_value, values)
+
+    def test_wal_group_commit(self):
+        """测试写队列的组提交"""
+        for i in range(5):
+            self.lsm.put(f"key{i}", f"value{i}")
+        
+        # 还在写队列中的写入也能读到
+        for i in range(5):
+            self.assertEqual(self.lsm.get(f"key{i}"), f"value{i}")
+        
+        # 取空写队列后，所有记录都已提交到 WAL 和 MemTable
+        self.lsm._drain_writes()
+        self.assertEqual(len(self.lsm._pending), 0)
+        self.assertEqual(len(list(self.lsm.wal.recover())), 5)
+        self.assertEqual(len(self.lsm.memtable), 5)
+        
+        # 关闭后数据仍然存在
+        self.lsm.close()
+        self.lsm = LSMTree(self.temp_dir)
+        for i in range(5):
+            self.assertEqual(self.lsm.get(f"key{i}"), f"value{i}")
+
+    def test_put_many(self):
+        """测试批量写入"""
+        items = [(f"key{i}", f"value{i}") for i in range(200)]
+        items.append(("key0", "latest"))
+        self.lsm.put_many(items)
+        
+        self.assertEqual(self.lsm.get("key0"), "latest")
+        self.lsm._drain_writes()
+        self.assertEqual(len(self.lsm._pending), 0)
+        self.assertEqual(self.lsm.get("key0"), "latest")
+        for i in range(1, 200):
+            self.assertEqual(self.lsm.get(f"key{i}"), f"value{i}")
+
+    def test_key_too_long(self):
+        """测试超过 SSTable.MAX_KEY_SIZE 的键在写入时被拒绝，最长的键可以落盘"""
+        longest = "键" * (SSTable.MAX_KEY_SIZE // 3)  # 每个字符 3 字节
+        with self.assertRaises(ValueError):
+            self.lsm.put(longest + "k", "v")
+        with self.assertRaises(ValueError):
+            self.lsm.put_many([("a", "1"), ("b" * (SSTable.MAX_KEY_SIZE + 1), "2")])
+        # 整批被拒绝，没有任何键进入写队列
+        self.assertIsNone(self.lsm.get("a"))
+        
+        self.lsm.put(longest, "v")
+        self.lsm._drain_writes()
+        self.lsm._compact_memtable()
+        self.assertEqual(len(self.lsm.sstables), 1)
+        self.assertEqual(self.lsm.get(longest), "v")
+
+    def _wait_for_write_error(self):
+        """等待写线程处理完写队列并记录写入失败的异常"""
+        deadline = time.monotonic() + 5
+        while self.lsm._write_error is None:
+            self.assertLess(time.monotonic(), deadline, "写线程没有报告写入失败")
+            time.sleep(0.001)
+
+    def _fail_wal_writes(self):
+        """让 WAL 写入失败，模拟写线程中的磁盘错误；返回恢复 WAL 的函数"""
+        append_many = self.lsm.wal.append_many
+        
+        def failing_append_many(entries):
+            raise OSError("disk full")
+        self.lsm.wal.append_many = failing_append_many
+        
+        def restore():
+            self.lsm.wal.append_many = append_many
+        return restore
+
+    def test_put_type_check(self):
+        """测试键和值的类型在 put 时同步检查，错误的写入不进入写队列"""
+        with self.assertRaises(TypeError):
+            self.lsm.put(1, "value")
+        with self.assertRaises(TypeError):
+            self.lsm.put("key1", 1)
+        with self.assertRaises(TypeError):
+            self.lsm.put_many([("key1", "value1"), ("key2", b"value2")])
+        self.assertEqual(len(self.lsm._pending), 0)
+        self.assertIsNone(self.lsm.get("key1"))
+        
+        self.lsm.put("key1", "value1")
+        self.assertEqual(self.lsm.get("key1"), "value1")
+
+    def test_writer_failure(self):
+        """测试写线程写入失败时，失败的写入不再可读，异常只抛给之后的写入"""
+        restore = self._fail_wal_writes()
+        self.lsm.put("key1", "value1")
+        self._wait_for_write_error()
+        self.assertNotIn("key1", self.lsm._pending)
+        
+        # 读取不抛出写线程的异常，失败的写入没有写进 MemTable
+        self.assertIsNone(self.lsm.get("key1"))
+        self.assertEqual(self.lsm.get_many(["key1"]), [None])
+        self.assertEqual(list(self.lsm.range_scan("key0", "key9")), [])
+        
+        # 下一次写入收到异常，异常只抛出一次
+        with self.assertRaises(OSError):
+            self.lsm.put("key2", "value2")
+        self.assertIsNone(self.lsm.get("key2"))
+        restore()
+        self.lsm.put("key2", "value2")
+        self.assertEqual(self.lsm.get("key2"), "value2")
+
+    def test_writer_failure_on_close(self):
+        """测试写入失败的异常在关闭时抛出，关闭后不能再写入"""
+        restore = self._fail_wal_writes()
+        self.lsm.put("key1", "value1")
+        self._wait_for_write_error()
+        restore()
+        with self.assertRaises(OSError):
+            self.lsm.close()
+        with self.assertRaises(RuntimeError):
+            self.lsm.put("key1", "value1")
+        with self.assertRaises(RuntimeError):
+            self.lsm.put_many([("key1", "value1")])
+
+    def test_get_many(self):
+        """测试批量读取，结果与逐个 get 一致"""
+        pairs = generate_sequential_kv_pairs(1000)
+        self.lsm.put_many(pairs)
+        self.lsm._drain_writes()
+        self.lsm.put(pairs[1][0], "pending")
+        self.lsm.delete(pairs[2][0])
+        
+        keys = [pairs[1][0], pairs[2][0], "missing"] + [key for key, _ in pairs[500:]]
+        self.assertEqual(self.lsm.get_many(keys), [self.lsm.get(key) for key in keys])
+        self.assertEqual(self.lsm.get_many(keys)[:3], ["pending", None, None])
+        self.assertEqual(self.lsm.get_many([]), [])
+
+    def test_get_prefers_newest_sstable(self):
+        """测试多个 SSTable 包含同一键时读取最新的值"""
+        for i in range(3):
+            self.lsm.put("key", f"value{i}")
+            self.lsm.put(f"other{i}", "x")
+            self.lsm._compact_memtable()
+        
+        self.assertEqual(len(self.lsm.sstables), 3)
+        self.assertEqual(self.lsm.get("key"), "value2")
+        self.assertEqual(self.lsm.get("other0"), "x")
+        self.assertIsNone(self.lsm.get("missing"))
+
+    def test_recover_sstable_order(self):
+        """测试重启后并发加载的 SSTable 仍按从旧到新排列"""
+        for i in range(3):
+            self.lsm.put("key", f"value{i}")
+            self.lsm._compact_memtable()
+        
+        # 模拟不经过 close 的重启，保留多个 SSTable
+        self.lsm._stop_writer()
+        self.lsm.wal.close()
+        self.lsm._read_pool.shutdown()
+        self.lsm = LSMTree(self.temp_dir, memtable_size=4096)
+        
+        self.assertEqual([sst.sequence for sst in self.lsm.sstables], [0, 1, 2])
+        self.assertEqual(self.lsm.get("key"), "value2")
+
+    def test_recover_unsupported_version(self):
+        """测试遇到其他版本格式的 SSTable 时启动失败，而不是跳过其中的数据"""
+        self.lsm.put("key", "value")
+        self.lsm.close()
+        
+        sst_dir = os.path.join(self.temp_dir, "sstable")
+        (name,) = [name for name in os.listdir(sst_dir) if name.endswith(".sst")]
+        fd = os.open(os.path.join(sst_dir, name), os.O_WRONLY)
+        try:
+            os.pwrite(fd, struct.pack('>I', 1), 4)  # 改成旧的版本号
+        finally:
+            os.close(fd)
+        
+        with self.assertRaisesRegex(ValueError, "Unsupported SSTable version 1"):
+            LSMTree(self.temp_dir, memtable_size=4096)
+
+    def test_get_during_compaction(self):
+        """测试读取在锁外访问 SSTable 时，并发合并不会导致读不到已有的键"""
+        for i in range(500):
+            self.lsm.put(f"key{i}", f"value{i}")
+        self.lsm._compact_memtable()
+        
+        errors = []
+        stop = threading.Event()
+        
+        def reader():
+            while not stop.is_set():
+                for i in range(0, 500, 37):
+                    if self.lsm.get(f"key{i}") != f"value{i}":
+                        errors.append(f"key{i}")
+        
+        thread = threading.Thread(target=reader)
+        thread.start()
+        try:
+            for round in range(30):
+                self.lsm.put(f"extra{round}", "x")
+                self.lsm.compact()
+        finally:
+            stop.set()
+            thread.join()
+        
+        self.assertEqual(errors, [])
 
     def test_concurrent_operations(self):
         """测试并发操作"""
+        # 键和值预先生成，所有线程共用
+        keys = [f"key_{i}" for i in range(100)]
+        values = [f"value_{i}" for i in range(100)]
+        
         def writer():
             """写入线程"""
             for i in range(100):
-                key = f"key_{i}"
-                value = f"value_{i}"
-                self.lsm.put(key, value)
+                self.lsm.put(keys[i], values[i])
                 if i % 2 == 0:
-                    self.lsm.delete(key)
+                    self.lsm.delete(keys[i])
         
         def reader():
             """读取线程"""
-            for i in range(100):
-                key = f"key_{i}"
+            for key in keys:
                 value = self.lsm.get(key)
                 if value is not None:
                     self.assertTrue(value.startswith("value_"))
         
-        # 创建多个读写线程
-        threads = []
-        for _ in range(3):
-            threads.append(threading.Thread(target=writer))
-            threads.append(threading.Thread(target=reader))
-        
-        # 启动所有线程
-        for thread in threads:
-            thread.start()
-        
-        # 等待所有线程完成
-        for thread in threads:
-            thread.join()
+        # 3 个写线程和 3 个读线程；result() 会重新抛出线程中的断言失败
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            futures = [pool.submit(task) for _ in range(3) for task in (writer, reader)]
+            for future in futures:
+                future.result()
 
     def test_large_values(self):
         """测试大值"""
@@ -285,25 +446,26 @@ class TestLSM(unittest.TestCase):
         operations = []
         keys = []
         
-        # 生成随机操作
-        for i in range(1000):
-            if i < 500:  # 前500次操作主要是写入
-                op = random.choice(['put'] * 8 + ['delete', 'get'])
-            else:  # 后500次操作主要是读取和删除
-                op = random.choice(['put', 'delete', 'get'] * 2)
-            
+        # 一次生成全部随机操作：前500次主要是写入，后500次主要是读取和删除
+        rng = random.Random(0)
+        ops = (rng.choices(['put'] * 8 + ['delete', 'get'], k=500)
+               + rng.choices(['put', 'delete', 'get'], k=500))
+        # 写入用的键和值也预先生成，循环中只按下标取用
+        key_pool = generate_random_strings(len(ops), 8)
+        value_pool = generate_random_strings(len(ops), 100)
+        
+        for i, op in enumerate(ops):
             if op == 'put':
-                key = generate_random_string(8)
-                value = generate_random_string(100)
+                key, value = key_pool[i], value_pool[i]
                 self.lsm.put(key, value)
                 keys.append((key, value))
                 operations.append(('put', key, value))
             elif op == 'delete' and keys:
-                key, _ = random.choice(keys)
+                key, _ = rng.choice(keys)
                 self.lsm.delete(key)
                 operations.append(('delete', key, None))
             elif op == 'get' and keys:
-                key, expected_value = random.choice(keys)
+                key, expected_value = rng.choice(keys)
                 value = self.lsm.get(key)
                 # 注意：由于可能被删除，值可能为 None
                 operations.append(('get', key, value))
@@ -325,11 +487,12 @@ class TestLSM(unittest.TestCase):
         self.assertEqual(self.lsm.get(unicode_str), unicode_str)
         
         # 测试范围查询的边界情况
-        results = list(self.lsm.range_scan("", "z"))  # 全范围查询
-        self.assertGreater(len(results), 0)
+        # 只需要知道有没有结果，取第一个即可，不必把整个范围读出来
+        first = next(iter(self.lsm.range_scan("", "z")), None)  # 全范围查询
+        self.assertIsNotNone(first)
         
-        results = list(self.lsm.range_scan("nonexistent1", "nonexistent2"))  # 空范围
-        self.assertEqual(len(results), 0)
+        first = next(iter(self.lsm.range_scan("nonexistent1", "nonexistent2")), None)  # 空范围
+        self.assertIsNone(first)
 
     def test_simple_compaction(self):
         """测试简单的合并功能"""
@@ -364,5 +527,26 @@ class TestLSM(unittest.TestCase):
         self.assertEqual(self.lsm.get("key2"), "new_value2", "key2 应该是更新后的值")
         self.assertEqual(self.lsm.get("key3"), "value3", "key3 应该保持不变")
 
+    def test_compaction_merge_order(self):
+        """测试合并不同长度、相互覆盖的键"""
+        batches = [
+            [("b", "1"), ("aa", "1"), ("ccc", "1")],
+            [("a", "2"), ("aa", "2"), ("dddd", "2")],
+            [("b", "3"), ("ccc", "\0")],
+        ]
+        for batch in batches:
+            for key, value in batch:
+                self.lsm.put(key, value)
+            self.lsm._compact_memtable()
+        
+        self.lsm.compact()
+        
+        self.assertEqual(len(self.lsm.sstables), 1)
+        merged = self.lsm.sstables[0]
+        self.assertEqual(list(merged.range_scan(merged.metadata.min_key, merged.metadata.max_key)),
+                         [("a", "2"), ("b", "3"), ("aa", "2"), ("dddd", "2")])
+        for key, expected in [("a", "2"), ("b", "3"), ("aa", "2"), ("ccc", None), ("dddd", "2")]:
+            self.assertEqual(self.lsm.get(key), expected)
+
 if __name__ == '__main__':
     unittest.main()
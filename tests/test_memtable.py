@@ -1,6 +1,8 @@
+import sys
 import unittest
 import random
 import string
+from bisect import bisect_left, bisect_right
 from typing import Dict, List, Tuple
 from lsm.memtable.table import MemTable
 
@@ -43,9 +45,20 @@ class TestMemTable(unittest.TestCase):
             data[key] = value
             self.memtable.put(key, value)
         
-        # 验证所有数据
-        for key, value in data.items():
-            self.assertEqual(self.memtable.get(key), value)
+        # 验证所有数据：逐个 get 的结果和整体快照都与写入的数据一致，各只比较一次
+        self.assertEqual({key: self.memtable.get(key) for key in data}, data)
+        self.assertEqual(dict(self.memtable.snapshot()), data)
+    
+    def test_put_many(self):
+        """测试批量写入与逐个 put 的结果和大小一致"""
+        items = [(f"key{i % 50:04d}", f"value{i:04d}") for i in range(120)]
+        self.memtable.put_many(items)
+        
+        expected = MemTable()
+        for key, value in items:
+            expected.put(key, value)
+        self.assertEqual(self.memtable.snapshot(), expected.snapshot())
+        self.assertEqual(self.memtable.size, expected.size)
     
     def test_size_tracking(self):
         """测试大小跟踪"""
@@ -64,6 +77,11 @@ class TestMemTable(unittest.TestCase):
         old_size = self.memtable.size
         self.memtable.delete("key1")
         self.assertLess(self.memtable.size, old_size)
+        self.assertEqual(self.memtable.size, 0)
+        
+        # ASCII 键值的大小与 sys.getsizeof 的统计一致
+        self.memtable.put("key2", "value2")
+        self.assertEqual(self.memtable.size, sys.getsizeof("key2") + sys.getsizeof("value2"))
     
     def test_range_scan(self):
         """测试范围查询"""
@@ -84,16 +102,22 @@ class TestMemTable(unittest.TestCase):
             ("key0030", "key0035")   # 小范围
         ]
         
+        # 键等长，排序后的顺序就是 MemTable 的顺序；每个范围用二分查找切出预期结果
+        sorted_items = sorted(data.items())
+        sorted_keys = [k for k, _ in sorted_items]
+        
         for start_key, end_key in test_ranges:
             # 获取预期结果
-            expected = {k: v for k, v in data.items() 
-                       if start_key <= k <= end_key}
+            lo = bisect_left(sorted_keys, start_key)
+            hi = bisect_right(sorted_keys, end_key)
+            expected = sorted_items[lo:hi]
             
-            # 执行范围查询
-            result = dict(self.memtable.range_scan(start_key, end_key))
+            # 执行范围查询，结果必须按键有序
+            result = list(self.memtable.range_scan(start_key, end_key))
             
             # 验证结果
             self.assertEqual(result, expected)
+            self.assertEqual(self.memtable.range_snapshot(start_key, end_key), expected)
     
     def test_deleted_entries(self):
         """测试删除标记的处理"""
@@ -136,8 +160,9 @@ class TestMemTable(unittest.TestCase):
             data.append((key, value))
             self.memtable.put(key, value)
         
-        # 获取迭代器
-        entries = list(self.memtable)
+        # 获取全部键值对
+        entries = self.memtable.snapshot()
+        self.assertEqual(entries, list(self.memtable))
         
         # 验证顺序和内容
         self.assertEqual(len(entries), len(data))
@@ -145,6 +170,14 @@ class TestMemTable(unittest.TestCase):
             self.assertEqual(key1, key2)
             self.assertEqual(value1, value2)
     
+    def test_key_ordering(self):
+        """测试不同长度的键按先长度后字典序排列"""
+        for key in ["bb", "a", "ccc", "b", "aa"]:
+            self.memtable.put(key, key)
+
+        self.assertEqual([k for k, _ in self.memtable], ["a", "b", "aa", "bb", "ccc"])
+        self.assertEqual([k for k, _ in self.memtable.range_scan("b", "bb")], ["b", "aa", "bb"])
+
     def test_empty_table(self):
         """测试空表的操作"""
         # 测试空表的获取操作
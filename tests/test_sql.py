@@ -19,11 +19,7 @@ class TestLexer(TestCase):
         sql = "SELECT id, name FROM users WHERE age >= 18;"
         lexer = Lexer(sql)
         
-        tokens = []
-        token = lexer.get_next_token()
-        while token.type != TokenType.EOF:
-            tokens.append(token)
-            token = lexer.get_next_token()
+        tokens = list(lexer)
         
         expected_types = [
             TokenType.SELECT,
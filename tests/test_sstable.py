@@ -1,17 +1,22 @@
+import gc
+import mmap
 import unittest
-import tempfile
 import os
 import shutil
 import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple
-from lsm.sstable.table import SSTable
+from lsm.sstable.table import SSTable, SSTableMetadata, _shared_prefix_len
+from lsm.filter.bloom import BloomFilter
 from lsm.config import default_config
 from lsm.file_manager.manager import FileManager
+from tests import make_temp_dir
 
 class TestSSTable(unittest.TestCase):
     def setUp(self):
         # 创建临时目录
-        self.temp_dir = tempfile.mkdtemp()
+        self.temp_dir = make_temp_dir()
         self.file_manager = FileManager(self.temp_dir)
     
     def tearDown(self):
@@ -42,19 +47,22 @@ class TestSSTable(unittest.TestCase):
         self.assertTrue(os.path.exists(sst_file))
         
         # 验证文件格式
-        with open(sst_file, 'rb') as f:
-            # 验证魔数
-            magic = f.read(4)
+        with open(sst_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # 魔数和版本号一次解码
+            magic, version = struct.unpack_from('>4sI', mm, 0)
             self.assertEqual(magic, default_config.SST_MAGIC_NUMBER)
-            
-            # 验证版本号
-            version = struct.unpack('>I', f.read(4))[0]
             self.assertEqual(version, default_config.SST_VERSION)
             
             # 验证文件头大小
-            f.seek(0, os.SEEK_END)
-            file_size = f.tell()
-            self.assertGreater(file_size, default_config.SST_HEADER_SIZE)
+            self.assertGreater(len(mm), default_config.SST_HEADER_SIZE)
+    
+    def test_metadata_layout(self):
+        """测试元数据的二进制布局"""
+        metadata = SSTableMetadata(level=1, sequence=7, data_size=100, min_key="a",
+                                   max_key="键zz", index_offset=4196, bloom_offset=4300)
+        data = b'\xff' * 8 + metadata.to_bytes()
+        restored = SSTableMetadata.from_bytes(data, 8)
+        self.assertEqual(restored.to_dict(), metadata.to_dict())
     
     def test_create_and_load(self):
         """测试创建和加载SSTable"""
@@ -96,12 +104,55 @@ class TestSSTable(unittest.TestCase):
         self.assertTrue(loaded_table.load())
         
         # 验证数据
-        for key, value in data:
-            self.assertEqual(loaded_table.get(key), value)
+        self.assertListEqual([loaded_table.get(key) for key, _ in data], [value for _, value in data])
         
         # 验证不存在的键
         self.assertIsNone(loaded_table.get("nonexistent"))
     
+    def test_index_lookup(self):
+        """测试跨多个索引项、键长度不同时的二分查找"""
+        keys = sorted((f"k{i}" for i in range(1000)), key=lambda k: (len(k), k))
+        data = [(key, f"v{key}") for key in keys]
+        table = SSTable.create_from_memtable(
+            self.file_manager, "sst", level=0, sequence=1,
+            entries=iter(data), expected_entries=len(data)
+        )
+        table.close()
+        
+        loaded_table = SSTable(self.temp_dir, 0, 1)
+        self.assertTrue(loaded_table.load())
+        self.assertEqual(len(loaded_table.index), (len(data) + SSTable.INDEX_INTERVAL - 1) // SSTable.INDEX_INTERVAL)
+        for key, value in data:
+            self.assertEqual(loaded_table.get(key), value)
+        self.assertIsNone(loaded_table.get("k1000"))
+        self.assertIsNone(loaded_table.get("a"))
+        
+        # 范围查询从索引定位的数据段开始
+        self.assertEqual(list(loaded_table.range_scan("k500", "k503")),
+                         [(f"k{i}", f"vk{i}") for i in range(500, 504)])
+        self.assertEqual(len(list(loaded_table.range_scan("k9", "k10"))), 2)
+    
+    def test_index_interval_grows(self):
+        """测试大表增大索引间隔，索引项数量有上限"""
+        data = [(f"key{i:06d}", "v") for i in range(50000)]
+        original = SSTable.MAX_INDEX_ENTRIES
+        SSTable.MAX_INDEX_ENTRIES = 100
+        try:
+            table = SSTable.create_from_memtable(
+                self.file_manager, "sst", level=0, sequence=1,
+                entries=iter(data), expected_entries=len(data)
+            )
+        finally:
+            SSTable.MAX_INDEX_ENTRIES = original
+        table.close()
+        
+        loaded_table = SSTable(self.temp_dir, 0, 1)
+        self.assertTrue(loaded_table.load())
+        self.assertEqual(loaded_table.metadata.entry_count, len(data))
+        self.assertEqual(len(loaded_table.index), 100)
+        for key, value in data[::997]:
+            self.assertEqual(loaded_table.get(key), value)
+    
     def test_bloom_filter(self):
         """测试布隆过滤器"""
         # 准备数据
@@ -131,6 +182,86 @@ class TestSSTable(unittest.TestCase):
         # 验证不存在的键
         self.assertFalse(table.filter.contains("nonexistent"))
     
+    def test_prefix_compression(self):
+        """测试数据区对键做前缀压缩"""
+        data = [(f"user:profile:{i:05d}", "v") for i in range(300)]
+        # 共享前缀在多字节字符中间截断
+        data += [("ké", "1"), ("kè", "2")]
+        data.sort(key=lambda item: (len(item[0]), item[0]))
+        table = SSTable.create_from_memtable(
+            self.file_manager, "sst", level=0, sequence=1,
+            entries=iter(data), expected_entries=len(data)
+        )
+        
+        # 除重启点外只存键的后缀，数据区比完整存储所有键小
+        full_size = sum(8 + len(k.encode('utf-8')) + len(v) for k, v in data)
+        self.assertLess(table.metadata.index_offset - default_config.SST_HEADER_SIZE, full_size // 2)
+        
+        for key, value in data:
+            self.assertEqual(table.get(key), value)
+        self.assertIsNone(table.get("user:profile:00300"))
+        self.assertEqual(list(table.range_scan(data[0][0], data[-1][0])), data)
+    
+    def test_shared_prefix_len(self):
+        """测试公共前缀长度的计算"""
+        cases = [(b"", b""), (b"", b"a"), (b"abc", b"abc"), (b"abc", b"abcd"),
+                 (b"key1", b"key2"), (b"\x00a", b"\x00b"), (b"x" * 300 + b"a", b"x" * 300 + b"b")]
+        for a, b in cases:
+            expected = len(os.path.commonprefix((a, b)))
+            self.assertEqual(_shared_prefix_len(a, b), expected, (a, b))
+            self.assertEqual(_shared_prefix_len(b, a), expected, (a, b))
+    
+    def test_get_out_of_range(self):
+        """测试键范围之外的查询不访问布隆过滤器"""
+        data = [("key2", "value2"), ("key3", "value3")]
+        table = SSTable.create_from_memtable(
+            self.file_manager, "sst", level=0, sequence=1,
+            entries=iter(data), expected_entries=len(data)
+        )
+        
+        class FailingFilter:
+            def contains_hash(self, hashed):
+                raise AssertionError("bloom filter probed")
+        table.filter = FailingFilter()
+        
+        self.assertIsNone(table.get("key1"))
+        self.assertIsNone(table.get("key4"))
+        self.assertIsNone(table.get("k"))
+        self.assertIsNone(table.get("key10"))
+    
+    def test_get_prechecked(self):
+        """测试 _get_prechecked 不再检查键范围和布隆过滤器，get 传入 hashed 时仍然检查"""
+        data = [("key2", "value2"), ("key3", "value3")]
+        table = SSTable.create_from_memtable(
+            self.file_manager, "sst", level=0, sequence=1,
+            entries=iter(data), expected_entries=len(data)
+        )
+        bloom = table.filter
+        
+        class FailingFilter:
+            def contains_hash(self, hashed):
+                raise AssertionError("bloom filter probed")
+        table.filter = FailingFilter()
+        
+        for key, value in data:
+            self.assertEqual(table._get_prechecked(key), value)
+        # 调用方已排除的键即使传进来也只是查不到
+        self.assertIsNone(table._get_prechecked("key1"))
+        self.assertIsNone(table._get_prechecked("key4"))
+        
+        # get 使用传入的哈希，但范围和布隆过滤器检查照常进行
+        with self.assertRaises(AssertionError):
+            table.get("key2", BloomFilter.hash("key2"))
+        self.assertIsNone(table.get("key4", BloomFilter.hash("key4")))
+        
+        class EmptyFilter:
+            def contains_hash(self, hashed):
+                return False
+        table.filter = EmptyFilter()
+        self.assertIsNone(table.get("key2", BloomFilter.hash("key2")))
+        table.filter = bloom
+        self.assertEqual(table.get("key3", BloomFilter.hash("key3")), "value3")
+    
     def test_range_scan(self):
         """测试范围查询"""
         # 准备数据
@@ -153,29 +284,18 @@ class TestSSTable(unittest.TestCase):
         )
         
         # 测试范围查询
-        results = list(table.range_scan("key2", "key4"))
-        self.assertEqual(len(results), 3)
-        self.assertEqual(results[0], ("key2", "value2"))
-        self.assertEqual(results[1], ("key3", "value3"))
-        self.assertEqual(results[2], ("key4", "value4"))
+        self.assertListEqual(list(table.range_scan("key2", "key4")), data[1:4])
         
         # 测试边界情况
-        results = list(table.range_scan("key1", "key1"))
-        self.assertEqual(len(results), 1)
-        self.assertEqual(results[0], ("key1", "value1"))
+        self.assertListEqual(list(table.range_scan("key1", "key1")), [("key1", "value1")])
         
         # 测试空范围
-        results = list(table.range_scan("key6", "key7"))
-        self.assertEqual(len(results), 0)
+        self.assertListEqual(list(table.range_scan("key6", "key7")), [])
     
     def test_large_dataset(self):
         """测试大数据集"""
         # 准备大量数据
-        data = []
-        for i in range(1000):
-            key = f"key{i:04d}"
-            value = f"value{i:04d}"
-            data.append((key, value))
+        data = [(f"key{i:04d}", f"value{i:04d}") for i in range(1000)]
         
         # 创建SSTable
         table = SSTable.create_from_memtable(
@@ -193,23 +313,27 @@ class TestSSTable(unittest.TestCase):
         self.assertGreater(file_size, default_config.SST_HEADER_SIZE)
         self.assertLess(file_size, 10 * 1024 * 1024)  # 不应超过10MB
         
-        # 验证随机访问性能
+        # 验证随机访问性能：先预热几次，计时区间内关闭 GC，用单调的纳秒计时器
         import random
-        import time
-        start_time = time.time()
-        for _ in range(100):
-            idx = random.randint(0, len(data) - 1)
-            key, value = data[idx]
-            self.assertEqual(table.get(key), value)
-        query_time = time.time() - start_time
-        self.assertLess(query_time, 1.0)  # 100次随机查询应在1秒内完成
-        
-        # 验证范围查询性能
-        start_time = time.time()
-        results = list(table.range_scan("key0100", "key0199"))
-        scan_time = time.time() - start_time
-        self.assertEqual(len(results), 100)
-        self.assertLess(scan_time, 0.5)  # 范围查询应在0.5秒内完成
+        for _ in range(10):
+            table.get(data[0][0])
+        gc.disable()
+        try:
+            start_ns = time.perf_counter_ns()
+            for _ in range(100):
+                key, value = random.choice(data)
+                self.assertEqual(table.get(key), value)
+            query_ns = time.perf_counter_ns() - start_ns
+            
+            # 验证范围查询性能
+            start_ns = time.perf_counter_ns()
+            results = list(table.range_scan("key0100", "key0199"))
+            scan_ns = time.perf_counter_ns() - start_ns
+        finally:
+            gc.enable()
+        self.assertLess(query_ns, 1_000_000_000)  # 100次随机查询应在1秒内完成
+        self.assertListEqual(results, data[100:200])
+        self.assertLess(scan_ns, 500_000_000)  # 范围查询应在0.5秒内完成
     
     def test_corrupted_file(self):
         """测试损坏的文件处理"""
@@ -228,9 +352,11 @@ class TestSSTable(unittest.TestCase):
         
         # 损坏文件
         sst_file = os.path.join(self.temp_dir, "sst_1.sst")
-        with open(sst_file, 'r+b') as f:
-            f.seek(0)
-            f.write(b'XXXX')  # 破坏魔数
+        fd = os.open(sst_file, os.O_WRONLY)
+        try:
+            os.pwrite(fd, b'XXXX', 0)  # 破坏魔数
+        finally:
+            os.close(fd)
         
         # 尝试加载损坏的文件
         corrupted_table = SSTable(self.temp_dir, 0, 1)
@@ -251,26 +377,14 @@ class TestSSTable(unittest.TestCase):
             expected_entries=len(data)
         )
         
-        # 并发读取测试
-        import threading
-        errors = []
-        
-        def reader_thread():
-            try:
-                for key, expected_value in data:
-                    actual_value = table.get(key)
-                    if actual_value != expected_value:
-                        errors.append(f"Key {key}: expected {expected_value}, got {actual_value}")
-            except Exception as e:
-                errors.append(str(e))
-        
-        threads = [threading.Thread(target=reader_thread) for _ in range(10)]
-        for t in threads:
-            t.start()
-        for t in threads:
-            t.join()
-        
-        self.assertEqual(len(errors), 0, f"Concurrent read errors: {errors}")
+        # 并发读取测试：10 个线程共同完成 10 轮全量查询
+        keys = [key for key, _ in data] * 10
+        expected = [value for _, value in data] * 10
+        get = table.get
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = list(executor.map(get, keys))
+        
+        self.assertListEqual(results, expected)
 
 if __name__ == '__main__':
     unittest.main()
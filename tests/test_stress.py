@@ -1,9 +1,10 @@
 import unittest
-import tempfile
 import shutil
 import random
 import string
 import time
+from itertools import groupby
+from operator import itemgetter
 from typing import List, Tuple
 
 from lsm.wal.wal import WAL
@@ -11,13 +12,14 @@ from lsm.memtable.table import MemTable
 from lsm.utils.generator import (
     generate_random_kv_pairs,
     generate_sequential_kv_pairs,
-    generate_random_string
+    generate_random_strings
 )
+from tests import make_temp_dir
 
 class StressTest(unittest.TestCase):
     def setUp(self):
         """创建临时目录"""
-        self.temp_dir = tempfile.mkdtemp()
+        self.temp_dir = make_temp_dir()
         self.wal = WAL(self.temp_dir)
         self.memtable = MemTable()
 
@@ -37,17 +39,15 @@ class StressTest(unittest.TestCase):
         
         start_time = time.time()
         
-        # 写入 WAL 和 MemTable
-        for key, value in pairs:
-            self.wal.append(key, value)
-            self.memtable.put(key, value)
+        # 整批写入 WAL 和 MemTable
+        self.wal.append_many(pairs)
+        self.memtable.put_many(pairs)
         
         write_time = time.time() - start_time
         print(f"\nSequential write time for {count} entries: {write_time:.2f}s")
         
         # 验证数据完整性
-        recovered_entries = list(self.wal.recover())
-        self.assertEqual(len(recovered_entries), count)
+        self.assertEqual(sum(1 for _ in self.wal.recover()), count)
         
         # 验证 MemTable 大小
         self.assertGreater(self.memtable.size, 0)
@@ -60,17 +60,15 @@ class StressTest(unittest.TestCase):
         
         start_time = time.time()
         
-        # 写入 WAL 和 MemTable
-        for key, value in pairs:
-            self.wal.append(key, value)
-            self.memtable.put(key, value)
+        # 整批写入 WAL 和 MemTable
+        self.wal.append_many(pairs)
+        self.memtable.put_many(pairs)
         
         write_time = time.time() - start_time
         print(f"\nRandom write time for {count} entries: {write_time:.2f}s")
         
         # 验证数据完整性
-        recovered_entries = list(self.wal.recover())
-        self.assertEqual(len(recovered_entries), count)
+        self.assertEqual(sum(1 for _ in self.wal.recover()), count)
 
     def test_mixed_operations(self):
         """测试混合操作（写入、更新、删除）"""
@@ -83,44 +81,53 @@ class StressTest(unittest.TestCase):
             keys.append(key)
             operations.append(('put', key, value))
         
+        # 新增和更新用到的键和值预先整批生成
+        new_keys = generate_random_strings(500, 8)
+        new_values = generate_random_strings(500, 100)
+        
         # 生成随机操作
-        for _ in range(500):
+        for i in range(500):
             op = random.choice(['put', 'update', 'delete'])
             if op == 'put':
                 # 新增
-                key = generate_random_string(8)
-                value = generate_random_string(100)
+                key = new_keys[i]
                 keys.append(key)
-                operations.append(('put', key, value))
+                operations.append(('put', key, new_values[i]))
             elif op == 'update' and keys:
                 # 更新
                 key = random.choice(keys)
-                value = generate_random_string(100)
-                operations.append(('put', key, value))
+                operations.append(('put', key, new_values[i]))
             elif op == 'delete' and keys:
-                # 删除
-                key = random.choice(keys)
+                # 删除：与最后一个交换后弹出，O(1)；keys 只用于随机选取，顺序无关
+                idx = random.randrange(len(keys))
+                key = keys[idx]
+                keys[idx] = keys[-1]
+                keys.pop()
                 operations.append(('delete', key, ''))
-                keys.remove(key)
         
         start_time = time.time()
         
-        # 执行操作
-        for op, key, value in operations:
+        # 执行操作：WAL 按原顺序整批写入（删除记为空值），MemTable 按连续的同类操作分批
+        self.wal.append_many([(key, value) for _, key, value in operations])
+        for op, group in groupby(operations, key=itemgetter(0)):
             if op == 'put':
-                self.wal.append(key, value)
-                self.memtable.put(key, value)
-            elif op == 'delete':
-                self.wal.append(key, '')
-                self.memtable.delete(key)
+                self.memtable.put_many([(key, value) for _, key, value in group])
+            else:
+                for _, key, _ in group:
+                    self.memtable.delete(key)
         
         operation_time = time.time() - start_time
         print(f"\nMixed operations time for {len(operations)} operations: {operation_time:.2f}s")
         
-        # 验证数据一致性
-        recovered_entries = dict(self.wal.recover())
-        for key, value in self.memtable:
-            self.assertEqual(recovered_entries.get(key), value)
+        # 验证数据一致性：recover() 每个键只返回最新的值，逐条与 MemTable 比较；
+        # 已删除的键不在 MemTable 中，跳过
+        expected = dict(self.memtable)
+        matched = 0
+        for key, value in self.wal.recover():
+            if key in expected:
+                self.assertEqual(expected[key], value)
+                matched += 1
+        self.assertEqual(matched, len(expected))
 
     def test_concurrent_range_scans(self):
         """测试并发范围查询的性能"""
@@ -136,16 +143,16 @@ class StressTest(unittest.TestCase):
         
         # 执行多次范围查询
         for _ in range(100):
-            # 随机选择范围
-            start_idx = random.randint(0, count - 100)
+            # 随机选择范围，end_idx 最大为 count - 1，两端的键都存在
+            start_idx = random.randint(0, count - 101)
             end_idx = start_idx + 100
             
             start_key = f"key_{start_idx:08d}"
             end_key = f"key_{end_idx:08d}"
             
-            # 执行范围查询
-            results = list(self.memtable.range_scan(start_key, end_key))
-            self.assertEqual(len(results), end_idx - start_idx + 1)
+            # 执行范围查询，只需要结果的数量
+            got = sum(1 for _ in self.memtable.range_scan(start_key, end_key))
+            self.assertEqual(got, end_idx - start_idx + 1)
         
         scan_time = time.time() - start_time
         print(f"\nRange scan time for 100 queries: {scan_time:.2f}s")
@@ -156,10 +163,9 @@ class StressTest(unittest.TestCase):
         count = 1_000
         pairs = generate_random_kv_pairs(count, key_length=16, value_length=1000)
         
-        # 写入数据
+        # 整批写入数据
         write_start = time.time()
-        for key, value in pairs:
-            self.wal.append(key, value)
+        self.wal.append_many(pairs)
         write_time = time.time() - write_start
         print(f"\nWrite time for {count} large entries: {write_time:.2f}s")
         
@@ -169,11 +175,12 @@ class StressTest(unittest.TestCase):
         # 测试恢复性能
         recovery_start = time.time()
         recovered_wal = WAL(self.temp_dir)
-        recovered_entries = list(recovered_wal.recover())
+        recovered_count = sum(1 for _ in recovered_wal.recover())
         recovery_time = time.time() - recovery_start
+        recovered_wal.close()
         
         print(f"Recovery time for {count} large entries: {recovery_time:.2f}s")
-        self.assertEqual(len(recovered_entries), count)
+        self.assertEqual(recovered_count, count)
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,19 +1,29 @@
 import unittest
-import tempfile
 import shutil
 import os
+import threading
 from lsm.wal.wal import WAL
+from lsm.utils.generator import generate_random_bytes
+from tests import make_temp_dir
 
 class TestWAL(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """所有测试共用一个临时根目录，全部结束后一次删除"""
+        cls.temp_root = make_temp_dir()
+    
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_root)
+    
     def setUp(self):
-        """测试前创建临时目录"""
-        self.temp_dir = tempfile.mkdtemp()
+        """每个测试在根目录下使用以测试名命名的子目录"""
+        self.temp_dir = os.path.join(self.temp_root, self._testMethodName)
         self.wal = WAL(self.temp_dir)
         
     def tearDown(self):
-        """测试后清理临时目录"""
+        """测试后关闭WAL，目录留到 tearDownClass 统一删除"""
         self.wal.close()
-        shutil.rmtree(self.temp_dir)
     
     def test_basic_operations(self):
         """测试基本的写入和恢复操作"""
@@ -24,8 +34,7 @@ class TestWAL(unittest.TestCase):
             ("key3", "value3")
         ]
         
-        for key, value in entries:
-            self.wal.append(key, value)
+        self.wal.append_many(entries)
         
         # 关闭WAL
         self.wal.close()
@@ -35,20 +44,13 @@ class TestWAL(unittest.TestCase):
         recovered_entries = list(recovered_wal.recover())
         
         # 验证恢复的数据
-        self.assertEqual(len(recovered_entries), len(entries))
-        for (key, value), (rec_key, rec_value) in zip(entries, recovered_entries):
-            self.assertEqual(key, rec_key)
-            self.assertEqual(value, rec_value)
+        self.assertEqual(recovered_entries, entries)
     
     def test_large_dataset(self):
         """测试大数据集的写入和恢复"""
-        # 生成大量数据
-        entries = []
-        for i in range(1000):
-            key = f"key{i:04d}"
-            value = f"value{i:04d}"
-            entries.append((key, value))
-            self.wal.append(key, value)
+        # 生成大量数据，整批写入
+        entries = [(f"key{i:04d}", f"value{i:04d}") for i in range(1000)]
+        self.wal.append_many(entries)
         
         # 关闭并重新打开WAL
         self.wal.close()
@@ -56,10 +58,75 @@ class TestWAL(unittest.TestCase):
         recovered_entries = list(recovered_wal.recover())
         
         # 验证所有数据
-        self.assertEqual(len(recovered_entries), len(entries))
-        for (key, value), (rec_key, rec_value) in zip(entries, recovered_entries):
-            self.assertEqual(key, rec_key)
-            self.assertEqual(value, rec_value)
+        self.assertEqual(recovered_entries, entries)
+    
+    def test_append_many(self):
+        """测试批量写入"""
+        entries = [(f"key{i}", f"value{i}") for i in range(10)]
+        self.wal.append_many(entries)
+        self.wal.close()
+        
+        recovered_wal = WAL(self.temp_dir)
+        self.assertEqual(list(recovered_wal.recover()), entries)
+    
+    def test_append_many_stream(self):
+        """测试从生成器批量写入，不需要先构造列表"""
+        self.wal.append_many((f"key{i}", f"value{i}") for i in range(10))
+        self.wal.append_many(iter(()))
+        self.assertEqual(self.wal._written, 10)
+        self.wal.close()
+        
+        recovered_wal = WAL(self.temp_dir)
+        self.assertEqual(list(recovered_wal.recover()), [(f"key{i}", f"value{i}") for i in range(10)])
+        recovered_wal.close()
+    
+    def test_append_bytes(self):
+        """测试直接写入已编码的键值对"""
+        self.wal.append(b"key1", "值".encode('utf-8'))
+        self.wal.append_many([(b"key2", b"value2"), ("key3", "value3")])
+        self.wal.close()
+        
+        recovered_wal = WAL(self.temp_dir)
+        self.assertEqual(list(recovered_wal.recover()),
+                         [("key1", "值"), ("key2", "value2"), ("key3", "value3")])
+        recovered_wal.close()
+    
+    def test_append_random_bytes(self):
+        """测试写入随机生成的 ASCII 字节串，恢复为相同内容的字符串"""
+        entries = [(f"key{i}".encode('ascii'), generate_random_bytes(100)) for i in range(10)]
+        self.wal.append_many(entries)
+        self.wal.close()
+        
+        recovered_wal = WAL(self.temp_dir)
+        self.assertEqual(list(recovered_wal.recover()),
+                         [(key.decode('ascii'), value.decode('ascii')) for key, value in entries])
+        recovered_wal.close()
+    
+    def test_group_commit(self):
+        """测试多个线程同步写入时共享 fsync"""
+        def writer(thread_id):
+            for i in range(50):
+                self.wal.append(f"key{thread_id}_{i}", "value", sync=True)
+        
+        threads = [threading.Thread(target=writer, args=(t,)) for t in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        # 不关闭文件，同步写入的记录也已经全部落盘
+        self.assertEqual(self.wal._synced, 200)
+        recovered_wal = WAL(self.temp_dir)
+        self.assertEqual(len(list(recovered_wal.recover())), 200)
+        recovered_wal.close()
+    
+    def test_commit(self):
+        """测试异步写入后显式提交"""
+        self.wal.append("key1", "value1")
+        self.assertEqual(self.wal._synced, 0)
+        self.wal.commit()
+        self.assertEqual(self.wal._synced, 1)
+        self.assertEqual(os.path.getsize(self.wal.file_path), 4 + 4 + 4 + 6)
     
     def test_deleted_entries(self):
         """测试删除标记的处理"""
@@ -73,8 +140,7 @@ class TestWAL(unittest.TestCase):
             ("key3", "value3_new")  # 重新写入key3
         ]
         
-        for key, value in entries:
-            self.wal.append(key, value)
+        self.wal.append_many(entries)
         
         # 关闭并重新打开WAL
         self.wal.close()
@@ -88,11 +154,7 @@ class TestWAL(unittest.TestCase):
             ("key3", "value3_new")
         ]
         
-        self.assertEqual(len(recovered_entries), len(expected))
-        for i, (key, value) in enumerate(expected):
-            rec_key, rec_value = recovered_entries[i]
-            self.assertEqual(key, rec_key)
-            self.assertEqual(value, rec_value)
+        self.assertEqual(recovered_entries, expected)
     
     def test_corrupted_file(self):
         """测试处理损坏的WAL文件"""
@@ -111,10 +173,7 @@ class TestWAL(unittest.TestCase):
         
         # 模拟文件损坏：截断最后一条记录
         wal_file = os.path.join(self.temp_dir, "wal")
-        with open(wal_file, 'rb') as f:
-            content = f.read()[:-10]  # 截断最后10个字节
-        with open(wal_file, 'wb') as f:
-            f.write(content)
+        os.truncate(wal_file, max(0, os.path.getsize(wal_file) - 10))  # 截断最后10个字节
         
         # 尝试恢复数据
         recovered_wal = WAL(self.temp_dir)
@@ -122,10 +181,7 @@ class TestWAL(unittest.TestCase):
         
         # 验证能恢复的数据
         self.assertGreaterEqual(len(recovered_entries), len(entries) - 1)
-        for i in range(len(recovered_entries)):
-            rec_key, rec_value = recovered_entries[i]
-            self.assertEqual(rec_key, entries[i][0])
-            self.assertEqual(rec_value, entries[i][1])
+        self.assertEqual(recovered_entries, entries[:len(recovered_entries)])
     
     def test_empty_wal(self):
         """测试空WAL文件的处理"""
@@ -1,16 +1,42 @@
+import os
 import random
-import string
+import threading
 import uuid
+from itertools import accumulate
 from typing import Dict, List, Tuple, Generator
 from datetime import datetime, timedelta
 
+from lsm.utils.generator import generate_random_bytes, generate_random_string, generate_random_strings
+
+# 每个线程使用自己的随机数生成器（由 os.urandom 播种），多线程生成数据时不共享模块级的随机状态
+_thread_local = threading.local()
+
+
+def _rng() -> random.Random:
+    """返回当前线程的随机数生成器，第一次调用时创建"""
+    rng = getattr(_thread_local, 'rng', None)
+    if rng is None:
+        rng = _thread_local.rng = random.Random(os.urandom(16))
+    return rng
+
+
 class DataGenerator:
     """测试数据生成器"""
     
     @staticmethod
     def generate_random_string(length: int) -> str:
-        """生成指定长度的随机字符串"""
-        return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+        """生成指定长度的随机字符串，字符由 os.urandom 的随机字节整批映射得到"""
+        return generate_random_string(length)
+    
+    @staticmethod
+    def generate_random_bytes(length: int) -> bytes:
+        """生成指定长度的随机 ASCII 字节串，可以直接写入 WAL 而不再编码"""
+        return generate_random_bytes(length)
+    
+    @staticmethod
+    def generate_random_strings_batch(count: int, length: int) -> List[str]:
+        """一次生成 count 个指定长度的随机字符串，共用一批随机字节"""
+        return generate_random_strings(count, length)
     
     @staticmethod
     def generate_timestamp_key() -> str:
@@ -30,9 +56,61 @@ class DataGenerator:
     @staticmethod
     def generate_value(min_length: int = 10, max_length: int = 100) -> str:
         """生成随机长度的值"""
-        length = random.randint(min_length, max_length)
+        length = _rng().randint(min_length, max_length)
         return DataGenerator.generate_random_string(length)
     
+    @staticmethod
+    def _sequential_keys(count: int, prefix: str, padding: int = 10) -> List[str]:
+        """批量生成与 generate_sequential_key 相同的序列键，前缀只拼接一次"""
+        head = f"{prefix}_"
+        return [head + str(i).zfill(padding) for i in range(count)]
+    
+    @staticmethod
+    def _uuid_keys(count: int) -> List[str]:
+        """一次生成 count 个 UUID4 字符串，随机字节整批取出后统一转成十六进制
+        
+        与 uuid.uuid4() 一样设置版本号 4 和 RFC 4122 变体位
+        """
+        digits = os.urandom(16 * count).hex()
+        variants = '89ab89ab89ab89ab'
+        keys = []
+        for start in range(0, 32 * count, 32):
+            h = digits[start:start + 32]
+            keys.append(f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{variants[int(h[16], 16)]}{h[17:20]}-{h[20:]}")
+        return keys
+    
+    @staticmethod
+    def _timestamp_keys(start_time: datetime, count: int, interval_seconds: int) -> Generator[str, None, None]:
+        """按固定间隔生成 %Y%m%d%H%M%S%f 格式的时间戳键
+        
+        间隔是整数秒时微秒部分不变，时分秒用整数运算得到，每天的日期部分只格式化一次
+        """
+        if not isinstance(interval_seconds, int):
+            for i in range(count):
+                yield (start_time + timedelta(seconds=i*interval_seconds)).strftime("%Y%m%d%H%M%S%f")
+            return
+        
+        day_start = start_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        start_seconds = start_time.hour * 3600 + start_time.minute * 60 + start_time.second
+        microsecond = f"{start_time.microsecond:06d}"
+        day_prefixes = {}
+        for i in range(count):
+            days, seconds = divmod(start_seconds + i * interval_seconds, 86400)
+            prefix = day_prefixes.get(days)
+            if prefix is None:
+                prefix = day_prefixes[days] = (day_start + timedelta(days=days)).strftime("%Y%m%d")
+            hours, seconds = divmod(seconds, 3600)
+            minutes, seconds = divmod(seconds, 60)
+            yield f"{prefix}{hours:02d}{minutes:02d}{seconds:02d}{microsecond}"
+    
+    @staticmethod
+    def _bulk_values(count: int, min_length: int, max_length: int) -> List[str]:
+        """一次生成 count 个随机长度的值：先取全部长度，再从一整段随机字符串中切出"""
+        lengths = _rng().choices(range(min_length, max_length + 1), k=count)
+        pool = generate_random_string(sum(lengths))
+        ends = list(accumulate(lengths))
+        return [pool[end - length:end] for end, length in zip(ends, lengths)]
+    
     @classmethod
     def generate_sequential_pairs(cls, 
                                 count: int, 
@@ -40,11 +118,8 @@ class DataGenerator:
                                 min_value_length: int = 10,
                                 max_value_length: int = 100) -> Dict[str, str]:
         """生成序列键值对"""
-        return {
-            cls.generate_sequential_key(prefix, i): 
-            cls.generate_value(min_value_length, max_value_length)
-            for i in range(count)
-        }
+        keys = cls._sequential_keys(count, prefix)
+        return dict(zip(keys, cls._bulk_values(count, min_value_length, max_value_length)))
     
     @classmethod
     def generate_timestamp_pairs(cls,
@@ -57,11 +132,8 @@ class DataGenerator:
         if start_time is None:
             start_time = datetime.now()
             
-        return {
-            (start_time + timedelta(seconds=i*interval_seconds)).strftime("%Y%m%d%H%M%S%f"):
-            cls.generate_value(min_value_length, max_value_length)
-            for i in range(count)
-        }
+        keys = cls._timestamp_keys(start_time, count, interval_seconds)
+        return dict(zip(keys, cls._bulk_values(count, min_value_length, max_value_length)))
     
     @classmethod
     def generate_uuid_pairs(cls,
@@ -69,11 +141,8 @@ class DataGenerator:
                           min_value_length: int = 10,
                           max_value_length: int = 100) -> Dict[str, str]:
         """生成基于UUID的键值对"""
-        return {
-            str(uuid.uuid4()): 
-            cls.generate_value(min_value_length, max_value_length)
-            for _ in range(count)
-        }
+        keys = cls._uuid_keys(count)
+        return dict(zip(keys, cls._bulk_values(count, min_value_length, max_value_length)))
     
     @classmethod
     def generate_random_pairs(cls,
@@ -82,11 +151,8 @@ class DataGenerator:
                             min_value_length: int = 10,
                             max_value_length: int = 100) -> Dict[str, str]:
         """生成随机键值对"""
-        return {
-            cls.generate_random_string(key_length):
-            cls.generate_value(min_value_length, max_value_length)
-            for _ in range(count)
-        }
+        keys = generate_random_strings(count, key_length)
+        return dict(zip(keys, cls._bulk_values(count, min_value_length, max_value_length)))
     
     @classmethod
     def generate_sorted_pairs(cls,
@@ -94,8 +160,11 @@ class DataGenerator:
                             min_value_length: int = 10,
                             max_value_length: int = 100) -> List[Tuple[str, str]]:
         """生成有序的键值对列表"""
-        pairs = cls.generate_random_pairs(count, 16, min_value_length, max_value_length)
-        return sorted(pairs.items())
+        # 直接排序键值对列表，不经过字典；16 位随机键重复的概率可以忽略
+        pairs = list(zip(generate_random_strings(count, 16),
+                         cls._bulk_values(count, min_value_length, max_value_length)))
+        pairs.sort()
+        return pairs
     
     @classmethod
     def generate_key_stream(cls, 
@@ -111,15 +180,11 @@ class DataGenerator:
             prefix: 序列键的前缀
         """
         if key_type == "sequential":
-            for i in range(count):
-                yield cls.generate_sequential_key(prefix, i)
+            yield from cls._sequential_keys(count, prefix)
         elif key_type == "timestamp":
-            start_time = datetime.now()
-            for i in range(count):
-                yield (start_time + timedelta(seconds=i)).strftime("%Y%m%d%H%M%S%f")
+            yield from cls._timestamp_keys(datetime.now(), count, 1)
         elif key_type == "uuid":
-            for _ in range(count):
-                yield str(uuid.uuid4())
+            yield from cls._uuid_keys(count)
         else:  # random
             for _ in range(count):
                 yield cls.generate_random_string(16)